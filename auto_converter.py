@@ -1,70 +1,399 @@
 """Automatische Konvertierung bei Dateiänderungen"""
+import concurrent.futures
+import fnmatch
+import multiprocessing as mp
+import threading
 import time
 import os
 from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from converter_engine import DocumentConverter, ConversionError
+from converter_engine import ConversionError
+from batch_processor import ConversionJob, init_worker, run_conversion_job
+from watch_state import WatchStateIndex, file_sha256
 import json
 
+def _glob_match(rel_path: str, name: str, patterns: list) -> bool:
+    """Muster mit '/' gelten für den relativen Pfad, sonst für den Dateinamen"""
+    for pattern in patterns:
+        if fnmatch.fnmatch(rel_path if '/' in pattern else name, pattern):
+            return True
+    return False
+
 class ConversionRule:
-    """Regel für automatische Konvertierung"""
-    def __init__(self, watch_dir: str, extensions: list, target_format: str, output_dir: str):
+    """
+    Regel für automatische Konvertierung
+    
+    include/exclude: Glob-Muster (fnmatch), z.B. "Rechnung_*" oder "archiv/*".
+    Bei recursive=True wird die Unterordner-Struktur im Ausgabeordner gespiegelt
+    (mirror_subdirs=False legt alles flach in output_dir ab). network_share=True
+    überwacht den Ordner per Snapshot-Vergleich statt per watchdog (SMB/NFS).
+    """
+    def __init__(self, watch_dir: str, extensions: list, target_format: str, output_dir: str,
+                 recursive: bool = False, include: list = None, exclude: list = None,
+                 mirror_subdirs: bool = True, network_share: bool = False):
         self.watch_dir = watch_dir
         self.extensions = [ext.lower() for ext in extensions]
         self.target_format = target_format.lower()
         self.output_dir = output_dir
+        self.recursive = recursive
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.mirror_subdirs = mirror_subdirs
+        self.network_share = network_share  # Snapshot-Scan statt watchdog-Events
+        self._watch_root = os.path.abspath(watch_dir)
+        self._output_root = os.path.abspath(output_dir)
+    
+    def relative_path(self, file_path: str) -> str:
+        """Pfad relativ zum Watch-Ordner (mit '/' als Trenner)"""
+        return Path(os.path.relpath(file_path, self._watch_root)).as_posix()
+    
+    def accepts(self, file_path: str) -> bool:
+        """Prüft Globs für einen absoluten Pfad (Endung und Ordner prüft der RuleIndex)"""
+        if self.recursive and (file_path + os.sep).startswith(self._output_root + os.sep):
+            return False  # Eigene Ausgaben im Watch-Baum nicht erneut konvertieren
+        rel_path = self.relative_path(file_path)
+        name = os.path.basename(file_path)
+        if self.include and not _glob_match(rel_path, name, self.include):
+            return False
+        if not self.exclude:
+            return True
+        # Auch ausgeschlossene Ordner (Live-Events kommen am Scan-Pruning vorbei)
+        parts = rel_path.split('/')
+        for depth in range(1, len(parts)):
+            if _glob_match('/'.join(parts[:depth]), parts[depth - 1], self.exclude):
+                return False
+        return not _glob_match(rel_path, name, self.exclude)
+    
+    def accepts_dir(self, dir_path: str) -> bool:
+        """Ordner beim Scan überspringen, wenn exclude greift oder es der Ausgabeordner ist"""
+        if os.path.abspath(dir_path) == self._output_root:
+            return False
+        return not _glob_match(self.relative_path(dir_path), os.path.basename(dir_path), self.exclude)
+    
+    def output_dir_for(self, file_path: str) -> str:
+        """Ausgabeordner für eine Quelldatei (gespiegelte Unterordner)"""
+        if not (self.recursive and self.mirror_subdirs):
+            return self.output_dir
+        rel_dir = os.path.dirname(os.path.relpath(file_path, self._watch_root))
+        return os.path.join(self.output_dir, rel_dir) if rel_dir else self.output_dir
+    
+    def scan(self):
+        """Alle passenden Dateien per os.scandir (DirEntry, rekursiv falls aktiviert)"""
+        stack = [self.watch_dir]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive and self.accepts_dir(entry.path):
+                                stack.append(entry.path)
+                        elif (entry.is_file()
+                              and os.path.splitext(entry.name)[1].lower() in self.extensions
+                              and self.accepts(os.path.abspath(entry.path))):
+                            yield entry
+            except OSError:
+                continue
+    
+    @property
+    def state_key(self) -> str:
+        """Schlüssel im Zustandsindex - ändert sich mit Zielformat oder Ordnern"""
+        return json.dumps([os.path.abspath(self.watch_dir), self.target_format, os.path.abspath(self.output_dir)])
 
-class AutoConvertHandler(FileSystemEventHandler):
-    """Handler für Datei-Events"""
+class RuleIndex:
+    """
+    Vorberechneter Index (Watch-Ordner, Endung) -> Regeln
+    
+    PERFORMANCE: Pro Event nur Dict-Lookups entlang der Ordner-Vorfahren der Datei
+    statt einer Schleife über alle Regeln - auch bei Hunderten Regeln.
+    """
     
     def __init__(self, rules: list):
         self.rules = rules
-        self.converter = DocumentConverter()
+        self._index = {}
+        for rule in rules:
+            for ext in rule.extensions:
+                self._index.setdefault((rule._watch_root, ext), []).append(rule)
+        self._extensions = {ext for _, ext in self._index}
+    
+    @property
+    def extensions(self) -> set:
+        return self._extensions
+    
+    def match(self, file_path: str) -> list:
+        """Alle Regeln, die für einen absoluten Pfad greifen"""
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext not in self._extensions:
+            return []
+        
+        matched = []
+        directory = os.path.dirname(file_path)
+        direct_parent = True
+        while True:
+            for rule in self._index.get((directory, ext), ()):
+                if (direct_parent or rule.recursive) and rule.accepts(file_path):
+                    matched.append(rule)
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return matched
+            directory = parent
+            direct_parent = False
+
+def run_watch_job(job: ConversionJob):
+    """Worker-Funktion: hasht die Quelle und konvertiert (Hash für den Zustandsindex)"""
+    file_hash = file_sha256(job.input_file)
+    return run_conversion_job(job), file_hash
+
+class AutoConvertHandler(FileSystemEventHandler):
+    """
+    Handler für Datei-Events
+    
+    PERFORMANCE: Events werden im Observer-Thread nur eingereiht (kein sleep, keine
+    Konvertierung). Ein Dispatcher-Thread fasst created/modified-Events pro Pfad
+    zusammen (Debounce), wartet bis Größe und mtime über zwei Polls stabil sind und
+    gibt die Datei dann an einen Prozess-Pool, der die Queue parallel abarbeitet.
+    """
+    
+    def __init__(self, rules: list, max_workers: int = None, debounce_seconds: float = 1.0,
+                 poll_interval: float = 0.25, state: WatchStateIndex = None):
+        self.rules = rules
+        self.index = RuleIndex(rules)
+        self.state = state
+        self.max_workers = max_workers or mp.cpu_count()
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval = poll_interval
         self.processing = set()  # Verhindert Doppel-Verarbeitung
+        self._pending = {}  # Pfad -> [letztes Event, letzte (size, mtime)-Signatur]
+        self._dirty = set()  # Während der Konvertierung erneut geändert
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._executor = None
+        self._dispatcher = None
+    
+    def start(self):
+        """Startet Worker-Pool und Dispatcher"""
+        self._stop_event.clear()
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=init_worker
+        )
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+    
+    def stop(self):
+        """Stoppt Dispatcher und wartet auf laufende Konvertierungen"""
+        self._stop_event.set()
+        if self._dispatcher:
+            self._dispatcher.join()
+            self._dispatcher = None
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
     
     def on_created(self, event):
         if event.is_directory:
             return
-        
-        file_path = event.src_path
-        self._process_file(file_path)
+        self.enqueue(event.src_path)
     
     def on_modified(self, event):
         if event.is_directory:
             return
-        
-        file_path = event.src_path
-        # Nur verarbeiten wenn Datei nicht gerade bearbeitet wird
-        if file_path not in self.processing:
-            time.sleep(0.5)  # Warte bis Datei fertig geschrieben
-            self._process_file(file_path)
+        self.enqueue(event.src_path)
+    
+    def on_moved(self, event):
+        if event.is_directory:
+            return
+        self.enqueue(event.dest_path)
+    
+    def enqueue(self, file_path: str):
+        """Merkt eine Datei vor - mehrfache Events für denselben Pfad werden zusammengefasst"""
+        file_path = os.path.abspath(file_path)
+        if not self._matching_rules(file_path):
+            return
+        with self._lock:
+            if file_path in self.processing:
+                self._dirty.add(file_path)
+                return
+            entry = self._pending.get(file_path)
+            if entry is None:
+                self._pending[file_path] = [time.monotonic(), None]
+            else:
+                entry[0] = time.monotonic()
+    
+    def _matching_rules(self, file_path: str) -> list:
+        return self.index.match(file_path)
     
-    def _process_file(self, file_path: str):
-        """Verarbeitet Datei basierend auf Regeln"""
+    @staticmethod
+    def _signature(file_path: str):
+        try:
+            stats = os.stat(file_path)
+        except OSError:
+            return None
+        return stats.st_size, stats.st_mtime_ns
+    
+    def _dispatch_loop(self):
+        while not self._stop_event.wait(self.poll_interval):
+            now = time.monotonic()
+            ready = []
+            with self._lock:
+                candidates = [
+                    (path, entry) for path, entry in self._pending.items()
+                    if now - entry[0] >= self.debounce_seconds
+                ]
+            
+            for path, entry in candidates:
+                signature = self._signature(path)
+                with self._lock:
+                    if self._pending.get(path) is not entry:
+                        continue
+                    if signature is None:
+                        del self._pending[path]  # Datei wieder verschwunden
+                    elif signature == entry[1]:
+                        # Größe und mtime über zwei Polls unverändert -> fertig geschrieben
+                        del self._pending[path]
+                        self.processing.add(path)
+                        ready.append((path, signature))
+                    else:
+                        entry[1] = signature
+            
+            for path, signature in ready:
+                self._submit(path, signature)
+    
+    def _submit(self, file_path: str, signature: tuple):
+        """Reicht die Datei für alle passenden, noch nicht aktuellen Regeln beim Worker-Pool ein"""
         path = Path(file_path)
-        ext = path.suffix.lower()
+        submitted = []
+        for rule in self._matching_rules(file_path):
+            if self.state and self.state.is_current(file_path, rule.state_key, signature):
+                continue  # Schon mit genau diesem Stand konvertiert
+            print(f"🔄 Auto-Konvertierung: {path.name} → {rule.target_format.upper()}")
+            job = ConversionJob(file_path, rule.target_format, rule.output_dir_for(file_path))
+            submitted.append((rule, self._executor.submit(run_watch_job, job)))
         
-        # Prüfe alle Regeln
-        for rule in self.rules:
-            if ext in rule.extensions:
-                if file_path in self.processing:
+        if not submitted:
+            self._finish(file_path)
+            return
+        
+        remaining = [len(submitted)]
+        
+        def on_done(rule, future):
+            try:
+                output, file_hash = future.result()
+                print(f"✅ Fertig: {output}")
+                if self.state:
+                    self.state.record(file_path, rule.state_key, rule.target_format, signature, file_hash, output)
+            except ConversionError as e:
+                print(f"❌ Fehler: {e}")
+            except Exception as e:
+                print(f"❌ Fehler: {path.name}: {e}")
+            with self._lock:
+                remaining[0] -= 1
+                if remaining[0] > 0:
                     return
-                
-                self.processing.add(file_path)
-                
-                try:
-                    print(f"🔄 Auto-Konvertierung: {path.name} → {rule.target_format.upper()}")
-                    output = self.converter.convert(
-                        file_path, 
-                        rule.target_format, 
-                        rule.output_dir
-                    )
-                    print(f"✅ Fertig: {output}")
-                except ConversionError as e:
-                    print(f"❌ Fehler: {e}")
-                finally:
-                    self.processing.discard(file_path)
+            self._finish(file_path)
+        
+        for rule, future in submitted:
+            future.add_done_callback(lambda f, rule=rule: on_done(rule, f))
+    
+    def _finish(self, file_path: str):
+        with self._lock:
+            self.processing.discard(file_path)
+            if file_path in self._dirty:
+                # Während der Konvertierung geändert: erneut (entprellt) einreihen
+                self._dirty.discard(file_path)
+                self._pending[file_path] = [time.monotonic(), None]
+
+class SnapshotWatcher:
+    """
+    Watcher für SMB/NFS-Freigaben (dort liefert watchdog keine zuverlässigen Events)
+    
+    PERFORMANCE: Periodische os.scandir-Snapshots, verglichen mit dem vorherigen Stand in
+    einem kompakten Index (Ordner -> {Dateiname: (size, mtime_ns)}), nur Dateien mit
+    überwachten Endungen. Ändert sich nichts, verdoppelt sich das Intervall bis
+    max_interval (Backoff), bei Änderungen geht es zurück auf interval. Neue/geänderte
+    Dateien landen im selben Handler (Debounce, Stabilitätsprüfung, Worker-Pool).
+    """
+    
+    def __init__(self, handler: AutoConvertHandler, watches: dict, interval: float = 2.0,
+                 max_interval: float = 30.0):
+        self.handler = handler
+        self.watches = watches  # Ordner -> rekursiv
+        self.interval = interval
+        self.max_interval = max_interval
+        self._snapshot = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def _take_snapshot(self) -> dict:
+        extensions = self.handler.index.extensions
+        snapshot = {}
+        stack = [(watch_dir, recursive) for watch_dir, recursive in self.watches.items()]
+        while stack:
+            directory, recursive = stack.pop()
+            if directory in snapshot:
+                continue  # Verschachtelte Watch-Ordner nur einmal
+            files = {}
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive:
+                                    stack.append((entry.path, True))
+                            elif os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                                stats = entry.stat()
+                                files[entry.name] = (stats.st_size, stats.st_mtime_ns)
+                        except OSError:
+                            continue  # Datei zwischen Listing und stat verschwunden
+            except OSError:
+                continue  # Freigabe kurz nicht erreichbar -> nächster Durchlauf
+            snapshot[directory] = files
+        return snapshot
+    
+    def _diff(self, snapshot: dict) -> list:
+        changed = []
+        for directory, files in snapshot.items():
+            previous = self._snapshot.get(directory)
+            if previous is None:
+                if directory not in self.watches:
+                    # Neuer Unterordner: alles darin ist neu
+                    changed.extend(os.path.join(directory, name) for name in files)
+                continue
+            if previous == files:
+                continue
+            changed.extend(
+                os.path.join(directory, name) for name, signature in files.items()
+                if previous.get(name) != signature
+            )
+        return changed
+    
+    def start(self):
+        """Nimmt den Ausgangs-Snapshot auf und startet den Scan-Thread"""
+        self._stop_event.clear()
+        self._snapshot = self._take_snapshot()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        delay = self.interval
+        while not self._stop_event.wait(delay):
+            snapshot = self._take_snapshot()
+            changed = self._diff(snapshot)
+            # Gelöschte Ordner vergessen, nur kurz nicht erreichbare behalten ihren Stand
+            for directory in set(self._snapshot) - set(snapshot):
+                if not os.path.isdir(directory):
+                    del self._snapshot[directory]
+            self._snapshot.update(snapshot)
+            
+            for path in changed:
+                self.handler.enqueue(path)
+            delay = self.interval if changed else min(delay * 2, self.max_interval)
 
 class AutoConverter:
     """Automatischer Konverter mit Watchdog"""
@@ -73,6 +402,14 @@ class AutoConverter:
         self.config_file = config_file
         self.rules = []
         self.observer = None
+        self.snapshot_watcher = None
+        self.handler = None
+        self.state = None
+        self.workers = None
+        self.debounce_seconds = 1.0
+        self.scan_interval = 2.0
+        self.scan_max_interval = 30.0
+        self.state_db = str(Path(config_file).with_suffix('.state.sqlite'))
         self.load_config()
     
     def load_config(self):
@@ -83,13 +420,24 @@ class AutoConverter:
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
                 config = json.load(f)
+            
+            self.workers = config.get('workers')
+            self.debounce_seconds = config.get('debounce_seconds', 1.0)
+            self.scan_interval = config.get('scan_interval', 2.0)
+            self.scan_max_interval = config.get('scan_max_interval', 30.0)
+            self.state_db = config.get('state_db') or self.state_db
                 
             for rule_data in config.get('rules', []):
                 rule = ConversionRule(
                     rule_data['watch_dir'],
                     rule_data['extensions'],
                     rule_data['target_format'],
-                    rule_data['output_dir']
+                    rule_data['output_dir'],
+                    recursive=rule_data.get('recursive', False),
+                    include=rule_data.get('include'),
+                    exclude=rule_data.get('exclude'),
+                    mirror_subdirs=rule_data.get('mirror_subdirs', True),
+                    network_share=rule_data.get('network_share', False)
                 )
                 self.rules.append(rule)
                 
@@ -99,12 +447,20 @@ class AutoConverter:
     def create_default_config(self):
         """Erstellt Standard-Konfiguration"""
         default_config = {
+            'workers': None,
+            'debounce_seconds': 1.0,
+            'scan_interval': 2.0,
+            'scan_max_interval': 30.0,
             'rules': [
                 {
                     'watch_dir': str(Path.home() / 'Documents' / 'AutoConvert'),
                     'extensions': ['.pdf', '.docx'],
                     'target_format': 'html',
-                    'output_dir': str(Path.home() / 'Documents' / 'Converted')
+                    'output_dir': str(Path.home() / 'Documents' / 'Converted'),
+                    'recursive': False,
+                    'include': [],
+                    'exclude': ['~$*'],
+                    'network_share': False
                 }
             ]
         }
@@ -124,23 +480,51 @@ class AutoConverter:
         print(f"📁 Überwache {len(self.rules)} Ordner...")
         
         for rule in self.rules:
-            print(f"  • {rule.watch_dir} ({', '.join(rule.extensions)}) → {rule.target_format.upper()}")
+            scope = " (rekursiv)" if rule.recursive else ""
+            if rule.network_share:
+                scope += " (Netzlaufwerk-Scan)"
+            print(f"  • {rule.watch_dir}{scope} ({', '.join(rule.extensions)}) → {rule.target_format.upper()}")
         
-        event_handler = AutoConvertHandler(self.rules)
+        self.state = WatchStateIndex(self.state_db)
+        event_handler = AutoConvertHandler(self.rules, self.workers, self.debounce_seconds, state=self.state)
+        event_handler.start()
+        self.handler = event_handler
         self.observer = Observer()
         
-        # Registriere alle Watch-Directories
+        # Registriere alle Watch-Directories (jeden Ordner nur einmal, ein gemeinsamer Handler)
+        watches = {}
+        network_watches = {}
         for rule in self.rules:
-            if os.path.exists(rule.watch_dir):
-                self.observer.schedule(event_handler, rule.watch_dir, recursive=False)
-            else:
-                print(f"⚠️ Ordner existiert nicht: {rule.watch_dir}")
-                os.makedirs(rule.watch_dir, exist_ok=True)
-                print(f"✅ Ordner erstellt: {rule.watch_dir}")
-                self.observer.schedule(event_handler, rule.watch_dir, recursive=False)
+            watch_dir = os.path.abspath(rule.watch_dir)
+            target = network_watches if rule.network_share else watches
+            target[watch_dir] = target.get(watch_dir, False) or rule.recursive
+        
+        for watch_dir in list(watches) + list(network_watches):
+            if not os.path.exists(watch_dir):
+                print(f"⚠️ Ordner existiert nicht: {watch_dir}")
+                os.makedirs(watch_dir, exist_ok=True)
+                print(f"✅ Ordner erstellt: {watch_dir}")
         
+        for watch_dir in set(watches) & set(network_watches):
+            # Ordner mit beiden Modi nur per Scan überwachen
+            network_watches[watch_dir] = network_watches[watch_dir] or watches.pop(watch_dir)
+        
+        for watch_dir, recursive in watches.items():
+            self.observer.schedule(event_handler, watch_dir, recursive=recursive)
         self.observer.start()
         
+        if network_watches:
+            self.snapshot_watcher = SnapshotWatcher(
+                event_handler, network_watches, self.scan_interval, self.scan_max_interval
+            )
+            self.snapshot_watcher.start()
+        
+        # Nachholen, was sich geändert hat, während der Auto-Converter nicht lief
+        # (erst nach Observer-Start, damit keine Lücke entsteht)
+        stale = self.catch_up()
+        if stale:
+            print(f"🔁 Nachholen: {stale} neue/geänderte Datei(en)")
+        
         try:
             print("\n✨ Bereit! Lege Dateien in die überwachten Ordner.")
             print("Drücke Ctrl+C zum Beenden...\n")
@@ -149,12 +533,68 @@ class AutoConverter:
         except KeyboardInterrupt:
             self.stop()
     
+    def catch_up(self) -> int:
+        """
+        Abgleich der Watch-Ordner mit dem Zustandsindex, reiht neue/geänderte Dateien ein
+        
+        PERFORMANCE: Ein os.scandir-Durchlauf pro Ordner gegen den vorab geladenen Index;
+        nur bei geänderten Stat-Daten wird gehasht.
+        """
+        stale = set()
+        for rule in self.rules:
+            if not os.path.isdir(rule.watch_dir):
+                continue
+            key = rule.state_key
+            known = self.state.load(key)
+            seen = set()
+            touched = []
+            
+            for entry in rule.scan():
+                path = os.path.abspath(entry.path)
+                seen.add(path)
+                try:
+                    stats = entry.stat()
+                except OSError:
+                    continue
+                previous = known.get(path)
+                if previous and previous[:2] == (stats.st_size, stats.st_mtime_ns):
+                    continue
+                if previous and previous[0] == stats.st_size:
+                    try:
+                        if file_sha256(path) == previous[2]:
+                            touched.append((path, stats.st_size, stats.st_mtime_ns))
+                            continue
+                    except OSError:
+                        continue
+                stale.add(path)
+            
+            if touched:
+                self.state.touch_many(key, touched)
+            missing = set(known) - seen
+            if missing:
+                self.state.forget_many(key, missing)
+        
+        for path in stale:
+            self.handler.enqueue(path)
+        return len(stale)
+    
     def stop(self):
         """Stoppt Überwachung"""
         if self.observer:
             self.observer.stop()
             self.observer.join()
+            self.observer = None
+        if self.snapshot_watcher:
+            self.snapshot_watcher.stop()
+            self.snapshot_watcher = None
+        if self.handler:
+            # Wartet auf laufende Jobs - deren Callbacks schreiben noch in den Index
+            self.handler.stop()
+            self.handler = None
             print("\n👋 Auto-Converter beendet")
+        if self.state:
+            self.state.close()
+            self.state = None
 
 if __name__ == "__main__":
     converter = AutoConverter()
@@ -1,19 +1,332 @@
 """Batch-Verarbeitung mit OPTIMIERTEM Multiprocessing"""
 import concurrent.futures
+import json
+from collections import deque
 from pathlib import Path
-from typing import List, Tuple, Callable
+from typing import Dict, List, Tuple, Callable
 import multiprocessing as mp
+from multiprocessing.util import Finalize
+
+class ConversionJob:
+    """Picklebare Job-Beschreibung für Worker-Prozesse (keine Closures!)"""
+    def __init__(self, input_file: str, output_format, output_dir: str, options: dict = None):
+        self.input_file = str(input_file)
+        # str oder Liste von Formaten (Liste -> DocumentConverter.convert_multi)
+        self.output_format = output_format
+        self.output_dir = str(output_dir)
+        self.options = dict(options or {})
+    
+    @property
+    def output_formats(self) -> List[str]:
+        if isinstance(self.output_format, str):
+            return [self.output_format]
+        return list(self.output_format)
+
+# PERFORMANCE: Ein DocumentConverter pro Worker-Prozess - Docling-Modell und
+# Pillow/HEIF-Registrierung werden einmal pro Worker geladen, nicht pro Datei
+_worker_converter = None
+
+def init_worker(engine_options: dict = None):
+    """Initializer für Worker-Prozesse: erstellt den wiederverwendeten Converter"""
+    global _worker_converter
+    from converter_engine import DocumentConverter
+    _worker_converter = DocumentConverter(**(engine_options or {}))
+    # atexit läuft in Pool-Workern nicht - Finalize schon (z.B. LibreOffice-Pool beenden)
+    Finalize(_worker_converter, _worker_converter.close, exitpriority=10)
+
+def run_conversion_job(job: ConversionJob) -> str:
+    """Führt einen Job mit dem Converter des aktuellen Prozesses aus"""
+    if _worker_converter is None:
+        init_worker()
+    if not isinstance(job.output_format, str):
+        return _worker_converter.convert_multi(job.input_file, job.output_formats, job.output_dir, job.options)
+    return _worker_converter.convert(job.input_file, job.output_format, job.output_dir, job.options)
+
+def run_docling_batch(jobs: List[ConversionJob]) -> List[Tuple[str, any, bool]]:
+    """Konvertiert gleichartige PDF-Jobs in einem Docling-Durchlauf (convert_all)"""
+    if _worker_converter is None:
+        init_worker()
+    first = jobs[0]
+    try:
+        return _worker_converter.convert_docling_batch(
+            [job.input_file for job in jobs],
+            first.output_format,
+            first.output_dir,
+            first.options,
+            batch_size=len(jobs)
+        )
+    except Exception as e:
+        return [(job.input_file, str(e), False) for job in jobs]
+
+def run_pandoc_batch(jobs: List[ConversionJob]) -> List[Tuple[str, any, bool]]:
+    """Konvertiert gleichartige Text-Jobs über /batch des pandoc-Servers"""
+    if _worker_converter is None:
+        init_worker()
+    first = jobs[0]
+    try:
+        return _worker_converter.convert_pandoc_batch(
+            [job.input_file for job in jobs],
+            first.output_format,
+            first.output_dir,
+            first.options,
+            batch_size=len(jobs)
+        )
+    except Exception as e:
+        return [(job.input_file, str(e), False) for job in jobs]
+
+# Gebündelte Jobs: Backend -> Runner für eine Liste gleichartiger Jobs
+BATCH_RUNNERS = {'docling': run_docling_batch, 'pandoc': run_pandoc_batch}
+
+# Für Jobs mit mehreren Formaten entscheidet das teuerste Backend über die Queue
+ENGINE_COST_ORDER = ['docling', 'libreoffice', 'raster', 'pandoc', 'epub', 'svg', 'image']
+
+def default_engine_limits(max_workers: int) -> Dict[str, int]:
+    """Parallelitäts-Limits pro Backend (keins über max_workers)"""
+    cpu_count = min(mp.cpu_count(), max_workers)
+    return {
+        'image': cpu_count,                 # Pillow: billig, CPU-bound
+        'svg': cpu_count,
+        'pandoc': max_workers,
+        'epub': max_workers,
+        'libreoffice': max_workers,         # Subprozess mit eigenem Profil/Speicher
+        'docling': 1,                       # Layout-Modell: speicherintensiv
+        'raster': max_workers,              # pdf2image/poppler, rendert selbst mehrthreadig
+    }
+
+def cap_engine_limits(limits: Dict[str, int], max_workers: int) -> Dict[str, int]:
+    """
+    Begrenzt die Limits der aktiven Backends, sodass ihre Summe max_workers nicht übersteigt
+
+    Jedes Backend hat einen eigenen Prozess-Pool - ohne Deckel liefen Summe-der-Limits
+    Prozesse. Gekürzt wird jeweils das größte Limit; jedes Backend behält mindestens
+    einen Prozess (bei mehr aktiven Backends als Workern also ein Prozess pro Backend).
+    """
+    capped = {engine: max(1, min(limit, max_workers)) for engine, limit in limits.items()}
+    while sum(capped.values()) > max_workers:
+        largest = max(capped, key=capped.get)
+        if capped[largest] <= 1:
+            break
+        capped[largest] -= 1
+    return capped
+
+def format_duration(seconds: float) -> str:
+    """Dauer kurz und lesbar (z.B. '45s', '12min', '2h 05min')"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}min"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}min"
 
 class BatchProcessor:
     """Verarbeitet mehrere Dateien parallel mit Multiprocessing (nicht Threading!)"""
     
-    def __init__(self, max_workers: int = None):
+    def __init__(self, max_workers: int = None, engine_options: dict = None, engine_limits: Dict[str, int] = None,
+                 docling_batch_size: int = 4, estimator=None, pandoc_batch_size: int = 32):
         # PERFORMANCE: Auto-detect optimal worker count
         if max_workers is None:
             max_workers = min(mp.cpu_count(), 4)  # Max 4 für I/O-bound tasks
         self.max_workers = max_workers
+        self.engine_options = engine_options or {}
+        self.engine_limits = default_engine_limits(max_workers)
+        self.engine_limits.update(engine_limits or {})
+        # PERFORMANCE: Jeder Worker-Prozess bearbeitet einen Job zur Zeit - ein eigener Pool
+        # mit N Instanzen pro Worker ergäbe N x Worker soffice-Prozesse. Worker bekommen
+        # daher eine Instanz, und N begrenzt stattdessen die Zahl der LibreOffice-Worker.
+        lo_pool = self.engine_options.get('libreoffice_pool_size', 0)
+        if lo_pool > 0:
+            self.engine_options = dict(self.engine_options, libreoffice_pool_size=1)
+            self.engine_limits['libreoffice'] = min(self.engine_limits.get('libreoffice', max_workers), lo_pool)
+        # PERFORMANCE: PDF-Jobs für Docling werden gebündelt (1 = kein Batching)
+        self.docling_batch_size = max(1, docling_batch_size)
+        # PERFORMANCE: Kleine Markdown/HTML-Jobs gebündelt an den pandoc-Server (nur wenn aktiv)
+        self.pandoc_batch_size = max(1, pandoc_batch_size) if self.engine_options.get('pandoc_server') else 1
+        # PERFORMANCE: Mit ConversionEstimator (Telemetrie) längste Jobs zuerst + ETA
+        self.estimator = estimator
         self.results = []
     
+    def _estimate_job(self, classifier, job: ConversionJob) -> float:
+        """Geschätzte Sekunden für einen Job (0 ohne Estimator oder bei Fehlern)"""
+        if self.estimator is None:
+            return 0.0
+        try:
+            profile = classifier.job_profile(job.input_file, job.output_formats[0])
+        except OSError:
+            return 0.0
+        engines = {fmt: classifier.get_engine(job.input_file, fmt) for fmt in job.output_formats}
+        if len(engines) > 1 and set(engines.values()) == {'docling'}:
+            # Ein Parse für alle Formate - so wird es auch aufgezeichnet
+            parts = [('docling', '+'.join(engines))]
+        else:
+            parts = [(engine, fmt) for fmt, engine in engines.items()]
+        quality = job.options.get('quality', 2)
+        return sum(
+            self.estimator.estimate(engine, profile['input_format'], fmt, profile['input_bytes'],
+                                    profile['pages'], quality)['seconds']
+            for engine, fmt in parts
+        )
+    
+    def _classify(self, classifier, job: ConversionJob) -> Tuple[str, bool]:
+        """(Queue-Engine, bündelbar?) - teuerstes Backend entscheidet"""
+        engines = {classifier.get_engine(job.input_file, fmt) for fmt in job.output_formats}
+        batchable = engines == {'docling'} or (engines == {'pandoc'} and isinstance(job.output_format, str))
+        return min(engines, key=ENGINE_COST_ORDER.index), batchable
+    
+    def estimate_jobs(self, jobs: List[ConversionJob]) -> dict:
+        """
+        Schätzt die Batch-Dauer aus der Telemetrie
+        
+        Backends laufen parallel: Dauer ≈ max(Arbeit pro Backend / Limit des Backends).
+        """
+        from converter_engine import DocumentConverter
+        classifier = DocumentConverter()
+        work = {}
+        for job in jobs:
+            engine, _ = self._classify(classifier, job)
+            work[engine] = work.get(engine, 0.0) + self._estimate_job(classifier, job)
+        sequential = sum(work.values())
+        limits = cap_engine_limits(
+            {engine: self.engine_limits.get(engine, self.max_workers) for engine in work}, self.max_workers
+        )
+        parallel = max((seconds / limits[engine] for engine, seconds in work.items()), default=0.0)
+        return {
+            'sequential_seconds': sequential,
+            'parallel_seconds': parallel,
+            'per_engine_seconds': work,
+            'samples': self.estimator.samples if self.estimator else 0,
+        }
+    
+    def process_jobs(
+        self,
+        jobs: List[ConversionJob],
+        progress_callback: Callable = None
+    ) -> List[Tuple[str, any, bool]]:
+        """
+        Konvertiert Jobs parallel mit Engine-aware Scheduling
+        
+        PERFORMANCE: Jeder Job wird über DocumentConverter.get_engine klassifiziert und
+        landet in einer eigenen, begrenzten Queue pro Backend mit eigenem Prozess-Pool.
+        Ein paar große Docling-PDFs blockieren so keine tausenden Bild-Konvertierungen.
+        PDF-Jobs mit gleichen Formaten/Optionen gehen gebündelt durch Docling convert_all,
+        mit aktivem pandoc-Server Text-Jobs gebündelt durch dessen /batch-Endpunkt.
+        Jeder Worker-Prozess nutzt einen eigenen, wiederverwendeten DocumentConverter.
+        Die Prozesse aller Backends zusammen bleiben bei max_workers (cap_engine_limits).
+        Mit Estimator: pro Backend längste Jobs zuerst (kürzere Gesamtdauer, kein
+        Nachzügler am Ende) und eine ETA in den Fortschrittsmeldungen.
+        """
+        from converter_engine import DocumentConverter
+        
+        results = []
+        total = len(jobs)
+        classifier = DocumentConverter()
+        
+        estimates = {}
+        classified = []
+        for job in jobs:
+            engine, batchable = self._classify(classifier, job)
+            estimates[id(job)] = self._estimate_job(classifier, job)
+            classified.append((job, engine, batchable))
+        if self.estimator is not None:
+            # Stabil sortiert: ohne Daten bleibt die Eingabereihenfolge
+            classified.sort(key=lambda item: estimates[id(item[0])], reverse=True)
+        
+        # Jeder Queue-Eintrag ist eine Liste von Jobs: einzeln, oder ein Docling-/pandoc-Batch
+        batch_sizes = {'docling': self.docling_batch_size, 'pandoc': self.pandoc_batch_size}
+        pending = {}
+        groups = {}
+        for job, engine, batchable in classified:
+            if batch_sizes.get(engine, 1) > 1 and batchable:
+                group_key = (
+                    engine, tuple(job.output_formats), isinstance(job.output_format, str), job.output_dir,
+                    json.dumps(job.options, sort_keys=True, default=str)
+                )
+                group = groups.setdefault(group_key, [])
+                group.append(job)
+                if len(group) < batch_sizes[engine]:
+                    continue
+                del groups[group_key]
+                pending.setdefault(engine, deque()).append(group)
+            else:
+                pending.setdefault(engine, deque()).append([job])
+        for group_key, group in groups.items():
+            pending.setdefault(group_key[0], deque()).append(group)
+        
+        limits = cap_engine_limits(
+            {engine: self.engine_limits.get(engine, self.max_workers) for engine in pending}, self.max_workers
+        )
+        executors = {
+            engine: concurrent.futures.ProcessPoolExecutor(
+                max_workers=limits[engine],
+                initializer=init_worker,
+                initargs=(self.engine_options,)
+            )
+            for engine in pending
+        }
+        in_flight = {}
+        running = {engine: 0 for engine in pending}
+        remaining = {
+            engine: sum(estimates[id(job)] for batch in queue for job in batch)
+            for engine, queue in pending.items()
+        }
+        
+        def eta() -> float:
+            return max(
+                (seconds / limits[engine] for engine, seconds in remaining.items()),
+                default=0.0
+            )
+        
+        def fill(engine):
+            # Begrenzte Queue: max. 2 Einträge pro Worker gleichzeitig eingereicht
+            queue = pending[engine]
+            while queue and running[engine] < limits[engine] * 2:
+                batch = queue.popleft()
+                if len(batch) == 1:
+                    future = executors[engine].submit(self._safe_process, run_conversion_job, batch[0])
+                else:
+                    future = executors[engine].submit(BATCH_RUNNERS[engine], batch)
+                in_flight[future] = (engine, batch)
+                running[engine] += 1
+        
+        try:
+            for engine in pending:
+                fill(engine)
+            
+            done_count = 0
+            while in_flight:
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    engine, batch = in_flight.pop(future)
+                    running[engine] -= 1
+                    
+                    try:
+                        if len(batch) == 1:
+                            result, success = future.result()
+                            batch_results = [(batch[0].input_file, result, success)]
+                        else:
+                            batch_results = future.result()
+                    except Exception as e:
+                        # z.B. BrokenProcessPool wenn ein Worker abstürzt
+                        batch_results = [(job.input_file, str(e), False) for job in batch]
+                    
+                    remaining[engine] = max(0.0, remaining[engine] - sum(estimates[id(job)] for job in batch))
+                    
+                    for file, result, success in batch_results:
+                        results.append((file, result, success))
+                        done_count += 1
+                        if progress_callback:
+                            status = "Verarbeitet" if success else "Fehler"
+                            message = f"{status}: {Path(file).name}"
+                            if self.estimator is not None:
+                                message += f" (noch ~{format_duration(eta())})"
+                            progress_callback(done_count, total, message)
+                    
+                    fill(engine)
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True, cancel_futures=True)
+        
+        return results
+    
     def process_files(
         self, 
         files: List[str], 
@@ -23,6 +336,9 @@ class BatchProcessor:
         """
         Verarbeitet Dateien parallel mit ProcessPoolExecutor (GIL-frei!)
         
+        process_func muss picklebar sein (Funktion auf Modulebene, keine Closure).
+        Für Konvertierungen process_jobs() verwenden.
+        
         PERFORMANCE: Nutzt Multiprocessing statt Threading für CPU-bound tasks
         """
         results = []
@@ -0,0 +1,428 @@
+"""Reproduzierbare Benchmarks: Durchsatz, Latenz (p50/p95) und Peak-Speicher pro Pfad"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from benchmark_corpus import CASES, CorpusGenerator, load_manifest
+
+MODES = ['sequential', 'batch', 'auto']
+
+# Ab dieser Verschlechterung (Anteil) meldet compare eine Regression
+DEFAULT_THRESHOLD = 0.10
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """q-Quantil (0..1) mit linearer Interpolation, None für leere Listen"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _latency_stats(latencies: List[float]) -> dict:
+    return {
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'max': max(latencies) if latencies else None,
+        'mean': sum(latencies) / len(latencies) if latencies else None,
+    }
+
+
+def summarize(samples: List[dict], wall_seconds: float, memory: dict) -> dict:
+    """samples: [{'case', 'seconds', 'success'}] -> Kennzahlen gesamt und pro Fall"""
+    ok = [sample for sample in samples if sample['success']]
+    cases = {}
+    order = [case for case, _, _ in CASES]
+    for case in sorted({sample['case'] for sample in samples}, key=order.index):
+        case_samples = [sample for sample in samples if sample['case'] == case]
+        case_ok = [sample['seconds'] for sample in case_samples if sample['success']]
+        cases[case] = {'files': len(case_samples), 'ok': len(case_ok), **_latency_stats(case_ok)}
+        errors = [sample['error'] for sample in case_samples if sample.get('error')]
+        if errors:
+            cases[case]['first_error'] = errors[0][:300]
+    return {
+        'files': len(samples),
+        'ok': len(ok),
+        'failed': len(samples) - len(ok),
+        'wall_seconds': wall_seconds,
+        'throughput_per_second': len(ok) / wall_seconds if wall_seconds > 0 else None,
+        'latency': _latency_stats([sample['seconds'] for sample in ok]),
+        **memory,
+        'cases': cases,
+    }
+
+
+def _memory() -> dict:
+    """Peak-RSS dieses Prozesses und des größten (beendeten) Kindprozesses"""
+    from instrumentation import peak_rss_bytes
+    children = None
+    try:
+        import resource
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        children = children if sys.platform == 'darwin' else children * 1024
+    except ImportError:
+        pass  # Windows: nur der Hauptprozess
+    return {'peak_rss_bytes': peak_rss_bytes(), 'peak_child_rss_bytes': children or None}
+
+
+def run_sequential(entries: List[dict], output_dir: Path, engine_options: dict, options: dict) -> dict:
+    """Wie cli.py ohne --batch: ein Converter, Dateien nacheinander"""
+    from converter_engine import DocumentConverter
+
+    converter = DocumentConverter(**engine_options)
+    samples = []
+    started = time.perf_counter()
+    try:
+        for entry in entries:
+            job_started = time.perf_counter()
+            sample = {'case': entry['case'], 'success': True}
+            try:
+                converter.convert(entry['path'], entry['output_format'],
+                                  str(output_dir / entry['case']), options)
+            except Exception as e:
+                sample.update(success=False, error=str(e))
+            sample['seconds'] = time.perf_counter() - job_started
+            samples.append(sample)
+    finally:
+        converter.close()
+    return summarize(samples, time.perf_counter() - started, _memory())
+
+
+def run_batch(entries: List[dict], output_dir: Path, engine_options: dict, options: dict, workers: int) -> dict:
+    """
+    BatchProcessor.process_jobs (wie cli.py --batch)
+
+    Latenz = Zeit vom Batch-Start bis das Ergebnis der Datei vorliegt.
+    """
+    from batch_processor import BatchProcessor, ConversionJob
+
+    processor = BatchProcessor(max_workers=workers, engine_options=engine_options)
+    jobs = [
+        ConversionJob(entry['path'], entry['output_format'], str(output_dir / entry['case']), options)
+        for entry in entries
+    ]
+    cases = {entry['path']: entry['case'] for entry in entries}
+    # process_jobs ruft den Callback genau einmal pro Ergebnis, in Ergebnis-Reihenfolge
+    completed = []
+
+    started = time.perf_counter()
+    results = processor.process_jobs(jobs, progress_callback=lambda *_: completed.append(time.perf_counter()))
+    wall = time.perf_counter() - started
+
+    samples = []
+    for (file, result, success), finished in zip(results, completed):
+        sample = {'case': cases[file], 'success': success, 'seconds': finished - started}
+        if not success:
+            sample['error'] = str(result)
+        samples.append(sample)
+    return summarize(samples, wall, _memory())
+
+
+def run_auto(entries: List[dict], work_dir: Path, workers: int, debounce: float, timeout: float) -> dict:
+    """
+    Watch-Folder-Pfad (AutoConvertHandler + watchdog Observer)
+
+    Pro Fall ein Watch-Ordner mit Regel. Latenz = Zeit vom Kopieren der Datei in den
+    Watch-Ordner bis alle Regeln für sie abgeschlossen sind (inkl. Debounce).
+    """
+    from watchdog.observers import Observer
+    from auto_converter import AutoConvertHandler, ConversionRule
+    from watch_state import WatchStateIndex
+
+    finished = {}
+    all_done = threading.Event()
+
+    class TimedHandler(AutoConvertHandler):
+        def _finish(self, file_path: str):
+            super()._finish(file_path)
+            finished.setdefault(file_path, time.perf_counter())
+            if len(finished) >= len(entries):
+                all_done.set()
+
+    watch_root = work_dir / 'watch'
+    rules = {}
+    for case, ext, target in CASES:
+        if any(entry['case'] == case for entry in entries):
+            (watch_root / case).mkdir(parents=True, exist_ok=True)
+            rules[case] = ConversionRule(str(watch_root / case), [f'.{ext}'], target,
+                                         str(work_dir / 'output' / case))
+
+    state = WatchStateIndex(str(work_dir / 'state.sqlite'))
+    handler = TimedHandler(list(rules.values()), workers, debounce, state=state)
+    handler.start()
+    observer = Observer()
+    for rule in rules.values():
+        observer.schedule(handler, rule.watch_dir, recursive=False)
+    observer.start()
+
+    copied = {}
+    started = time.perf_counter()
+    try:
+        for entry in entries:
+            destination = os.path.abspath(watch_root / entry['case'] / Path(entry['path']).name)
+            copied[destination] = (entry['case'], time.perf_counter())
+            shutil.copyfile(entry['path'], destination)
+        all_done.wait(timeout)
+        wall = max(finished.values(), default=time.perf_counter()) - started
+    finally:
+        observer.stop()
+        observer.join()
+        handler.stop()
+
+    samples = []
+    for path, (case, copied_at) in copied.items():
+        done = finished.get(path)
+        success = done is not None and state.lookup(path, rules[case].state_key) is not None
+        sample = {'case': case, 'success': success, 'seconds': (done or started + wall) - copied_at}
+        if done is None:
+            sample['error'] = f"Timeout nach {timeout}s"
+        elif not success:
+            sample['error'] = 'Konvertierung fehlgeschlagen'
+        samples.append(sample)
+    state.close()
+    return summarize(samples, wall, _memory())
+
+
+def _run_mode(mode: str, entries: List[dict], work_dir: str, config: dict, connection):
+    """Läuft in einem frischen Prozess, damit Peak-RSS und geladene Engines nicht überlappen"""
+    work_path = Path(work_dir)
+    try:
+        if mode == 'sequential':
+            result = run_sequential(entries, work_path / 'output', config['engine_options'], config['options'])
+        elif mode == 'batch':
+            result = run_batch(entries, work_path / 'output', config['engine_options'], config['options'],
+                               config['workers'])
+        else:
+            result = run_auto(entries, work_path, config['workers'], config['debounce'], config['timeout'])
+        connection.send(result)
+    except Exception as e:
+        connection.send({'error': f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+
+def _git_revision() -> dict:
+    root = Path(__file__).resolve().parent
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return {'commit': commit, 'dirty': dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+
+def run_benchmark(corpus_dir: str, modes: List[str] = None, workers: int = 4, engine_options: dict = None,
+                  options: dict = None, debounce: float = 0.2, timeout: float = 600.0,
+                  cases: List[str] = None) -> dict:
+    """Führt alle Modi über denselben Korpus aus und gibt das Ergebnis-Dokument zurück"""
+    manifest = load_manifest(corpus_dir)
+    entries = [
+        {**entry, 'path': str((Path(corpus_dir) / entry['input']).resolve())}
+        for entry in manifest['entries']
+        if cases is None or entry['case'] in cases
+    ]
+    config = {
+        'workers': workers,
+        'engine_options': engine_options or {},
+        'options': options or {},
+        'debounce': debounce,
+        'timeout': timeout,
+    }
+
+    context = mp.get_context('spawn')
+    results = {}
+    for mode in modes or MODES:
+        with tempfile.TemporaryDirectory(prefix=f'bench_{mode}_') as work_dir:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_run_mode, args=(mode, entries, work_dir, config, sender))
+            process.start()
+            sender.close()
+            try:
+                results[mode] = receiver.recv()
+            except EOFError:
+                results[mode] = {'error': f"Prozess beendet mit Code {process.exitcode}"}
+            process.join()
+
+    return {
+        'format': 1,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        **_git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'corpus': {key: manifest[key] for key in ('seed', 'pages', 'image_size', 'files_per_case')},
+        'config': {key: value for key, value in config.items() if key != 'timeout'},
+        'modes': results,
+    }
+
+
+def _change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if not old or new is None:
+        return None
+    return (new - old) / old
+
+
+def compare(old: dict, new: dict, threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """
+    Vergleicht zwei Ergebnis-Dokumente pro Modus und Fall
+
+    Regression = Durchsatz um mehr als threshold gesunken bzw. p50/p95/Peak-RSS
+    um mehr als threshold gestiegen.
+    """
+    rows = []
+    for mode, new_stats in new.get('modes', {}).items():
+        old_stats = old.get('modes', {}).get(mode)
+        if not old_stats or 'error' in old_stats or 'error' in new_stats:
+            continue
+        pairs = [('', old_stats, new_stats)] + [
+            (case, old_stats['cases'][case], stats)
+            for case, stats in new_stats.get('cases', {}).items()
+            if case in old_stats.get('cases', {})
+        ]
+        for case, before, after in pairs:
+            metrics = {
+                'p50': (before.get('p50', before.get('latency', {}).get('p50')),
+                        after.get('p50', after.get('latency', {}).get('p50'))),
+                'p95': (before.get('p95', before.get('latency', {}).get('p95')),
+                        after.get('p95', after.get('latency', {}).get('p95'))),
+            }
+            if not case:
+                metrics['throughput'] = (before['throughput_per_second'], after['throughput_per_second'])
+                metrics['peak_rss'] = (before.get('peak_rss_bytes'), after.get('peak_rss_bytes'))
+            for metric, (value_before, value_after) in metrics.items():
+                change = _change(value_before, value_after)
+                if change is None:
+                    continue
+                worse = -change if metric == 'throughput' else change
+                rows.append({
+                    'mode': mode, 'case': case or 'gesamt', 'metric': metric,
+                    'old': value_before, 'new': value_after, 'change': change,
+                    'regression': worse > threshold,
+                })
+    return rows
+
+
+def _format_value(metric: str, value: float) -> str:
+    if metric == 'peak_rss':
+        return f"{value / (1024 * 1024):.0f} MB"
+    if metric == 'throughput':
+        return f"{value:.2f}/s"
+    return f"{value * 1000:.0f} ms"
+
+
+def print_summary(document: dict):
+    for mode, stats in document['modes'].items():
+        if 'error' in stats:
+            print(f"\n❌ {mode}: {stats['error']}")
+            continue
+        latency = stats['latency']
+        print(f"\n📊 {mode}: {stats['ok']}/{stats['files']} ok in {stats['wall_seconds']:.2f}s")
+        if stats['ok']:
+            print(f"   Durchsatz: {stats['throughput_per_second']:.2f} Dateien/s")
+            print(f"   Latenz: p50 {latency['p50'] * 1000:.0f} ms, p95 {latency['p95'] * 1000:.0f} ms")
+        if stats.get('peak_rss_bytes'):
+            print(f"   Peak-RSS: {stats['peak_rss_bytes'] / (1024 * 1024):.0f} MB"
+                  + (f" (Worker: {stats['peak_child_rss_bytes'] / (1024 * 1024):.0f} MB)"
+                     if stats.get('peak_child_rss_bytes') else ''))
+        for case, case_stats in stats['cases'].items():
+            marker = '✅' if case_stats['ok'] == case_stats['files'] else '⚠️'
+            p50 = f"p50 {case_stats['p50'] * 1000:.0f} ms" if case_stats['p50'] is not None else '-'
+            print(f"   {marker} {case:<18} {case_stats['ok']}/{case_stats['files']}  {p50}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='📊 Universal Document Converter - Benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Deterministischen Korpus erzeugen')
+    generate.add_argument('corpus', help='Zielordner')
+    generate.add_argument('--files', type=int, default=5, help='Dateien pro Fall (Standard: 5)')
+    generate.add_argument('--pages', type=int, default=3, help='Seiten/Kapitel pro Dokument (Standard: 3)')
+    generate.add_argument('--image-size', type=int, default=1024, help='Bildbreite in Pixeln (Standard: 1024)')
+    generate.add_argument('--seed', type=int, default=0, help='Seed (Standard: 0)')
+
+    run = commands.add_parser('run', help='Benchmark ausführen')
+    run.add_argument('--corpus', default=None, help='Korpus-Ordner (Standard: temporär erzeugen)')
+    run.add_argument('--files', type=int, default=5, help='Dateien pro Fall beim Erzeugen (Standard: 5)')
+    run.add_argument('--pages', type=int, default=3, help='Seiten pro Dokument beim Erzeugen (Standard: 3)')
+    run.add_argument('--image-size', type=int, default=1024,
+                     help='Bildbreite in Pixeln beim Erzeugen (Standard: 1024)')
+    run.add_argument('--seed', type=int, default=0, help='Seed beim Erzeugen (Standard: 0)')
+    run.add_argument('--mode', action='append', choices=MODES, help='Nur diese Modi (mehrfach möglich)')
+    run.add_argument('--case', action='append', choices=[case for case, _, _ in CASES],
+                     help='Nur diese Fälle (mehrfach möglich)')
+    run.add_argument('--workers', type=int, default=4, help='Worker für batch/auto (Standard: 4)')
+    run.add_argument('--lo-pool', type=int, default=0, metavar='N', help='Persistente LibreOffice-Instanzen')
+    run.add_argument('--quality', type=int, choices=[1, 2, 3], default=2, help='Qualität (Standard: 2)')
+    run.add_argument('--debounce', type=float, default=0.2, help='Debounce im auto-Modus (Standard: 0.2s)')
+    run.add_argument('--timeout', type=float, default=600, help='Max. Wartezeit im auto-Modus (Sekunden)')
+    run.add_argument('-o', '--output', default=None,
+                     help='Ergebnis-JSON (Standard: benchmarks/<commit>.json)')
+
+    cmp = commands.add_parser('compare', help='Zwei Ergebnis-Dateien vergleichen')
+    cmp.add_argument('old', help='Ergebnis vorher (JSON)')
+    cmp.add_argument('new', help='Ergebnis nachher (JSON)')
+    cmp.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                     help='Regressionsschwelle als Anteil (Standard: 0.10 = 10%%)')
+
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        manifest = CorpusGenerator(args.corpus, args.seed, args.pages, args.image_size).generate(args.files)
+        print(f"✅ {len(manifest['entries'])} Dateien in {args.corpus}")
+        return 0
+
+    if args.command == 'compare':
+        with open(args.old, 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.new, 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        rows = compare(old, new, args.threshold)
+        regressions = 0
+        for row in rows:
+            marker = '❌' if row['regression'] else '  '
+            regressions += row['regression']
+            print(f"{marker} {row['mode']:<10} {row['case']:<18} {row['metric']:<10} "
+                  f"{_format_value(row['metric'], row['old']):>10} → {_format_value(row['metric'], row['new']):>10} "
+                  f"({row['change'] * 100:+.1f}%)")
+        print(f"\n{'❌' if regressions else '✅'} {regressions} Regression(en) über {args.threshold * 100:.0f}%")
+        return 1 if regressions else 0
+
+    with tempfile.TemporaryDirectory(prefix='bench_corpus_') as temp_corpus:
+        corpus = args.corpus
+        if corpus is None:
+            corpus = temp_corpus
+            print(f"⏳ Erzeuge Korpus ({args.files} Dateien pro Fall, {args.pages} Seiten)...")
+            CorpusGenerator(corpus, args.seed, args.pages, args.image_size).generate(args.files)
+        document = run_benchmark(
+            corpus, args.mode, args.workers,
+            engine_options={'libreoffice_pool_size': args.lo_pool},
+            options={'quality': args.quality},
+            debounce=args.debounce, timeout=args.timeout, cases=args.case
+        )
+
+    print_summary(document)
+    output = args.output or str(Path('benchmarks') / f"{(document['commit'] or 'local')[:12]}.json")
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    Path(output).write_text(json.dumps(document, indent=2), encoding='utf-8')
+    print(f"\n💾 Ergebnis: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""Deterministischer Test-Korpus für Benchmarks (gleicher Seed = byte-identische Dateien)"""
+import json
+import random
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Ein Fall pro Strategie in DocumentConverter.convert: (Name, Eingabe-Endung, Zielformat)
+CASES = [
+    ('image_format', 'png', 'jpg'),
+    ('image_format_gif', 'gif', 'png'),
+    ('image_pdf', 'jpg', 'pdf'),
+    ('svg_png', 'svg', 'png'),
+    ('svg_pdf', 'svg', 'pdf'),
+    ('epub_html', 'epub', 'html'),
+    ('epub_pdf', 'epub', 'pdf'),
+    ('pandoc_html', 'md', 'html'),
+    ('pandoc_docx', 'md', 'docx'),
+    ('pandoc_pdf', 'md', 'pdf'),
+    ('html_markdown', 'html', 'markdown'),
+    ('libreoffice_pdf', 'docx', 'pdf'),
+    ('docling_markdown', 'pdf', 'markdown'),
+    ('pdf_image', 'pdf', 'png'),
+    ('document_image', 'docx', 'png'),
+]
+
+MANIFEST_NAME = 'manifest.json'
+
+# Feste Zeitstempel in ZIP-Containern (DOCX/EPUB), sonst wäre jede Generierung anders
+ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+WORDS = (
+    'daten format seite tabelle bild dokument analyse ergebnis bericht kapitel '
+    'abschnitt wert zeile spalte quelle ziel qualität leistung speicher datei '
+    'konvertierung prozess messung schnell langsam groß klein text inhalt'
+).split()
+
+
+class CorpusGenerator:
+    """
+    Erzeugt pro Fall files_per_case Dateien mit pages Seiten/Kapiteln
+
+    Alle Inhalte kommen aus einem random.Random(seed) pro Datei - unabhängig von
+    Reihenfolge und Anzahl der übrigen Fälle. Außer Pillow (für Rasterbilder) wird
+    keine Bibliothek gebraucht: PDF, DOCX, EPUB und SVG werden direkt geschrieben.
+    """
+
+    def __init__(self, output_dir: str, seed: int = 0, pages: int = 3, image_size: int = 1024):
+        self.output_dir = Path(output_dir)
+        self.seed = seed
+        self.pages = max(1, pages)
+        self.image_size = max(16, image_size)
+
+    def _rng(self, case: str, index: int) -> random.Random:
+        return random.Random(f"{self.seed}:{case}:{index}")
+
+    @staticmethod
+    def _sentence(rng: random.Random, words: int = 12) -> str:
+        text = ' '.join(rng.choice(WORDS) for _ in range(words))
+        return text[0].upper() + text[1:] + '.'
+
+    def _paragraphs(self, rng: random.Random, count: int = 4) -> List[str]:
+        return [' '.join(self._sentence(rng, rng.randint(8, 16)) for _ in range(5)) for _ in range(count)]
+
+    def generate(self, files_per_case: int = 5, cases: Optional[List[str]] = None) -> dict:
+        """Schreibt den Korpus samt manifest.json und gibt das Manifest zurück"""
+        selected = [case for case in CASES if cases is None or case[0] in cases]
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for case, ext, target in selected:
+            case_dir = self.output_dir / case
+            case_dir.mkdir(exist_ok=True)
+            for index in range(files_per_case):
+                path = case_dir / f"{case}_{index:04d}.{ext}"
+                self._write(ext, path, self._rng(case, index))
+                entries.append({'case': case, 'input': str(path.relative_to(self.output_dir)),
+                                'output_format': target})
+
+        manifest = {
+            'seed': self.seed,
+            'pages': self.pages,
+            'image_size': self.image_size,
+            'files_per_case': files_per_case,
+            'entries': entries,
+        }
+        (self.output_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        return manifest
+
+    def _write(self, ext: str, path: Path, rng: random.Random):
+        writers = {
+            'png': self._write_image, 'jpg': self._write_image, 'gif': self._write_image,
+            'svg': self._write_svg, 'epub': self._write_epub, 'md': self._write_markdown,
+            'html': self._write_html, 'docx': self._write_docx, 'pdf': self._write_pdf,
+        }
+        writers[ext](path, rng)
+
+    def _write_image(self, path: Path, rng: random.Random):
+        from PIL import Image, ImageDraw
+
+        size = self.image_size
+        img = Image.new('RGB', (size, size * 3 // 4), (255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        for _ in range(60):
+            x0, y0 = rng.randrange(size), rng.randrange(size * 3 // 4)
+            x1, y1 = x0 + rng.randint(10, size // 3), y0 + rng.randint(10, size // 4)
+            color = tuple(rng.randrange(256) for _ in range(3))
+            if rng.random() < 0.5:
+                draw.rectangle((x0, y0, x1, y1), fill=color)
+            else:
+                draw.ellipse((x0, y0, x1, y1), fill=color)
+        formats = {'.png': 'PNG', '.jpg': 'JPEG', '.gif': 'GIF'}
+        img.save(path, formats[path.suffix])
+
+    def _write_svg(self, path: Path, rng: random.Random):
+        width, height = 800, 600
+        shapes = []
+        for _ in range(40):
+            color = '#%02x%02x%02x' % tuple(rng.randrange(256) for _ in range(3))
+            x, y = rng.randrange(width), rng.randrange(height)
+            if rng.random() < 0.5:
+                shapes.append(f'<rect x="{x}" y="{y}" width="{rng.randint(10, 200)}" '
+                              f'height="{rng.randint(10, 150)}" fill="{color}"/>')
+            else:
+                shapes.append(f'<circle cx="{x}" cy="{y}" r="{rng.randint(5, 80)}" fill="{color}"/>')
+        shapes.append(f'<text x="20" y="40" font-size="24">{self._sentence(rng, 5)}</text>')
+        path.write_text(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">'
+            + ''.join(shapes) + '</svg>',
+            encoding='utf-8'
+        )
+
+    def _markdown(self, rng: random.Random) -> str:
+        lines = []
+        for page in range(1, self.pages + 1):
+            lines.append(f"# Kapitel {page}: {self._sentence(rng, 3)[:-1]}\n")
+            lines.extend(paragraph + '\n' for paragraph in self._paragraphs(rng))
+            lines.extend(f"- {self._sentence(rng, 6)}" for _ in range(4))
+            lines.append('\n| Spalte A | Spalte B | Wert |\n|---|---|---|')
+            lines.extend(f"| {rng.choice(WORDS)} | {rng.choice(WORDS)} | {rng.randint(0, 9999)} |" for _ in range(6))
+            lines.append('\n```python\nfor i in range(10):\n    print(i)\n```\n')
+        return '\n'.join(lines) + '\n'
+
+    def _write_markdown(self, path: Path, rng: random.Random):
+        path.write_text(self._markdown(rng), encoding='utf-8')
+
+    def _html_body(self, rng: random.Random) -> str:
+        parts = []
+        for page in range(1, self.pages + 1):
+            parts.append(f"<h1>Kapitel {page}</h1>")
+            parts.extend(f"<p>{paragraph}</p>" for paragraph in self._paragraphs(rng))
+            rows = ''.join(
+                f"<tr><td>{rng.choice(WORDS)}</td><td>{rng.randint(0, 9999)}</td></tr>" for _ in range(6)
+            )
+            parts.append(f"<table>{rows}</table>")
+        return '\n'.join(parts)
+
+    def _write_html(self, path: Path, rng: random.Random):
+        path.write_text(
+            '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Benchmark</title></head><body>\n'
+            + self._html_body(rng) + '\n</body></html>\n',
+            encoding='utf-8'
+        )
+
+    @staticmethod
+    def _write_zip(path: Path, members: List[tuple]):
+        """members: [(name, inhalt, komprimieren)] in genau dieser Reihenfolge"""
+        with zipfile.ZipFile(path, 'w') as archive:
+            for name, content, compress in members:
+                info = zipfile.ZipInfo(name, date_time=ZIP_DATE)
+                info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+                archive.writestr(info, content)
+
+    def _write_docx(self, path: Path, rng: random.Random):
+        from xml.sax.saxutils import escape
+
+        body = []
+        for page in range(1, self.pages + 1):
+            if page > 1:
+                body.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+            body.append(f'<w:p><w:r><w:rPr><w:b/><w:sz w:val="32"/></w:rPr><w:t>Kapitel {page}</w:t></w:r></w:p>')
+            body.extend(
+                f'<w:p><w:r><w:t xml:space="preserve">{escape(paragraph)}</w:t></w:r></w:p>'
+                for paragraph in self._paragraphs(rng)
+            )
+        document = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{"".join(body)}</w:body></w:document>'
+        )
+        content_types = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        )
+        rels = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="word/document.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>'
+        )
+        self._write_zip(path, [
+            ('[Content_Types].xml', content_types, True),
+            ('_rels/.rels', rels, True),
+            ('word/document.xml', document, True),
+        ])
+
+    def _write_epub(self, path: Path, rng: random.Random):
+        chapters = []
+        for page in range(1, self.pages + 1):
+            body = f"<h1>Kapitel {page}</h1>" + ''.join(f"<p>{p}</p>" for p in self._paragraphs(rng))
+            chapters.append((
+                f"chapter{page}.xhtml",
+                '<?xml version="1.0" encoding="utf-8"?>\n'
+                '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Kapitel</title></head>'
+                f'<body>{body}</body></html>'
+            ))
+        manifest = ''.join(
+            f'<item id="c{i}" href="{name}" media-type="application/xhtml+xml"/>'
+            for i, (name, _) in enumerate(chapters)
+        )
+        spine = ''.join(f'<itemref idref="c{i}"/>' for i in range(len(chapters)))
+        nav_points = ''.join(
+            f'<navPoint id="n{i}" playOrder="{i + 1}"><navLabel><text>Kapitel {i + 1}</text></navLabel>'
+            f'<content src="{name}"/></navPoint>'
+            for i, (name, _) in enumerate(chapters)
+        )
+        opf = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="2.0" unique-identifier="id">'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+            f'<dc:identifier id="id">benchmark-{path.stem}</dc:identifier>'
+            '<dc:title>Benchmark</dc:title><dc:language>de</dc:language></metadata>'
+            f'<manifest><item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>{manifest}</manifest>'
+            f'<spine toc="ncx">{spine}</spine></package>'
+        )
+        ncx = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">'
+            f'<head><meta name="dtb:uid" content="benchmark-{path.stem}"/></head>'
+            f'<docTitle><text>Benchmark</text></docTitle><navMap>{nav_points}</navMap></ncx>'
+        )
+        container = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+            '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>'
+            '</rootfiles></container>'
+        )
+        self._write_zip(path, [
+            ('mimetype', 'application/epub+zip', False),  # Erster Eintrag, unkomprimiert
+            ('META-INF/container.xml', container, True),
+            ('OEBPS/content.opf', opf, True),
+            ('OEBPS/toc.ncx', ncx, True),
+        ] + [(f"OEBPS/{name}", content, True) for name, content in chapters])
+
+    def _write_pdf(self, path: Path, rng: random.Random):
+        """Text-PDF mit pages Seiten (Helvetica, korrekte xref-Tabelle)"""
+        def literal(text: str) -> str:
+            return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+        page_count = self.pages
+        # Objekte: 1 Catalog, 2 Pages, 3 Font, dann je Seite (Page, Content)
+        kids = ' '.join(f"{4 + 2 * i} 0 R" for i in range(page_count))
+        objects = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            f'<< /Type /Pages /Kids [{kids}] /Count {page_count} >>'.encode('ascii'),
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        ]
+        for i in range(page_count):
+            lines = [f"BT /F1 18 Tf 72 770 Td (Kapitel {i + 1}) Tj ET"]
+            y = 740
+            while y > 72:
+                sentence = self._sentence(rng, 10).encode('ascii', 'replace').decode('ascii')
+                lines.append(f"BT /F1 10 Tf 72 {y} Td ({literal(sentence)}) Tj ET")
+                y -= 14
+            stream = '\n'.join(lines).encode('ascii')
+            objects.append(
+                f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>'.encode('ascii')
+            )
+            objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+
+        data = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(data))
+            data += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+        xref = len(data)
+        data += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        data += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        data += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+        path.write_bytes(bytes(data))
+
+
+def load_manifest(corpus_dir: str) -> Dict:
+    """Liest manifest.json eines Korpus (Eingabepfade relativ zum Korpus-Ordner)"""
+    return json.loads((Path(corpus_dir) / MANIFEST_NAME).read_text(encoding='utf-8'))
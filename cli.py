@@ -4,7 +4,9 @@ import sys
 from pathlib import Path
 from converter_engine import DocumentConverter, ConversionError
 from file_analyzer import FileAnalyzer
-from batch_processor import BatchProcessor
+from batch_processor import BatchProcessor, ConversionJob, format_duration
+from conversion_telemetry import ConversionEstimator
+from pdf_assembler import natural_sort_key
 import glob
 
 def main():
@@ -18,35 +20,70 @@ Beispiele:
   %(prog)s file.docx -f pdf --quality high        # Hohe Qualität
   %(prog)s document.pdf --analyze                 # Datei analysieren
   %(prog)s *.jpg -f pdf --batch                   # Batch-Konvertierung
+  %(prog)s document.pdf -f png --pages all         # Alle Seiten als PNG
+  %(prog)s document.pdf -f markdown -f html -f docx  # Mehrere Formate, ein Parse
+  %(prog)s "scans/*.jpg" --merge scan.pdf           # Alle Bilder in ein PDF
         """
     )
     
     parser.add_argument('input', nargs='+', help='Eingabedatei(en) oder Muster (z.B. *.pdf)')
-    parser.add_argument('-f', '--format', required=True, 
-                       choices=['pdf', 'docx', 'pptx', 'html', 'markdown', 'odt'],
-                       help='Zielformat')
+    parser.add_argument('-f', '--format', action='append',
+                       choices=['pdf', 'docx', 'pptx', 'html', 'markdown', 'odt', 'jpg', 'png'],
+                       help='Zielformat (mehrfach angeben für mehrere Formate)')
     parser.add_argument('-o', '--output', default='./converted',
                        help='Ausgabeordner (Standard: ./converted)')
     parser.add_argument('--quality', choices=['low', 'medium', 'high'], default='medium',
                        help='Konvertierungsqualität')
     parser.add_argument('--ocr', action='store_true',
                        help='OCR für gescannte PDFs aktivieren')
+    parser.add_argument('--pages', default=None, metavar='BEREICH',
+                       help="Seiten bzw. Frames für Bild-Ausgabe: 'all', '5' oder '3-10' (Standard: nur erste Seite)")
+    parser.add_argument('--max-size', type=int, default=None, metavar='PX',
+                       help='Bilder auf höchstens PX Pixel (längste Seite) verkleinern - JPEGs werden '
+                            'direkt verkleinert dekodiert')
+    parser.add_argument('--merge', default=None, metavar='DATEI',
+                       help='Alle Eingabebilder in Reihenfolge zu einem PDF zusammenfügen '
+                            '(JPEGs ohne Neukodierung)')
     parser.add_argument('--analyze', action='store_true',
                        help='Nur Datei-Analyse, keine Konvertierung')
     parser.add_argument('--batch', action='store_true',
                        help='Batch-Modus mit Parallelverarbeitung')
     parser.add_argument('--workers', type=int, default=4,
-                       help='Anzahl paralleler Worker (Standard: 4)')
+                       help='Anzahl paralleler Worker-Prozesse über alle Backends (Standard: 4)')
+    parser.add_argument('--engine-limit', action='append', default=[], metavar='ENGINE=N',
+                       help='Parallelität pro Backend im Batch-Modus, z.B. docling=2 (mehrfach möglich)')
+    parser.add_argument('--docling-batch-size', type=int, default=4, metavar='N',
+                       help='PDFs pro Docling-Durchlauf im Batch-Modus (Standard: 4, 1 = aus)')
+    parser.add_argument('--lo-pool', type=int, default=0, metavar='N',
+                       help='N persistente LibreOffice-Instanzen nutzen (Standard: 0 = aus); im Batch '
+                            'höchstens N LibreOffice-Worker mit je einer Instanz')
+    parser.add_argument('--pandoc-server', action='store_true',
+                       help='Persistenten pandoc-Server statt eines pandoc-Prozesses pro Dokument nutzen '
+                            '(pandoc >= 3.0, Fallback: pandoc-CLI)')
+    parser.add_argument('--pandoc-batch-size', type=int, default=32, metavar='N',
+                       help='Text-Dokumente pro pandoc-Server-Request im Batch-Modus (Standard: 32)')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Ergebnis-Cache in diesem Ordner aktivieren')
+    parser.add_argument('--cache-size', type=int, default=1024, metavar='MB',
+                       help='Maximale Cache-Größe in MB (Standard: 1024)')
+    parser.add_argument('--telemetry', default=None, metavar='DATEI',
+                       help='Messwerte jeder Konvertierung als JSON Lines anhängen; im Batch-Modus '
+                            'daraus ETA und Reihenfolge (längste Jobs zuerst) ableiten')
+    parser.add_argument('--metrics', default=None, metavar='DATEI',
+                       help='Zeiten pro Stufe, Cache-Treffer, Fallbacks und Peak-RSS pro Job '
+                            'als JSON Lines in DATEI schreiben')
     parser.add_argument('-v', '--verbose', action='store_true',
                        help='Ausführliche Ausgabe')
     
     args = parser.parse_args()
+    if not args.format and not args.merge and not args.analyze:
+        parser.error("-f/--format ist erforderlich (außer mit --merge oder --analyze)")
     
     # Dateien sammeln (Wildcards expandieren)
     files = []
     for pattern in args.input:
         if '*' in pattern or '?' in pattern:
-            files.extend(glob.glob(pattern))
+            files.extend(sorted(glob.glob(pattern), key=natural_sort_key))
         else:
             files.append(pattern)
     
@@ -73,11 +110,41 @@ Beispiele:
         'ocr': args.ocr,
         'preserve_layout': True
     }
+    if args.pages:
+        options['pages'] = args.pages
+    if args.max_size:
+        options['max_dimension'] = args.max_size
+    
+    engine_options = {
+        'libreoffice_pool_size': args.lo_pool,
+        'pandoc_server': args.pandoc_server,
+        'cache_dir': args.cache_dir,
+        'cache_max_mb': args.cache_size,
+        'telemetry_path': args.telemetry,
+        'metrics_path': args.metrics
+    }
+    
+    if args.merge:
+        return merge_images(files, args.merge, options, engine_options)
+    
+    engine_limits = {}
+    for spec in args.engine_limit:
+        engine, _, limit = spec.partition('=')
+        if not limit.isdigit():
+            print(f"❌ Ungültiges Engine-Limit: {spec} (erwartet ENGINE=N)")
+            return 1
+        engine_limits[engine.strip().lower()] = int(limit)
+    
+    # Mehrere Formate: Liste (ein Docling-Parse für alle), sonst einzelnes Format
+    formats = list(dict.fromkeys(args.format))
+    target = formats[0] if len(formats) == 1 else formats
     
     if args.batch and len(files) > 1:
-        return batch_convert(files, args.format, args.output, options, args.workers, args.verbose)
+        return batch_convert(files, target, args.output, options, args.workers, args.verbose,
+                             engine_options, engine_limits, args.docling_batch_size, args.telemetry,
+                             args.pandoc_batch_size)
     else:
-        return sequential_convert(files, args.format, args.output, options, args.verbose)
+        return sequential_convert(files, target, args.output, options, args.verbose, engine_options)
 
 def analyze_files(files, verbose):
     """Analysiert Dateien"""
@@ -85,8 +152,11 @@ def analyze_files(files, verbose):
     
     print("\n📊 Datei-Analyse\n" + "="*50)
     
+    # PERFORMANCE: Parallel analysieren, Ausgabe in Eingabe-Reihenfolge
+    results = analyzer.batch_analyze(files)
+    
     for file in files:
-        info = analyzer.analyze(file)
+        info = results[file]
         print(f"\n📄 {info['name']}")
         print(f"   Größe: {info['size']}")
         print(f"   Typ: {info['extension']}")
@@ -102,50 +172,95 @@ def analyze_files(files, verbose):
     
     return 0
 
-def sequential_convert(files, format, output_dir, options, verbose):
+def merge_images(files, output_file, options, engine_options=None):
+    """Fügt Bilder zu einem PDF zusammen"""
+    converter = DocumentConverter(**(engine_options or {}))
+    print(f"\n📎 Füge {len(files)} Bild(er) zu einem PDF zusammen...\n")
+    try:
+        output = converter.images_to_pdf(files, output_file, options)
+    except ConversionError as e:
+        print(f"❌ Fehler: {e}")
+        return 1
+    finally:
+        converter.close()
+    print(f"✅ → {output}")
+    return 0
+
+def _format_label(format):
+    """Zielformat(e) für die Ausgabe"""
+    if isinstance(format, list):
+        return ', '.join(f.upper() for f in format)
+    return format.upper()
+
+def sequential_convert(files, format, output_dir, options, verbose, engine_options=None):
     """Sequentielle Konvertierung"""
-    converter = DocumentConverter()
+    converter = DocumentConverter(**(engine_options or {}))
     success_count = 0
     
-    print(f"\n🔄 Konvertiere zu {format.upper()}...\n")
-    
-    for i, file in enumerate(files, 1):
-        try:
-            if verbose:
-                print(f"[{i}/{len(files)}] {Path(file).name}...", end=' ')
-            else:
-                print(f"[{i}/{len(files)}] {Path(file).name}")
-            
-            output = converter.convert(file, format, output_dir, options)
-            
-            if verbose:
-                print(f"✅ → {Path(output).name}")
-            
-            success_count += 1
-            
-        except ConversionError as e:
-            print(f"❌ Fehler: {e}")
+    print(f"\n🔄 Konvertiere zu {_format_label(format)}...\n")
+    
+    try:
+        for i, file in enumerate(files, 1):
+            try:
+                if verbose:
+                    print(f"[{i}/{len(files)}] {Path(file).name}...", end=' ')
+                else:
+                    print(f"[{i}/{len(files)}] {Path(file).name}")
+                
+                if isinstance(format, list):
+                    outputs = converter.convert_multi(file, format, output_dir, options)
+                    output = ', '.join(Path(o).name for o in outputs.values())
+                else:
+                    output = Path(converter.convert(file, format, output_dir, options)).name
+                
+                if verbose:
+                    print(f"✅ → {output}")
+                
+                success_count += 1
+                
+            except ConversionError as e:
+                print(f"❌ Fehler: {e}")
+    finally:
+        converter.close()
     
     print(f"\n✨ Fertig! {success_count}/{len(files)} erfolgreich konvertiert")
     print(f"📁 Ausgabe: {output_dir}")
     
     return 0 if success_count == len(files) else 1
 
-def batch_convert(files, format, output_dir, options, workers, verbose):
+def batch_convert(files, format, output_dir, options, workers, verbose, engine_options=None, engine_limits=None,
+                  docling_batch_size=4, telemetry_path=None, pandoc_batch_size=32):
     """Parallele Batch-Konvertierung"""
-    converter = DocumentConverter()
-    processor = BatchProcessor(max_workers=workers)
+    # Schätzungen nur, wenn schon Messwerte vorliegen
+    estimator = None
+    if telemetry_path and Path(telemetry_path).exists():
+        estimator = ConversionEstimator.from_telemetry(telemetry_path)
+        if not estimator.samples:
+            estimator = None
+    
+    processor = BatchProcessor(
+        max_workers=workers,
+        engine_options=engine_options,
+        engine_limits=engine_limits,
+        docling_batch_size=docling_batch_size,
+        estimator=estimator,
+        pandoc_batch_size=pandoc_batch_size
+    )
     
     print(f"\n⚡ Batch-Konvertierung ({workers} Worker)...\n")
     
-    def convert_file(file):
-        return converter.convert(file, format, output_dir, options)
+    jobs = [ConversionJob(file, format, output_dir, options) for file in files]
+    
+    if estimator is not None:
+        estimate = processor.estimate_jobs(jobs)
+        print(f"⏱️ Geschätzte Dauer: ~{format_duration(estimate['parallel_seconds'])} "
+              f"(aus {estimate['samples']} Messungen)\n")
     
     def progress(current, total, message):
         if verbose:
             print(f"[{current}/{total}] {message}")
     
-    results = processor.process_files(files, convert_file, progress)
+    results = processor.process_jobs(jobs, progress)
     
     success_count = sum(1 for _, _, success in results if success)
     
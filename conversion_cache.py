@@ -0,0 +1,190 @@
+"""Content-adressierter Cache für Konvertierungsergebnisse"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+class ConversionCache:
+    """
+    On-Disk-Cache für Konvertierungen (Key = Inhalt + Zielformat + Optionen + Engine-Version)
+
+    PERFORMANCE: Identische Dateien (Watch-Folder, CI) werden nur einmal konvertiert.
+    Treffer werden kopiert oder - mit use_hardlinks - per Hardlink in den Ausgabeordner
+    gelegt (Achtung: ein späteres In-Place-Überschreiben der Ausgabe träfe dann auch den
+    Cache-Eintrag). Eviction nach LRU (mtime wird bei jedem Treffer aktualisiert),
+    Schreiben atomar.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024, use_hardlinks: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.use_hardlinks = use_hardlinks
+        self._total_bytes = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def make_key(self, input_file: str, output_format: str, options: dict, engine_version: str) -> str:
+        """Berechnet den Cache-Key für eine Konvertierung"""
+        input_path = Path(input_file)
+        # Optionen normalisieren: Reihenfolge egal, nicht-JSON-Typen als String
+        normalized_options = json.dumps(options or {}, sort_keys=True, default=str)
+        meta = '\0'.join([
+            self._hash_file(input_path),
+            input_path.suffix.lower(),
+            output_format.lower(),
+            normalized_options,
+            engine_version
+        ])
+        return hashlib.sha256(meta.encode('utf-8')).hexdigest()
+
+    def make_bytes_key(self, data: bytes, input_format: str, output_format: str, options: dict,
+                       engine_version: str) -> str:
+        """Cache-Key für eine Konvertierung im Speicher (Inhalt statt Datei)"""
+        normalized_options = json.dumps(options or {}, sort_keys=True, default=str)
+        meta = '\0'.join([
+            hashlib.sha256(data).hexdigest(),
+            '.' + input_format.lower().lstrip('.'),
+            output_format.lower(),
+            normalized_options,
+            engine_version
+        ])
+        return hashlib.sha256(meta.encode('utf-8')).hexdigest()
+
+    def _entry(self, key: str) -> Optional[Path]:
+        shard = self.cache_dir / key[:2]
+        if not shard.is_dir():
+            return None
+        for candidate in shard.glob(f"{key}.*"):
+            if not candidate.name.endswith('.tmp'):
+                return candidate
+        return None
+
+    def get(self, key: str, output_dir: str, stem: str) -> Optional[str]:
+        """Legt bei einem Treffer das Artefakt in output_dir ab und gibt den Pfad zurück"""
+        entry = self._entry(key)
+        if entry is None:
+            return None
+
+        target = Path(output_dir) / f"{stem}{entry.suffix}"
+        target.unlink(missing_ok=True)
+        try:
+            if not self.use_hardlinks:
+                raise OSError
+            os.link(entry, target)
+        except OSError:
+            shutil.copyfile(entry, target)
+
+        try:
+            os.utime(entry)  # LRU-Zeitstempel
+        except OSError:
+            pass
+        return str(target)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Gibt bei einem Treffer den Inhalt des Artefakts zurück"""
+        entry = self._entry(key)
+        if entry is None:
+            return None
+        try:
+            data = entry.read_bytes()
+            os.utime(entry)  # LRU-Zeitstempel
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, artifact: str):
+        """Speichert ein Ergebnis atomar (temp-Datei + os.replace)"""
+        artifact_path = Path(artifact)
+        if not artifact_path.is_file():
+            return
+
+        def write(dst):
+            with open(artifact_path, 'rb') as src:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+
+        self._store(key, artifact_path.suffix, write)
+
+    def put_bytes(self, key: str, data: bytes, suffix: str):
+        """Speichert ein Ergebnis aus dem Speicher (suffix z.B. '.pdf')"""
+        self._store(key, suffix, lambda dst: dst.write(data))
+
+    def _store(self, key: str, suffix: str, write):
+        shard = self.cache_dir / key[:2]
+        shard.mkdir(parents=True, exist_ok=True)
+        final = shard / f"{key}{suffix}"
+
+        fd, temp_name = tempfile.mkstemp(dir=shard, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as dst:
+                write(dst)
+            size = os.path.getsize(temp_name)
+        except OSError:
+            Path(temp_name).unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            try:
+                # Überschriebener Eintrag war schon gezählt - nur die Differenz addieren
+                previous = final.stat().st_size
+            except OSError:
+                previous = 0
+            try:
+                os.replace(temp_name, final)
+            except OSError:
+                Path(temp_name).unlink(missing_ok=True)
+                return
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += size - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _iter_entries(self):
+        for shard in self.cache_dir.iterdir():
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        yield entry
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._iter_entries())
+
+    def _evict(self):
+        """Löscht die am längsten nicht genutzten Einträge bis 90% von max_bytes"""
+        entries = sorted(
+            ((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._iter_entries())
+        )
+        limit = int(self.max_bytes * 0.9)
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def clear(self):
+        """Leert den Cache vollständig"""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._total_bytes = 0
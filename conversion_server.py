@@ -0,0 +1,404 @@
+"""Lokaler HTTP-Konvertierungsdienst mit Job-Queue (hält Engines warm)"""
+import argparse
+import io
+import json
+import mimetypes
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+from converter_engine import DocumentConverter, ConversionError
+from batch_processor import default_engine_limits
+from format_sniffer import SNIFF_BYTES, resolve_format, sniff_bytes
+
+
+class QueueFullError(Exception):
+    """Backend-Queue voll - Client soll es später erneut versuchen (HTTP 429)"""
+    pass
+
+
+class ConversionJobState:
+    """Status eines Konvertierungs-Jobs im Dienst"""
+    def __init__(self, data: bytes, input_format: str, output_format: str, options: dict, engine: str):
+        self.id = uuid.uuid4().hex
+        self.data = data
+        self.input_format = input_format
+        self.output_format = output_format
+        self.options = options
+        self.engine = engine
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'engine': self.engine,
+            'input_format': self.input_format,
+            'output_format': self.output_format,
+            'error': self.error,
+            'created': self.created,
+            'finished': self.finished,
+            'result_available': self.result is not None,
+        }
+
+
+class ConversionService:
+    """
+    Job-Verwaltung für den HTTP-Dienst
+
+    PERFORMANCE: Ein einziger, langlebiger DocumentConverter - Docling-Modelle und
+    LibreOffice-Instanzen bleiben zwischen Requests geladen. Pro Backend gibt es eine
+    begrenzte Queue mit eigenen Worker-Threads; ist sie voll, wird der Request mit
+    429 abgewiesen statt unbegrenzt Speicher zu belegen. Ergebnis-Bytes werden nach
+    dem Abholen bzw. nach result_ttl Sekunden freigegeben, nur die Metadaten bleiben.
+    """
+
+    def __init__(
+        self,
+        engine_options: dict = None,
+        max_workers: int = 4,
+        engine_limits: dict = None,
+        max_queue: int = 64,
+        max_finished_jobs: int = 1000,
+        result_ttl: float = 300.0
+    ):
+        self.converter = DocumentConverter(**(engine_options or {}))
+        self.engine_limits = default_engine_limits(max_workers)
+        self.engine_limits.update(engine_limits or {})
+        self.max_queue = max_queue
+        self.max_finished_jobs = max_finished_jobs
+        self.result_ttl = result_ttl
+        self._queues = {}
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        # Läuft auch ohne neue Requests - sonst blieben nicht abgeholte Ergebnisse ewig im Speicher
+        threading.Thread(target=self._sweep_results, daemon=True).start()
+
+    def warmup(self):
+        """Lädt Engines vorab, damit schon der erste Request nur die Konvertierung kostet"""
+        self.converter.warmup()
+
+    def _get_queue(self, engine: str) -> queue.Queue:
+        with self._lock:
+            job_queue = self._queues.get(engine)
+            if job_queue is None:
+                job_queue = queue.Queue(maxsize=self.max_queue)
+                self._queues[engine] = job_queue
+                for _ in range(max(1, self.engine_limits.get(engine, 1))):
+                    threading.Thread(target=self._worker, args=(job_queue,), daemon=True).start()
+            return job_queue
+
+    def submit(self, data: bytes, input_format: str, output_format: str, options: dict) -> ConversionJobState:
+        """Reiht einen Job ein (QueueFullError bei voller Backend-Queue)"""
+        engine = self.converter.get_engine(f"upload.{input_format}", output_format)
+        job = ConversionJobState(data, input_format, output_format, options, engine)
+        try:
+            self._get_queue(engine).put_nowait(job)
+        except queue.Full:
+            raise QueueFullError(f"Queue für {engine} ist voll")
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim_jobs()
+        return job
+
+    def _expire_results(self):
+        # Nicht abgeholte Ergebnisse nach Ablauf der TTL freigeben (Aufrufer hält self._lock)
+        expired = time.time() - self.result_ttl
+        for job in self._jobs.values():
+            if job.result is not None and job.finished is not None and job.finished < expired:
+                job.result = None
+    
+    def _sweep_results(self):
+        while True:
+            time.sleep(max(1.0, min(self.result_ttl / 2, 60.0)))
+            with self._lock:
+                self._expire_results()
+    
+    def _trim_jobs(self):
+        self._expire_results()
+        # Nur abgeschlossene Jobs verdrängen, älteste zuerst
+        excess = len(self._jobs) - self.max_finished_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done.is_set()][:excess]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str):
+        with self._lock:
+            self._expire_results()
+            return self._jobs.get(job_id)
+
+    def take_result(self, job: ConversionJobState):
+        """Gibt das Ergebnis genau einmal heraus und löst es vom Job (None = schon abgeholt/abgelaufen)"""
+        with self._lock:
+            self._expire_results()
+            result, job.result = job.result, None
+        return result
+
+    def _worker(self, job_queue: queue.Queue):
+        while True:
+            job = job_queue.get()
+            job.status = 'running'
+            try:
+                job.result = self.converter.convert_bytes(job.data, job.input_format, job.output_format, job.options)
+                job.status = 'done'
+            except ConversionError as e:
+                job.error = str(e)
+                job.status = 'failed'
+            except Exception as e:
+                job.error = f"Error: {str(e)}"
+                job.status = 'failed'
+            finally:
+                job.data = None  # Upload freigeben
+                job.finished = time.time()
+                job.done.set()
+                job_queue.task_done()
+
+    def health(self) -> dict:
+        with self._lock:
+            queues = {engine: job_queue.qsize() for engine, job_queue in self._queues.items()}
+            jobs = len(self._jobs)
+        return {
+            'status': 'ok',
+            'queues': queues,
+            'max_queue': self.max_queue,
+            'jobs': jobs,
+            'engines': self.converter.status(),
+        }
+
+    def metrics_text(self) -> str:
+        """Prometheus-Textformat: Stufen-Zeiten, Zähler und Queue-Längen pro Backend"""
+        prefix = 'papa_convert_queue_depth'
+        lines = [f"# TYPE {prefix} gauge"]
+        with self._lock:
+            for engine, job_queue in sorted(self._queues.items()):
+                lines.append(f'{prefix}{{engine="{engine}"}} {job_queue.qsize()}')
+        return self.converter.metrics.prometheus_text() + '\n'.join(lines) + '\n'
+
+    def shutdown(self):
+        """Gibt die warmen Engines frei (Worker-Threads sind Daemons)"""
+        self.converter.close()
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """
+    Endpunkte:
+      GET  /health                         Status, Queue-Längen, LibreOffice-Pool
+      GET  /metrics                        Metriken im Prometheus-Textformat
+      POST /convert?to=pdf&from=md         Synchron: Body = Datei, Antwort = Ergebnis
+      POST /jobs?to=pdf&from=md            Asynchron: 202 + Job-ID
+      GET  /jobs/<id>                      Job-Status
+      GET  /jobs/<id>/result               Ergebnis (409 solange nicht fertig, 410 wenn schon
+                                           abgeholt oder nach Ablauf der TTL verworfen)
+    Optionen als Query-Parameter: quality=1..3, ocr=1, max_size=1600 (Bilder verkleinern),
+    filename=doc.md (statt from;
+    bei am Inhalt erkennbaren Formaten wie PDF, Office, Bildern optional)
+    """
+
+    service = None
+    max_upload_bytes = 200 * 1024 * 1024
+    sync_timeout = 600
+
+    def log_message(self, format, *args):
+        pass  # Kein Request-Logging auf stderr
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_result(self, job: ConversionJobState):
+        result = self.service.take_result(job)
+        if result is None:
+            self._send_json(410, dict(job.to_dict(), error='Ergebnis bereits abgeholt oder verworfen'))
+            return
+        mime_type, _ = mimetypes.guess_type(f"result.{job.output_format}")
+        self.send_response(200)
+        self.send_header('Content-Type', mime_type or 'application/octet-stream')
+        self.send_header('Content-Length', str(len(result)))
+        self.end_headers()
+        self.wfile.write(result)
+
+    def _parse_request(self):
+        """Liest Upload + Parameter; gibt (data, from, to, options) oder None (Fehler gesendet)"""
+        params = {k: v[-1] for k, v in parse_qs(urlparse(self.path).query).items()}
+        output_format = params.get('to', '').lower()
+        input_format = params.get('from', '').lower().lstrip('.')
+        if not input_format and params.get('filename'):
+            input_format = Path(params['filename']).suffix.lower().lstrip('.')
+        if not output_format:
+            self._send_json(400, {'error': "Parameter 'to' erforderlich"})
+            return None
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            self._send_json(400, {'error': 'Leerer Upload'})
+            return None
+        if length > self.max_upload_bytes:
+            self._send_json(413, {'error': 'Upload zu groß'})
+            return None
+
+        quality = params.get('quality', '2')
+        if quality not in ('1', '2', '3'):
+            self._send_json(400, {'error': "Parameter 'quality' muss 1, 2 oder 3 sein"})
+            return None
+
+        max_size = params.get('max_size', '')
+        if max_size and not max_size.isdigit():
+            self._send_json(400, {'error': "Parameter 'max_size' muss eine Pixelzahl sein"})
+            return None
+
+        options = {
+            'quality': int(quality),
+            'ocr': params.get('ocr', '0').lower() in ('1', 'true', 'yes'),
+            'preserve_layout': True
+        }
+        if max_size:
+            options['max_dimension'] = int(max_size)
+        data = self.rfile.read(length)
+        # Inhalt vor Angabe: falsch benannte oder endungslose Uploads landen bei der richtigen Engine
+        input_format = resolve_format(sniff_bytes(data[:SNIFF_BYTES], io.BytesIO(data)), input_format)
+        if not input_format:
+            self._send_json(400, {'error': "Format nicht erkannt - Parameter 'from' (oder 'filename') angeben"})
+            return None
+        return data, input_format, output_format, options
+
+    def _submit(self):
+        parsed = self._parse_request()
+        if parsed is None:
+            return None
+        try:
+            return self.service.submit(*parsed)
+        except QueueFullError:
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+
+    def do_GET(self):
+        path = urlparse(self.path).path.rstrip('/')
+        if path == '/health':
+            self._send_json(200, self.service.health())
+            return
+        if path == '/metrics':
+            body = self.service.metrics_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        parts = path.strip('/').split('/')
+        if len(parts) >= 2 and parts[0] == 'jobs':
+            job = self.service.get(parts[1])
+            if job is None:
+                self._send_json(404, {'error': 'Job nicht gefunden'})
+            elif len(parts) == 2:
+                self._send_json(200, job.to_dict())
+            elif len(parts) == 3 and parts[2] == 'result':
+                if job.status == 'done':
+                    self._send_result(job)
+                elif job.status == 'failed':
+                    self._send_json(422, job.to_dict())
+                else:
+                    self._send_json(409, job.to_dict())
+            else:
+                self._send_json(404, {'error': 'Unbekannter Endpunkt'})
+            return
+
+        self._send_json(404, {'error': 'Unbekannter Endpunkt'})
+
+    def do_POST(self):
+        path = urlparse(self.path).path.rstrip('/')
+        if path == '/convert':
+            job = self._submit()
+            if job is None:
+                return
+            if not job.done.wait(self.sync_timeout):
+                self._send_json(504, job.to_dict())
+            elif job.status == 'done':
+                self._send_result(job)
+            else:
+                self._send_json(422, job.to_dict())
+        elif path == '/jobs':
+            job = self._submit()
+            if job is not None:
+                self._send_json(202, job.to_dict())
+        else:
+            self._send_json(404, {'error': 'Unbekannter Endpunkt'})
+
+
+def serve(host: str = '127.0.0.1', port: int = 8765, service: ConversionService = None):
+    """Startet den Dienst (blockierend)"""
+    ConversionRequestHandler.service = service or ConversionService()
+    server = ThreadingHTTPServer((host, port), ConversionRequestHandler)
+    server.daemon_threads = True
+    print(f"🚀 Konvertierungsdienst läuft auf http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        ConversionRequestHandler.service.shutdown()
+        print("\n👋 Konvertierungsdienst beendet")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='🔄 Universal Document Converter - lokaler HTTP-Dienst')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface (Standard: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (Standard: 8765)')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Basis für die Parallelität pro Backend (Standard: 4)')
+    parser.add_argument('--max-queue', type=int, default=64,
+                       help='Maximale Jobs pro Backend-Queue, danach 429 (Standard: 64)')
+    parser.add_argument('--lo-pool', type=int, default=2, metavar='N',
+                       help='Persistente LibreOffice-Instanzen (Standard: 2, 0 = aus)')
+    parser.add_argument('--pandoc-server', action='store_true',
+                       help='Persistenten pandoc-Server statt eines pandoc-Prozesses pro Request nutzen')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Ergebnis-Cache in diesem Ordner aktivieren (Key = Hash des Uploads + Optionen)')
+    parser.add_argument('--result-ttl', type=float, default=300, metavar='SEK',
+                       help='Nicht abgeholte Job-Ergebnisse nach SEK Sekunden verwerfen (Standard: 300)')
+    parser.add_argument('--no-warmup', action='store_true', help='Engines erst beim ersten Request laden')
+    parser.add_argument('--metrics-log', default=None, metavar='DATEI',
+                       help='Messwerte pro Job als JSON Lines in DATEI schreiben')
+    args = parser.parse_args()
+
+    service = ConversionService(
+        engine_options={
+            'libreoffice_pool_size': args.lo_pool,
+            'pandoc_server': args.pandoc_server,
+            'cache_dir': args.cache_dir,
+            'metrics': True,
+            'metrics_path': args.metrics_log,
+        },
+        max_workers=args.workers,
+        max_queue=args.max_queue,
+        result_ttl=args.result_ttl
+    )
+    if not args.no_warmup:
+        print("⏳ Lade Engines...")
+        service.warmup()
+    serve(args.host, args.port, service)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
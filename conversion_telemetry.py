@@ -0,0 +1,201 @@
+"""Telemetrie realer Konvertierungen und daraus gelernte Zeit-/Größenschätzung"""
+import json
+import os
+import statistics
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+def append_json_line(path: Path, entry: dict):
+    """Hängt eine JSON-Zeile mit einem einzigen write() an (O_APPEND, prozesssicher)"""
+    line = (json.dumps(entry) + '\n').encode('utf-8')
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+class TelemetryRecorder:
+    """
+    Schreibt pro Konvertierung eine JSON-Zeile (Engine, Formate, Größen, Seiten, Qualität, Dauer)
+
+    Jede Zeile geht mit einem einzigen write() im Append-Modus raus - mehrere
+    Worker-Prozesse können so dieselbe Datei nutzen, ohne sich Zeilen zu zerschneiden.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def record(
+        self,
+        engine: str,
+        input_format: str,
+        output_format: str,
+        input_bytes: int,
+        seconds: float,
+        output_bytes: Optional[int] = None,
+        pages: Optional[int] = None,
+        quality: int = 2,
+        success: bool = True
+    ):
+        entry = {
+            'ts': round(time.time(), 3),
+            'engine': engine,
+            'input_format': input_format,
+            'output_format': output_format,
+            'input_bytes': input_bytes,
+            'pages': pages,
+            'quality': quality,
+            'seconds': round(seconds, 4),
+            'output_bytes': output_bytes,
+            'success': success,
+        }
+        append_json_line(self.path, entry)
+
+
+def load_telemetry(path: str, max_records: int = 50000) -> List[dict]:
+    """Liest die jüngsten max_records erfolgreichen Einträge (kaputte Zeilen werden ignoriert)"""
+    records = deque(maxlen=max_records)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('success') and entry.get('seconds') is not None:
+                    records.append(entry)
+    except OSError:
+        pass
+    return list(records)
+
+
+class _LinearFit:
+    """seconds ≈ fixed + per_unit * x (x = Seiten oder MB), Ausgabegröße ≈ ratio * Eingabe"""
+
+    def __init__(self, samples: List[dict], feature: str):
+        self.feature = feature
+        self.samples = len(samples)
+        xs = [self._x(entry) for entry in samples]
+        ys = [entry['seconds'] for entry in samples]
+
+        mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+        var_x = sum((x - mean_x) ** 2 for x in xs)
+        if var_x > 0:
+            self.per_unit = max(0.0, sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x)
+            self.fixed = max(0.0, mean_y - self.per_unit * mean_x)
+        else:
+            self.per_unit = 0.0
+            self.fixed = statistics.median(ys)
+
+        ratios = [
+            entry['output_bytes'] / entry['input_bytes'] for entry in samples
+            if entry.get('output_bytes') and entry.get('input_bytes')
+        ]
+        self.size_ratio = statistics.median(ratios) if ratios else None
+
+    def _x(self, entry: dict) -> float:
+        if self.feature == 'pages':
+            return float(entry['pages'])
+        return entry.get('input_bytes', 0) / (1024 * 1024)
+
+    def predict(self, input_bytes: int, pages: Optional[int]) -> Optional[float]:
+        """Sekunden - None, wenn das Modell Seiten braucht und keine bekannt sind"""
+        if self.feature == 'pages':
+            if pages is None:
+                return None  # Sekunden pro Seite nicht mit MB multiplizieren
+            x = float(pages)
+        else:
+            x = input_bytes / (1024 * 1024)
+        return self.fixed + self.per_unit * x
+
+
+class ConversionEstimator:
+    """
+    Schätzt Dauer und Ausgabegröße aus der Telemetrie-Historie
+
+    Pro Gruppe ein lineares Modell (Fixkosten + Kosten pro Seite bzw. MB). Gruppen
+    von spezifisch nach allgemein: (Engine, Ein-, Ausgabeformat, Qualität) ->
+    (Engine, Ein-, Ausgabeformat) -> Engine -> alle; genutzt wird die erste Gruppe
+    mit mindestens min_samples Messungen. Ohne Seitenzahl in der Anfrage werden
+    Seiten-Modelle übersprungen; die Gruppe aller Messungen rechnet immer in MB.
+    """
+
+    # Fallback ohne Historie (Sekunden pro MB, wie bisher in FileAnalyzer)
+    DEFAULT_SECONDS_PER_MB = {'pdf': 2, 'docx': 1, 'html': 0.5, 'markdown': 0.3}
+
+    def __init__(self, min_samples: int = 3):
+        self.min_samples = min_samples
+        self._models: Dict[tuple, _LinearFit] = {}
+
+    @classmethod
+    def from_telemetry(cls, path: str, min_samples: int = 3, max_records: int = 50000) -> 'ConversionEstimator':
+        estimator = cls(min_samples)
+        estimator.fit(load_telemetry(path, max_records))
+        return estimator
+
+    @staticmethod
+    def _group_keys(engine: str, input_format: str, output_format: str, quality) -> List[tuple]:
+        return [
+            (engine, input_format, output_format, quality),
+            (engine, input_format, output_format),
+            (engine,),
+            (),
+        ]
+
+    def fit(self, records: Iterable[dict]):
+        groups: Dict[tuple, List[dict]] = {}
+        for entry in records:
+            keys = self._group_keys(entry.get('engine'), entry.get('input_format'),
+                                    entry.get('output_format'), entry.get('quality'))
+            for key in keys:
+                groups.setdefault(key, []).append(entry)
+
+        self._models = {}
+        for key, samples in groups.items():
+            if len(samples) < self.min_samples:
+                continue
+            # Seiten als Merkmal nur, wenn alle Messungen der Gruppe sie haben (PDF-Eingaben)
+            feature = 'pages' if key and all(entry.get('pages') for entry in samples) else 'mb'
+            self._models[key] = _LinearFit(samples, feature)
+
+    @property
+    def samples(self) -> int:
+        model = self._models.get(())
+        return model.samples if model else 0
+
+    def estimate(
+        self,
+        engine: str,
+        input_format: str,
+        output_format: str,
+        input_bytes: int,
+        pages: Optional[int] = None,
+        quality: int = 2
+    ) -> dict:
+        """{'seconds', 'output_bytes' (oder None), 'samples', 'basis'}"""
+        for key in self._group_keys(engine, input_format, output_format, quality):
+            model = self._models.get(key)
+            if model is None:
+                continue
+            seconds = model.predict(input_bytes, pages)
+            if seconds is None:
+                continue
+            return {
+                'seconds': seconds,
+                'output_bytes': int(input_bytes * model.size_ratio) if model.size_ratio else None,
+                'samples': model.samples,
+                'basis': '/'.join(str(part) for part in key) or 'alle',
+            }
+
+        seconds_per_mb = self.DEFAULT_SECONDS_PER_MB.get(output_format, 1)
+        return {
+            'seconds': input_bytes / (1024 * 1024) * seconds_per_mb,
+            'output_bytes': None,
+            'samples': 0,
+            'basis': 'standard',
+        }
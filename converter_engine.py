@@ -1,16 +1,101 @@
+import codecs
+import io
+import math
 import os
 import subprocess
+import zlib
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 import tempfile
 import shutil
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 
+from format_sniffer import (
+    ENCODING_SAMPLE_BYTES, SNIFF_BYTES, detect_format, detect_text_encoding, resolve_format, sniff_bytes
+)
+from file_analyzer import pdf_page_count
+from instrumentation import NULL_INSTRUMENTATION
+
+# Teil des Cache-Keys: bei Änderungen an der Konvertierungslogik erhöhen
+ENGINE_VERSION = "1.1"
+
+IMAGE_FORMATS = ['jpg', 'jpeg', 'png', 'gif', 'heic', 'heif', 'tiff', 'tif', 'webp', 'avif']
+IMAGE_SUFFIXES = {
+    'jpg': '.jpg', 'jpeg': '.jpg', 'png': '.png', 'gif': '.gif', 'heic': '.heic', 'heif': '.heic',
+    'tiff': '.tiff', 'tif': '.tif', 'webp': '.webp', 'avif': '.avif'
+}
+
+# Zielformate, die mehrere Frames/Seiten in einer Datei halten (animiertes GIF/APNG/WebP, TIFF, HEIC-Sequenz)
+MULTI_FRAME_FORMATS = {'gif', 'png', 'tiff', 'tif', 'heic', 'heif', 'webp'}
+
+# Frames, die bei mehrbildigen Eingaben höchstens gleichzeitig in Arbeit sind
+FRAME_BUFFER = 8
+# EXIF-Orientierung -> /Rotate der PDF-Seite (gespiegelte Varianten werden neu kodiert)
+EXIF_PAGE_ROTATION = {1: 0, 3: 180, 6: 90, 8: 270}
+
+# Dekodierte Frames pro PDF-Block (jeder weitere Block wird angehängt, Pillow liest dafür das PDF neu ein)
+FRAME_BLOCK_BYTES = 256 * 1024 * 1024
+
+# Blockgröße beim Streamen von Markdown nach pandoc (stdin)
+MARKDOWN_CHUNK_BYTES = 256 * 1024
+
+# Pandoc Reader/Writer für die In-Memory-Konvertierung (nur Textformate als Eingabe)
+PANDOC_READERS = {'md': 'markdown', 'markdown': 'markdown', 'html': 'html', 'htm': 'html', 'txt': 'markdown'}
+PANDOC_WRITERS = {
+    'md': 'markdown', 'markdown': 'markdown', 'html': 'html', 'docx': 'docx',
+    'pptx': 'pptx', 'odt': 'odt', 'rtf': 'rtf', 'txt': 'plain'
+}
+
+# Strategie (siehe _select_route) -> Backend für Scheduling/Limits
+ROUTE_ENGINES = {
+    'image_format': 'image',
+    'image_pdf': 'image',
+    'svg': 'svg',
+    'epub': 'epub',
+    'docling': 'docling',
+    'pdf_image': 'raster',
+    'pandoc': 'pandoc',
+    'libreoffice': 'libreoffice',
+}
+
 class ConversionError(Exception):
     pass
 
+class ResizedFrames:
+    """
+    Verkleinerte Frames 2..n eines Bildes als wiederholt iterierbare Quelle für append_images
+    
+    PERFORMANCE: Nichts wird gesammelt - jeder Durchlauf dekodiert und verkleinert neu
+    (der APNG-Writer liest die Frames zweimal: erst Modi/Größen, dann die Daten).
+    """
+    
+    def __init__(self, converter, img, prepare, options: dict):
+        self.converter = converter
+        self.img = img
+        self.prepare = prepare
+        self.options = options
+    
+    def __iter__(self):
+        frames = self.converter._iter_frames(self.img, first=2)
+        return self.converter._map_frames(lambda number, frame: self.prepare(frame), frames, self.options)
+
 class DocumentConverter:
-    def __init__(self):
+    def __init__(
+        self,
+        libreoffice_pool_size: int = 0,
+        libreoffice_max_jobs: int = 200,
+        cache_dir: Optional[str] = None,
+        cache_max_mb: int = 1024,
+        docling_cache_size: int = 2,
+        telemetry_path: Optional[str] = None,
+        metrics: bool = False,
+        metrics_path: Optional[str] = None,
+        pandoc_server: bool = False
+    ):
         self.supported_formats = {
             'pdf': ['docx', 'pptx', 'html', 'markdown', 'odt', 'ods', 'odp', 'jpg', 'png'],
             'docx': ['pdf', 'pptx', 'html', 'markdown', 'odt', 'txt', 'rtf', 'jpg', 'png'],
@@ -27,20 +112,92 @@ class DocumentConverter:
             'xlsx': ['pdf', 'ods', 'xls', 'csv', 'html', 'jpg', 'png'],
             'xls': ['pdf', 'xlsx', 'ods', 'csv', 'html', 'jpg', 'png'],
             'epub': ['pdf', 'html', 'txt', 'jpg', 'png'],
-            'jpg': ['pdf', 'png', 'heic', 'gif'],
-            'jpeg': ['pdf', 'png', 'heic', 'gif'],
-            'png': ['pdf', 'jpg', 'heic', 'gif'],
-            'gif': ['pdf', 'png', 'jpg', 'heic'],
-            'heic': ['jpg', 'png', 'pdf', 'gif'],
-            'heif': ['jpg', 'png', 'pdf', 'gif'],
+            'jpg': ['pdf', 'png', 'heic', 'gif', 'tiff'],
+            'jpeg': ['pdf', 'png', 'heic', 'gif', 'tiff'],
+            'png': ['pdf', 'jpg', 'heic', 'gif', 'tiff'],
+            'gif': ['pdf', 'png', 'jpg', 'heic', 'tiff'],
+            'heic': ['jpg', 'png', 'pdf', 'gif', 'tiff'],
+            'heif': ['jpg', 'png', 'pdf', 'gif', 'tiff'],
+            'tiff': ['pdf', 'jpg', 'png', 'heic', 'gif'],
+            'webp': ['jpg', 'png', 'pdf', 'gif', 'tiff'],
+            'avif': ['jpg', 'png', 'pdf', 'webp', 'tiff'],
             'svg': ['pdf', 'png', 'jpg'],
         }
         # PERFORMANCE: Cache für Tool-Pfade und Lazy Loading
         self._soffice_path = None
         self._pandoc_available = None
-        self._docling_converter = None
+        self._docling_converters = OrderedDict()
+        self._docling_lock = threading.Lock()
+        self.docling_cache_size = max(1, docling_cache_size)
         self._pil_loaded = False
         self._pillow_heif_registered = False
+        # PERFORMANCE: Optionaler Pool langlebiger LibreOffice-Instanzen (0 = aus)
+        self.libreoffice_pool_size = libreoffice_pool_size
+        self.libreoffice_max_jobs = libreoffice_max_jobs
+        self._libreoffice_pool = None
+        self._libreoffice_pool_failed = False
+        # PERFORMANCE: Optionaler persistenter pandoc-Server statt pandoc-Prozess pro Dokument
+        self.pandoc_server_enabled = pandoc_server
+        self._pandoc_server = None
+        self._pandoc_server_failed = False
+        self.warmup_errors = {}
+        # Schützt den Lazy Start von LibreOffice-Pool und pandoc-Server (geteilter Converter im HTTP-Dienst)
+        self._engine_start_lock = threading.Lock()
+        # PERFORMANCE: Content-adressierter Ergebnis-Cache (None = aus)
+        self.cache = None
+        if cache_dir:
+            from conversion_cache import ConversionCache
+            self.cache = ConversionCache(cache_dir, max_bytes=cache_max_mb * 1024 * 1024)
+        # Telemetrie realer Konvertierungen (JSON Lines, None = aus) - Basis für Schätzungen
+        self.telemetry = None
+        if telemetry_path:
+            from conversion_telemetry import TelemetryRecorder
+            self.telemetry = TelemetryRecorder(telemetry_path)
+        # Instrumentierung pro Stufe (aus = No-op ohne Messkosten)
+        self.metrics = NULL_INSTRUMENTATION
+        if metrics or metrics_path:
+            from instrumentation import Instrumentation
+            self.metrics = Instrumentation(metrics_path)
+    
+    def close(self):
+        """Gibt langlebige Ressourcen frei (LibreOffice-Pool, pandoc-Server)"""
+        if self._libreoffice_pool is not None:
+            self._libreoffice_pool.shutdown()
+            self._libreoffice_pool = None
+        if self._pandoc_server is not None:
+            self._pandoc_server.stop()
+            self._pandoc_server = None
+    
+    def warmup(self):
+        """Lädt Engines vorab (Pillow/HEIF, LibreOffice-Pool, pandoc-Server, Docling-Standardkonfiguration)"""
+        try:
+            self._load_pil()
+            self._register_heif()
+        except ConversionError:
+            pass
+        # Fehlende Engines (z.B. kein LibreOffice) dürfen den Start nicht verhindern -
+        # sie fehlen nur ihren Routen und stehen in status()
+        self.warmup_errors = {}
+        for name, load in (('libreoffice_pool', self._get_libreoffice_pool),
+                           ('pandoc_server', self._get_pandoc_server)):
+            try:
+                load()
+            except ConversionError as e:
+                self.warmup_errors[name] = str(e)
+        try:
+            self._get_docling_converter({})
+        except ConversionError:
+            pass  # Docling optional
+    
+    def status(self) -> dict:
+        """Zustand der langlebigen Ressourcen (für Monitoring)"""
+        return {
+            'libreoffice_pool': self._libreoffice_pool.health() if self._libreoffice_pool is not None else None,
+            'pandoc_server': self._pandoc_server.health() if self._pandoc_server is not None else None,
+            'docling_converters': len(self._docling_converters),
+            'cache': str(self.cache.cache_dir) if self.cache is not None else None,
+            'warmup_errors': self.warmup_errors,
+        }
     
     def convert(self, input_file: str, output_format: str, output_dir: str, options: dict = None) -> str:
         """Konvertiert eine Datei in das gewünschte Format"""
@@ -58,91 +215,574 @@ class DocumentConverter:
         # Ausgabedatei
         output_file = output_path / f"{input_path.stem}.{output_format}"
         
-        # Format-Erkennung
-        input_ext = input_path.suffix.lower().lstrip('.')
+        if not self.metrics.enabled:
+            return self._convert_job(input_file, input_path, output_path, output_file, output_format, options)
+        labels = {
+            'engine': self.get_engine(input_file, output_format),
+            'input_format': detect_format(input_file),
+            'output_format': output_format,
+        }
+        with self.metrics.job(**labels):
+            return self._convert_job(input_file, input_path, output_path, output_file, output_format, options)
+    
+    def _convert_job(self, input_file: str, input_path: Path, output_path: Path, output_file: Path,
+                     output_format: str, options: dict) -> str:
+        # PERFORMANCE: Cache-Treffer ersetzen die komplette Konvertierung
+        cache_key, cached = self._cache_lookup(input_file, output_path, output_format, options)
+        if cached:
+            return cached
+        
+        started = time.perf_counter()
+        try:
+            result = self._convert_uncached(input_file, input_path, output_path, output_file, output_format, options)
+        except ConversionError:
+            self._record_telemetry(input_file, output_format, options, time.perf_counter() - started, None, False)
+            raise
+        self._record_telemetry(input_file, output_format, options, time.perf_counter() - started, result)
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+    
+    def job_profile(self, input_file: str, output_format: str) -> dict:
+        """Merkmale eines Jobs für Telemetrie und Schätzung: Engine, Format, Größe, Seiten"""
+        input_format = detect_format(input_file)
+        return {
+            'engine': self.get_engine(input_file, output_format),
+            'input_format': input_format,
+            'input_bytes': os.path.getsize(input_file),
+            'pages': pdf_page_count(input_file) if input_format == 'pdf' else None,
+        }
+    
+    def _record_telemetry(self, input_file: str, output_format: str, options: dict, seconds: float,
+                          result: Optional[str], success: bool = True, engine: str = None):
+        """Schreibt eine Messung (nur wenn Telemetrie aktiv; result = Ausgabedatei für die Größe)"""
+        if self.telemetry is None:
+            return
+        try:
+            profile = self.job_profile(input_file, output_format.split('+')[0])
+            output_bytes = os.path.getsize(result) if result and os.path.isfile(result) else None
+            self.telemetry.record(
+                engine or profile['engine'], profile['input_format'], output_format,
+                profile['input_bytes'], seconds, output_bytes, profile['pages'],
+                options.get('quality', 2), success
+            )
+        except OSError:
+            pass  # Telemetrie darf nie eine Konvertierung scheitern lassen
+    
+    def _cache_lookup(self, input_file: str, output_path: Path, output_format: str, options: dict) -> tuple:
+        """Gibt (cache_key, Treffer-Pfad oder None) zurück - cache_key None = nicht cachen"""
+        if self.cache is None or options.get('pages'):  # Mehrseitige Ausgaben nicht cachen
+            return None, None
+        try:
+            cache_key = self.cache.make_key(input_file, output_format, options, ENGINE_VERSION)
+            cached = self.cache.get(cache_key, str(output_path), Path(input_file).stem)
+            self.metrics.count('cache_hits' if cached else 'cache_misses')
+            return cache_key, cached
+        except OSError:
+            return None, None
+    
+    def convert_multi(self, input_file: str, output_formats: List[str], output_dir: str,
+                      options: dict = None) -> Dict[str, str]:
+        """
+        Konvertiert eine Datei in mehrere Formate - gibt {format: ausgabepfad} zurück
+        
+        PERFORMANCE: Alle Docling-Formate (markdown/html/docx aus PDF) teilen sich
+        eine einzige Layoutanalyse, statt das PDF pro Format neu zu parsen.
+        """
+        input_path = Path(input_file)
+        options = options or {}
+        
+        if not input_path.exists():
+            raise ConversionError(f"Datei nicht gefunden: {input_file}")
+        
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        input_ext = detect_format(input_file)
+        
+        results = {}
+        docling_formats = {}
+        for output_format in dict.fromkeys(fmt.lower() for fmt in output_formats):
+            if self._select_route(input_ext, output_format) != 'docling':
+                results[output_format] = self.convert(input_file, output_format, output_dir, options)
+                continue
+            cache_key, cached = self._cache_lookup(input_file, output_path, output_format, options)
+            if cached:
+                results[output_format] = cached
+            else:
+                docling_formats[output_format] = cache_key
+        
+        if docling_formats:
+            try:
+                started = time.perf_counter()
+                document = self._parse_with_docling(input_file, output_path, options)
+                for output_format, cache_key in docling_formats.items():
+                    output_file = output_path / f"{input_path.stem}.{output_format}"
+                    result = self._export_docling_document(document, output_file, output_format, options)
+                    if cache_key is not None:
+                        self.cache.put(cache_key, result)
+                    results[output_format] = result
+                # Eine Messung für Parse + alle Exporte (Formate mit '+' verbunden)
+                self._record_telemetry(input_file, '+'.join(docling_formats), options,
+                                       time.perf_counter() - started, None, True, 'docling')
+            except ImportError:
+                raise ConversionError("Docling nicht installiert. Bitte 'pip install docling' ausführen.")
+            except ConversionError:
+                raise
+            except Exception as e:
+                raise ConversionError(f"Docling-Fehler: {str(e)}")
+        
+        return results
+    
+    def convert_bytes(self, data: bytes, input_format: str, output_format: str, options: dict = None) -> bytes:
+        """Konvertiert im Speicher: Eingabe-Bytes -> Ausgabe-Bytes (mit Cache, falls aktiv)"""
+        options = options or {}
+        cache_key = None
+        if self.cache is not None and not options.get('pages'):
+            cache_key = self.cache.make_bytes_key(data, input_format, output_format, options, ENGINE_VERSION)
+            cached = self.cache.get_bytes(cache_key)
+            self.metrics.count('cache_hits' if cached is not None else 'cache_misses')
+            if cached is not None:
+                return cached
+        output_stream = io.BytesIO()
+        self.convert_stream(io.BytesIO(data), output_stream, input_format, output_format, options)
+        result = output_stream.getvalue()
+        if cache_key is not None:
+            self.cache.put_bytes(cache_key, result, f".{output_format.lower()}")
+        return result
+    
+    def convert_stream(self, input_stream, output_stream, input_format: str, output_format: str,
+                       options: dict = None):
+        """
+        Konvertiert von einem file-like Objekt in ein anderes
+        
+        PERFORMANCE: Pillow, CairoSVG, ebooklib, Docling (DocumentStream) und Pandoc
+        (stdin/stdout) arbeiten komplett im Speicher. Nur Engines, die zwingend einen
+        Pfad brauchen (LibreOffice, pdf2image), gehen über ein temporäres Verzeichnis.
+        """
+        input_ext = self._sniff_stream_format(input_stream, input_format)
+        output_format = output_format.lower()
+        options = options or {}
+        route = self._select_route(input_ext, output_format)
+        
+        with self.metrics.job(engine=ROUTE_ENGINES.get(route, 'libreoffice'), input_format=input_ext,
+                              output_format=output_format):
+            self._convert_stream_job(input_stream, output_stream, input_ext, output_format, route, options)
+    
+    def _convert_stream_job(self, input_stream, output_stream, input_ext: str, output_format: str,
+                            route: str, options: dict):
+        quality = options.get('quality', 2)
+        try:
+            if route in ('image_format', 'image_pdf'):
+                Image = self._load_pil()
+                self._register_heif()
+                with Image.open(input_stream) as img:
+                    if self._frame_count(img) > 1 and (route == 'image_pdf' or output_format in MULTI_FRAME_FORMATS):
+                        # Mehrbild-Writer brauchen eine echte, seekbare Datei (PDF-append per mmap, TIFF)
+                        with tempfile.TemporaryFile() as spool:
+                            if self._write_all_frames(img, spool, route, output_format, options):
+                                spool.seek(0)
+                                shutil.copyfileobj(spool, output_stream)
+                                return
+                    img = self._decode_image(img, options)
+                    with self.metrics.span('image.encode'):
+                        if route == 'image_pdf':
+                            self._write_pdf_image(img, output_stream, quality)
+                        else:
+                            self._write_image(img, output_stream, output_format, quality)
+                return
+            
+            if route == 'svg' and output_format in ['pdf', 'png', 'jpg', 'jpeg'] and self._cairosvg_available():
+                import cairosvg
+                dpi = {1: 72, 2: 150, 3: 300}.get(quality, 150)
+                if output_format == 'pdf':
+                    with self.metrics.span('svg.render'):
+                        cairosvg.svg2pdf(file_obj=input_stream, write_to=output_stream)
+                elif output_format == 'png':
+                    with self.metrics.span('svg.render'):
+                        cairosvg.svg2png(file_obj=input_stream, write_to=output_stream, dpi=dpi)
+                else:
+                    with self.metrics.span('svg.render'):
+                        png_buffer = io.BytesIO(cairosvg.svg2png(file_obj=input_stream, dpi=dpi))
+                    with self._load_pil().open(png_buffer) as img:
+                        self._write_image(img, output_stream, output_format, quality)
+                return
+            
+            if route == 'epub' and output_format in ['html', 'txt']:
+                # zipfile braucht einen seekbaren Stream
+                source = input_stream if input_stream.seekable() else io.BytesIO(input_stream.read())
+                try:
+                    with self.metrics.span('epub.read'):
+                        chapters = self._read_epub_documents(source)
+                except ImportError:
+                    raise ConversionError("ebooklib nicht installiert. Bitte 'pip install ebooklib' ausführen.")
+                text = self._epub_to_html(chapters) if output_format == 'html' else self._epub_to_text(chapters)
+                output_stream.write(text.encode('utf-8'))
+                return
+            
+            if route == 'docling':
+                try:
+                    from docling.datamodel.base_models import DocumentStream
+                except ImportError:
+                    raise ConversionError("Docling nicht installiert. Bitte 'pip install docling' ausführen.")
+                converter = self._get_docling_converter(options)
+                with self.metrics.span('docling.parse'):
+                    result = converter.convert(
+                        DocumentStream(name=f"document.{input_ext}", stream=io.BytesIO(input_stream.read()))
+                    )
+                if output_format == 'html':
+                    with self.metrics.span('docling.export'):
+                        output_stream.write(result.document.export_to_html().encode('utf-8'))
+                else:
+                    with self.metrics.span('docling.export'):
+                        markdown = result.document.export_to_markdown().encode('utf-8')
+                    if output_format == 'docx':
+                        markdown = self._run_pandoc_bytes(markdown, 'markdown', 'docx', options)
+                    output_stream.write(markdown)
+                return
+            
+            if (route == 'pandoc' and input_ext in PANDOC_READERS and output_format == 'pdf'
+                    and self._check_pandoc_available() and self._has_fast_html_pdf()):
+                data = input_stream.read()
+                pdf = self._pandoc_pdf_bytes(io.BytesIO(data), input_ext, options)
+                if pdf is not None:
+                    output_stream.write(pdf)
+                    return
+                input_stream = io.BytesIO(data)  # Renderer fehlgeschlagen: Weg über die Platte
+            
+            if (route == 'pandoc' and input_ext in PANDOC_READERS and output_format in PANDOC_WRITERS
+                    and self._check_pandoc_available()):
+                if input_ext in ['md', 'markdown']:
+                    chunks = self._iter_markdown_utf8(input_stream)
+                else:
+                    chunks = [input_stream.read()]
+                output_stream.write(
+                    self._run_pandoc_stream(chunks, PANDOC_READERS[input_ext], PANDOC_WRITERS[output_format], options)
+                )
+                return
+        except ConversionError:
+            raise
+        except Exception as e:
+            raise ConversionError(f"Konvertierung fehlgeschlagen: {str(e)}")
+        
+        self._convert_stream_via_disk(input_stream, output_stream, input_ext, output_format, options)
+    
+    @staticmethod
+    def _sniff_stream_format(input_stream, input_format: str) -> str:
+        """Angegebenes Format mit den ersten Bytes abgleichen (nur seekbare Streams)"""
+        if not input_stream.seekable():
+            return input_format.lower().lstrip('.')
+        position = input_stream.tell()
+        head = input_stream.read(SNIFF_BYTES)
+        input_stream.seek(position)
+        return resolve_format(sniff_bytes(head, input_stream if position == 0 else None), input_format)
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _cairosvg_available() -> bool:
+        """CairoSVG nutzbar? (ImportError oder OSError ohne Cairo/GTK-Runtime)"""
+        try:
+            import cairosvg  # noqa: F401
+            return True
+        except (ImportError, OSError):
+            return False
+    
+    def _convert_stream_via_disk(self, input_stream, output_stream, input_ext: str, output_format: str,
+                                 options: dict):
+        """Fallback für Engines, die einen Dateipfad brauchen"""
+        with tempfile.TemporaryDirectory(prefix=f"convert_{os.getpid()}_") as temp_dir:
+            temp_input = Path(temp_dir) / f"document.{input_ext}"
+            with open(temp_input, 'wb') as f:
+                shutil.copyfileobj(input_stream, f, 1024 * 1024)
+            result = self.convert(str(temp_input), output_format, str(Path(temp_dir) / 'out'), options)
+            with open(result, 'rb') as f:
+                shutil.copyfileobj(f, output_stream, 1024 * 1024)
+    
+    def _select_route(self, input_ext: str, output_format: str) -> str:
+        """Wählt die Konvertierungsstrategie anhand von Ein- und Ausgabeformat"""
+        # Image conversions
+        if input_ext in IMAGE_FORMATS and output_format in IMAGE_FORMATS:
+            return 'image_format'
+        elif input_ext in IMAGE_FORMATS and output_format == 'pdf':
+            return 'image_pdf'
+        # SVG conversions
+        elif input_ext == 'svg':
+            return 'svg'
+        # EPUB conversions
+        elif input_ext == 'epub':
+            return 'epub'
+        # PDF with Docling
+        elif input_ext == 'pdf' and output_format in ['docx', 'markdown', 'html']:
+            return 'docling'
+        # PDF to image (direkt rastern)
+        elif input_ext == 'pdf' and output_format in ['jpg', 'jpeg', 'png']:
+            return 'pdf_image'
+        # Document to image (via PDF intermediate)
+        elif output_format in ['jpg', 'jpeg', 'png'] and input_ext not in IMAGE_FORMATS + ['svg']:
+            return 'document_image'
+        # Markdown/Pandoc conversions
+        elif input_ext in ['md', 'markdown'] or output_format in ['md', 'markdown']:
+            return 'pandoc'
+        # LibreOffice conversions (Office formats)
+        else:
+            return 'libreoffice'
+    
+    def get_engine(self, input_file: str, output_format: str) -> str:
+        """
+        Ermittelt das Backend einer Konvertierung (gleiche Dispatch-Logik wie convert):
+        'image', 'svg', 'epub', 'docling', 'raster', 'pandoc' oder 'libreoffice'
+        """
+        # Existiert die Datei (noch) nicht, entscheidet die Endung
+        input_ext = detect_format(input_file)
+        output_format = output_format.lower()
+        route = self._select_route(input_ext, output_format)
+        if route == 'document_image':
+            # Teuer ist der PDF-Zwischenschritt - dessen Engine zählt
+            route = self._select_route(input_ext, 'pdf')
+        return ROUTE_ENGINES[route]
+    
+    def _convert_uncached(self, input_file: str, input_path: Path, output_path: Path, output_file: Path,
+                          output_format: str, options: dict) -> str:
+        """Führt die eigentliche Konvertierung mit der gewählten Strategie aus"""
+        # Format-Erkennung am Inhalt (Magic Bytes), Endung nur als Fallback
+        input_ext = detect_format(input_file)
+        route = self._select_route(input_ext, output_format)
         
-        # Konvertierungsstrategie wählen
         try:
-            # Image conversions
-            if input_ext in ['jpg', 'jpeg', 'png', 'gif', 'heic', 'heif'] and output_format in ['jpg', 'jpeg', 'png', 'gif', 'heic', 'heif']:
+            if route == 'image_format':
                 return self._convert_image_format(input_file, output_file, output_format, options)
-            elif input_ext in ['jpg', 'jpeg', 'png', 'gif', 'heic', 'heif'] and output_format == 'pdf':
+            elif route == 'image_pdf':
                 return self._convert_image_to_pdf(input_file, output_file, options)
-            # SVG conversions
-            elif input_ext == 'svg':
+            elif route == 'svg':
                 return self._convert_svg(input_file, output_file, output_format, options)
-            # EPUB conversions
-            elif input_ext == 'epub':
+            elif route == 'epub':
                 return self._convert_epub(input_file, output_file, output_format, options)
-            # PDF with Docling
-            elif input_ext == 'pdf' and output_format in ['docx', 'markdown', 'html']:
+            elif route == 'docling':
                 return self._convert_with_docling(input_file, output_file, output_format, options)
-            # Document to image (via PDF intermediate)
-            elif output_format in ['jpg', 'jpeg', 'png'] and input_ext not in ['jpg', 'jpeg', 'png', 'gif', 'heic', 'heif', 'svg']:
+            elif route == 'pdf_image':
+                return self._convert_pdf_to_image(input_file, output_file, output_format, options)
+            elif route == 'document_image':
                 # First convert to PDF, then to image
-                temp_pdf = output_path / f"{input_path.stem}_temp.pdf"
-                self.convert(input_file, 'pdf', str(output_path), options)
-                result = self._convert_pdf_to_image(str(temp_pdf), output_file, output_format, options)
-                temp_pdf.unlink(missing_ok=True)
-                return result
-            # Markdown/Pandoc conversions
-            elif input_ext in ['md', 'markdown'] or output_format in ['md', 'markdown']:
+                temp_pdf = Path(self.convert(input_file, 'pdf', str(output_path), options))
+                try:
+                    return self._convert_pdf_to_image(str(temp_pdf), output_file, output_format, options)
+                finally:
+                    temp_pdf.unlink(missing_ok=True)
+            elif route == 'pandoc':
                 return self._convert_with_pandoc(input_file, output_file, output_format, options)
-            # LibreOffice conversions (Office formats)
             else:
                 return self._convert_with_libreoffice(input_file, output_file, output_format, options)
         except Exception as e:
             raise ConversionError(f"Konvertierung fehlgeschlagen: {str(e)}")
     
-    def _get_docling_converter(self):
-        """Lazy loading für Docling (schwere Bibliothek)"""
-        if self._docling_converter is None:
+    @staticmethod
+    def _docling_options_key(options: dict) -> tuple:
+        """(ocr, table_structure, quality) - bestimmt die Pipeline-Konfiguration"""
+        quality = options.get('quality', 2)
+        ocr = bool(options.get('ocr', False))
+        # Niedrige Qualität = schnell: ohne Tabellenstruktur-Modell
+        table_structure = bool(options.get('table_structure', quality != 1))
+        return ocr, table_structure, quality
+    
+    def _get_docling_converter(self, options: dict = None):
+        """
+        Lazy loading für Docling (schwere Bibliothek) - ein Converter pro Pipeline-Konfiguration
+        
+        PERFORMANCE: Die PdfPipelineOptions werden beim Erstellen gesetzt (nur dann greifen
+        sie). Converter bleiben in einem LRU-Cache (docling_cache_size), damit ein Wechsel
+        der Qualität nicht jedes Mal die Modelle neu lädt und der RAM begrenzt bleibt.
+        """
+        key = self._docling_options_key(options or {})
+        with self._docling_lock:
+            converter = self._docling_converters.get(key)
+            if converter is not None:
+                self._docling_converters.move_to_end(key)
+                return converter
+        
+        try:
+            from docling.datamodel.base_models import InputFormat
+            from docling.datamodel.pipeline_options import PdfPipelineOptions, TableFormerMode
+            from docling.document_converter import DocumentConverter as DoclingConverter, PdfFormatOption
+        except ImportError:
+            raise ConversionError("Docling nicht installiert. Bitte 'pip install docling' ausführen.")
+        
+        ocr, table_structure, quality = key
+        pipeline_options = PdfPipelineOptions()
+        pipeline_options.do_ocr = ocr
+        pipeline_options.do_table_structure = table_structure
+        if table_structure:
+            pipeline_options.table_structure_options.mode = (
+                TableFormerMode.ACCURATE if quality == 3 else TableFormerMode.FAST
+            )
+        
+        with self.metrics.span('docling.model_load'):
+            converter = DoclingConverter(
+                format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+            )
+        
+        with self._docling_lock:
+            self._docling_converters[key] = converter
+            while len(self._docling_converters) > self.docling_cache_size:
+                self._docling_converters.popitem(last=False)
+        return converter
+    
+    def _parse_with_docling(self, input_file: str, output_dir: Path, options: dict):
+        """
+        Docling-Layoutanalyse (der teure Teil) - liefert das DoclingDocument
+        
+        PERFORMANCE: Mit options['persist_parsed'] (True = Ausgabeordner, oder ein Pfad)
+        wird das Ergebnis als JSON gespeichert und bei unveränderter Quelle wiederverwendet.
+        """
+        input_path = Path(input_file)
+        quality = options.get('quality', 2)
+        
+        parsed_file = None
+        persist = options.get('persist_parsed')
+        if persist:
+            parsed_dir = output_dir if persist is True else Path(persist)
+            parsed_dir.mkdir(parents=True, exist_ok=True)
+            # Parse-relevante Optionen im Dateinamen, damit OCR/Qualität nicht vermischt werden
+            ocr, table_structure, _ = self._docling_options_key(options)
+            variant = f"q{quality}{'-ocr' if ocr else ''}{'' if table_structure else '-notables'}"
+            parsed_file = parsed_dir / f"{input_path.stem}.{variant}.docling.json"
+            if parsed_file.exists() and parsed_file.stat().st_mtime >= input_path.stat().st_mtime:
+                from docling_core.types.doc import DoclingDocument
+                return DoclingDocument.load_from_json(parsed_file)
+        
+        # PERFORMANCE: Lazy loading des (pro Optionen gecachten) Converters
+        converter = self._get_docling_converter(options)
+        with self.metrics.span('docling.parse'):
+            result = converter.convert(input_file)
+        
+        if parsed_file is not None:
+            result.document.save_as_json(parsed_file)
+        return result.document
+    
+    def convert_docling_batch(self, input_files: List[str], output_format, output_dir: str,
+                              options: dict = None, batch_size: int = 8) -> List[tuple]:
+        """
+        Konvertiert viele PDFs in einem Docling-Durchlauf (convert_all)
+        
+        output_format: str oder Liste von Formaten. Gibt [(datei, ergebnis, erfolg)] zurück,
+        ergebnis ist der Ausgabepfad (bzw. {format: pfad}) oder die Fehlermeldung.
+        
+        PERFORMANCE: Modell-Setup und Seiten-Pipeline werden über alle Dokumente eines
+        Batches amortisiert. Fehler betreffen nur das jeweilige Dokument.
+        """
+        options = options or {}
+        formats = [output_format.lower()] if isinstance(output_format, str) else [f.lower() for f in output_format]
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        batch_size = max(1, batch_size)
+        
+        def packed(outputs: dict):
+            return outputs[formats[0]] if isinstance(output_format, str) else outputs
+        
+        results = []
+        todo = []  # (datei, {format: cache_key}, {format: fertige ausgabe})
+        for input_file in input_files:
+            if not Path(input_file).exists():
+                results.append((input_file, f"Datei nicht gefunden: {input_file}", False))
+                continue
+            pending, outputs = {}, {}
+            for fmt in formats:
+                cache_key, cached = self._cache_lookup(input_file, output_path, fmt, options)
+                if cached:
+                    outputs[fmt] = cached
+                else:
+                    pending[fmt] = cache_key
+            if pending:
+                todo.append((input_file, pending, outputs))
+            else:
+                results.append((input_file, packed(outputs), True))
+        
+        if not todo:
+            return results
+        
+        try:
+            from docling.datamodel.base_models import ConversionStatus
+            from docling.datamodel.settings import settings
+            converter = self._get_docling_converter(options)
+        except ImportError:
+            message = "Docling nicht installiert. Bitte 'pip install docling' ausführen."
+            return results + [(input_file, message, False) for input_file, _, _ in todo]
+        except ConversionError as e:
+            return results + [(input_file, str(e), False) for input_file, _, _ in todo]
+        
+        settings.perf.doc_batch_size = batch_size
+        
+        for start in range(0, len(todo), batch_size):
+            chunk = {Path(item[0]).resolve(): item for item in todo[start:start + batch_size]}
+            # Telemetrie: Zeit seit dem vorigen gelieferten Dokument (convert_all liefert fortlaufend)
+            last_done = time.perf_counter()
+            try:
+                for conv in converter.convert_all(
+                    [item[0] for item in chunk.values()], raises_on_error=False
+                ):
+                    item = chunk.pop(Path(conv.input.file).resolve(), None)
+                    if item is None:
+                        continue
+                    input_file, pending, outputs = item
+                    try:
+                        if conv.status not in (ConversionStatus.SUCCESS, ConversionStatus.PARTIAL_SUCCESS):
+                            errors = '; '.join(str(e.error_message) for e in conv.errors) or conv.status
+                            raise ConversionError(f"Docling-Fehler: {errors}")
+                        for fmt, cache_key in pending.items():
+                            output_file = output_path / f"{Path(input_file).stem}.{fmt}"
+                            outputs[fmt] = self._export_docling_document(conv.document, output_file, fmt, options)
+                            if cache_key is not None:
+                                self.cache.put(cache_key, outputs[fmt])
+                        results.append((input_file, packed(outputs), True))
+                        success = True
+                    except Exception as e:
+                        results.append((input_file, str(e), False))
+                        success = False
+                    now = time.perf_counter()
+                    self._record_telemetry(input_file, '+'.join(pending), options, now - last_done, None,
+                                           success, 'docling')
+                    last_done = now
+            except Exception:
+                pass  # Batch abgebrochen - Rest wird unten einzeln konvertiert
+            
+            # Nicht gelieferte Dokumente einzeln nachholen (Fehler-Isolation)
+            for input_file, pending, outputs in chunk.values():
+                self.metrics.count('engine_fallbacks', source='docling_batch', target='docling')
+                try:
+                    outputs.update(self.convert_multi(input_file, list(pending), output_dir, options))
+                    results.append((input_file, packed(outputs), True))
+                except Exception as e:
+                    results.append((input_file, str(e), False))
+        
+        return results
+    
+    def _export_docling_document(self, document, output_file: Path, output_format: str, options: dict) -> str:
+        """Exportiert ein bereits geparstes DoclingDocument (billig)"""
+        if output_format == 'markdown' or output_format == 'md':
+            content = document.export_to_markdown()
+            output_file = output_file.with_suffix('.md')
+            output_file.write_text(content, encoding='utf-8')
+        elif output_format == 'html':
+            content = document.export_to_html()
+            output_file = output_file.with_suffix('.html')
+            output_file.write_text(content, encoding='utf-8')
+        elif output_format == 'docx':
+            # PERFORMANCE: Direkte Konvertierung ohne Zwischenschritt wenn möglich
+            md_content = document.export_to_markdown()
+            temp_md = Path(tempfile.gettempdir()) / f"{output_file.stem}_{os.getpid()}.md"
+            temp_md.write_text(md_content, encoding='utf-8')
             try:
-                from docling.document_converter import DocumentConverter as DoclingConverter
-                self._docling_converter = DoclingConverter()
-            except ImportError:
-                raise ConversionError("Docling nicht installiert. Bitte 'pip install docling' ausführen.")
-        return self._docling_converter
+                return self._convert_with_pandoc(str(temp_md), output_file, 'docx', options)
+            finally:
+                temp_md.unlink(missing_ok=True)
+        
+        return str(output_file)
     
     def _convert_with_docling(self, input_file: str, output_file: Path, output_format: str, options: dict) -> str:
         """Konvertierung mit Docling (KI-gestützt für PDFs) - OPTIMIERT"""
         try:
-            from docling.datamodel.pipeline_options import PdfPipelineOptions
-            
-            # PERFORMANCE: Lazy loading des Converters
-            converter = self._get_docling_converter()
-            
-            # PERFORMANCE: Optimierte Pipeline-Optionen
-            pipeline_options = PdfPipelineOptions()
-            if options.get('ocr', False):
-                pipeline_options.do_ocr = True
-            
-            # Qualitäts-basierte Optimierung
-            quality = options.get('quality', 2)
-            if quality == 1:  # Niedrig = schnell
-                pipeline_options.do_table_structure = False
-            
-            result = converter.convert(input_file, pipeline_options=pipeline_options)
-            
-            if output_format == 'markdown' or output_format == 'md':
-                content = result.document.export_to_markdown()
-                output_file = output_file.with_suffix('.md')
-                output_file.write_text(content, encoding='utf-8')
-            elif output_format == 'html':
-                content = result.document.export_to_html()
-                output_file = output_file.with_suffix('.html')
-                output_file.write_text(content, encoding='utf-8')
-            elif output_format == 'docx':
-                # PERFORMANCE: Direkte Konvertierung ohne Zwischenschritt wenn möglich
-                md_content = result.document.export_to_markdown()
-                temp_md = Path(tempfile.gettempdir()) / f"{output_file.stem}_{os.getpid()}.md"
-                temp_md.write_text(md_content, encoding='utf-8')
-                try:
-                    return self._convert_with_pandoc(str(temp_md), output_file, 'docx', options)
-                finally:
-                    temp_md.unlink(missing_ok=True)
-            
-            return str(output_file)
+            document = self._parse_with_docling(input_file, output_file.parent, options)
+            with self.metrics.span('docling.export'):
+                return self._export_docling_document(document, output_file, output_format, options)
         except ImportError:
             raise ConversionError("Docling nicht installiert. Bitte 'pip install docling' ausführen.")
         except Exception as e:
@@ -156,6 +796,328 @@ class DocumentConverter:
         self._pandoc_available = shutil.which('pandoc') is not None
         return self._pandoc_available
     
+    @staticmethod
+    def _pandoc_quality_args(quality: int) -> List[str]:
+        """PERFORMANCE: Qualitäts-basierte Pandoc-Optionen"""
+        if quality == 3:
+            return ['--standalone', '--toc', '--number-sections']
+        elif quality == 1:
+            return ['--no-highlight']  # Schneller ohne Syntax-Highlighting
+        return []
+    
+    @staticmethod
+    def _iter_markdown_utf8(source, chunk_size: int = MARKDOWN_CHUNK_BYTES):
+        """
+        Liest Markdown aus einem Binär-Stream und liefert normalisierte UTF-8-Blöcke
+        
+        PERFORMANCE: Das Encoding wird einmal an der Stichprobe am Anfang erkannt, danach
+        wird blockweise transkodiert - jedes Byte wird genau einmal gelesen, keine
+        bereinigte Kopie auf der Platte. Nicht dekodierbare Bytes werden ersetzt.
+        """
+        chunk = source.read(ENCODING_SAMPLE_BYTES)
+        decoder = codecs.getincrementaldecoder(detect_text_encoding(chunk))(errors='replace')
+        held = ''
+        while chunk:
+            text = held + decoder.decode(chunk)
+            # 'ÿ' am Blockende zurückhalten, falls ein 'ÿþ'-Artefakt über die Grenze geht
+            held = 'ÿ' if text.endswith('ÿ') else ''
+            text = text[:len(text) - len(held)].replace('\ufeff', '').replace('ÿþ', '')
+            if text:
+                yield text.encode('utf-8')
+            chunk = source.read(chunk_size)
+        text = (held + decoder.decode(b'', final=True)).replace('\ufeff', '')
+        if text:
+            yield text.encode('utf-8')
+    
+    def _run_pandoc_stream(self, chunks, reader: Optional[str], writer: Optional[str], options: dict,
+                           extra_args: List[str] = None, output_file: Path = None,
+                           input_file: str = None) -> bytes:
+        """
+        Startet pandoc und schreibt chunks nach stdin (oder liest input_file direkt)
+        
+        Ohne output_file geht das Ergebnis über stdout zurück. stdout/stderr werden in
+        eigenen Threads gelesen, damit volle Pipes pandoc nicht blockieren.
+        """
+        if input_file is None and self._get_pandoc_server() is not None:
+            data = b''.join(chunks or ())
+            output = self._run_pandoc_server(data, reader, writer, options, extra_args, output_file)
+            if output is not None:
+                return output
+            chunks = [data]
+        
+        quality = options.get('quality', 2)
+        timeout = 90 if quality == 3 else 45
+        cmd = ['pandoc']
+        if input_file is not None:
+            cmd.append(input_file)
+        if reader:
+            cmd += ['-f', reader]
+        if writer:
+            cmd += ['-t', writer]
+        cmd += ['-o', str(output_file) if output_file is not None else '-']
+        cmd += self._pandoc_quality_args(quality) + (extra_args or [])
+        
+        with self.metrics.span('pandoc.render'):
+            try:
+                process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                           stderr=subprocess.PIPE)
+            except FileNotFoundError:
+                raise ConversionError("Pandoc nicht installiert. Bitte von https://pandoc.org installieren.")
+            
+            output = {}
+            readers = [
+                threading.Thread(target=lambda name=name, pipe=pipe: output.__setitem__(name, pipe.read()),
+                                 daemon=True)
+                for name, pipe in (('stdout', process.stdout), ('stderr', process.stderr))
+            ]
+            for thread in readers:
+                thread.start()
+            timed_out = threading.Event()
+            timer = threading.Timer(timeout, lambda: (timed_out.set(), process.kill()))
+            timer.start()
+            try:
+                try:
+                    for chunk in chunks or ():
+                        process.stdin.write(chunk)
+                except BrokenPipeError:
+                    pass  # pandoc hat sich beendet - Fehlermeldung steht in stderr
+                finally:
+                    try:
+                        process.stdin.close()
+                    except BrokenPipeError:
+                        pass
+                returncode = process.wait()
+                for thread in readers:
+                    thread.join()
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+            finally:
+                timer.cancel()
+        
+        if timed_out.is_set():
+            raise ConversionError(f"Pandoc-Konvertierung dauerte zu lange (>{timeout}s)")
+        if returncode != 0:
+            raise ConversionError(f"Pandoc-Fehler: {output.get('stderr', b'').decode('utf-8', errors='replace')}")
+        return output.get('stdout', b'')
+    
+    def _get_pandoc_server(self):
+        """Lazy Start des pandoc-Servers (None wenn deaktiviert oder nicht startbar)"""
+        if not self.pandoc_server_enabled or self._pandoc_server_failed:
+            return None
+        if self._pandoc_server is None:
+            # Double-checked: gleichzeitige erste Requests (HTTP-Dienst) starten nur einen Server
+            with self._engine_start_lock:
+                if self._pandoc_server is None and not self._pandoc_server_failed:
+                    from pandoc_server import PandocServer, PandocServerError
+                    server = PandocServer()
+                    try:
+                        with self.metrics.span('pandoc.server_start'):
+                            server.start()
+                    except PandocServerError:
+                        # pandoc ohne Server-Modus (< 3.0 bzw. ohne pandoc-server): dauerhaft CLI
+                        self._pandoc_server_failed = True
+                        self.metrics.count('engine_fallbacks', source='pandoc_server', target='pandoc')
+                        return None
+                    self._pandoc_server = server
+        return self._pandoc_server
+    
+    @staticmethod
+    def _pandoc_server_request(data: bytes, reader: Optional[str], writer: Optional[str], options: dict,
+                               extra_args: List[str] = None, output_file: Path = None) -> Optional[dict]:
+        """Request für den pandoc-Server (None = nur über die CLI abbildbar)"""
+        from pandoc_server import pandoc_request
+        if writer is None and output_file is not None:
+            writer = PANDOC_WRITERS.get(Path(output_file).suffix.lstrip('.').lower())
+        if not reader or not writer or any(arg != '--standalone' for arg in extra_args or ()):
+            return None
+        return pandoc_request(data.decode('utf-8', errors='replace'), reader, writer,
+                              options.get('quality', 2), standalone=bool(extra_args))
+    
+    def _run_pandoc_server(self, data: bytes, reader: Optional[str], writer: Optional[str], options: dict,
+                           extra_args: List[str] = None, output_file: Path = None) -> Optional[bytes]:
+        """
+        Konvertierung über den persistenten pandoc-Server
+        
+        PERFORMANCE: Ein HTTP-Roundtrip statt Prozessstart - kleine Dokumente kosten
+        Millisekunden. None = nicht abbildbar oder Server-Fehler (Aufrufer nimmt die CLI).
+        """
+        request = self._pandoc_server_request(data, reader, writer, options, extra_args, output_file)
+        if request is None:
+            return None
+        from pandoc_server import PandocServerError
+        try:
+            with self.metrics.span('pandoc.server'):
+                output = self._pandoc_server.convert(request)
+        except PandocServerError:
+            self.metrics.count('engine_fallbacks', source='pandoc_server', target='pandoc')
+            return None
+        if output_file is not None:
+            Path(output_file).write_bytes(output)
+        return output
+    
+    def convert_pandoc_batch(self, input_files: List[str], output_format: str, output_dir: str,
+                             options: dict = None, batch_size: int = 32) -> List[tuple]:
+        """
+        Konvertiert viele kleine Text-Dokumente über /batch des pandoc-Servers
+        
+        Gibt [(datei, ergebnis, erfolg)] zurück wie convert_docling_batch. Dokumente, die
+        der Server nicht abbilden kann oder bei denen er scheitert, laufen einzeln über convert().
+        
+        PERFORMANCE: Ein Request pro batch_size Dokumente statt eines Prozesses pro Dokument.
+        """
+        options = options or {}
+        output_format = output_format.lower()
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        server = self._get_pandoc_server()
+        
+        results = []
+        todo = []  # (datei, ausgabedatei, cache_key, request)
+        single = []
+        for input_file in input_files:
+            input_ext = detect_format(input_file) if Path(input_file).exists() else ''
+            if (server is None or self._select_route(input_ext, output_format) != 'pandoc'
+                    or input_ext not in PANDOC_READERS or output_format not in PANDOC_WRITERS):
+                single.append(input_file)
+                continue
+            cache_key, cached = self._cache_lookup(input_file, output_path, output_format, options)
+            if cached:
+                results.append((input_file, cached, True))
+                continue
+            with open(input_file, 'rb') as source:
+                if PANDOC_READERS[input_ext] == 'markdown':
+                    data = b''.join(self._iter_markdown_utf8(source))
+                else:
+                    data = source.read()
+            output_file = output_path / f"{Path(input_file).stem}.{output_format}"
+            output_file = output_file.with_suffix('.md' if output_format == 'markdown' else f'.{output_format}')
+            request = self._pandoc_server_request(data, PANDOC_READERS[input_ext], PANDOC_WRITERS[output_format],
+                                                  options)
+            todo.append((input_file, output_file, cache_key, request))
+        
+        from pandoc_server import PandocServerError
+        for start in range(0, len(todo), max(1, batch_size)):
+            chunk = todo[start:start + max(1, batch_size)]
+            started = time.perf_counter()
+            try:
+                with self.metrics.span('pandoc.server_batch'):
+                    outputs = server.convert_batch([item[3] for item in chunk])
+            except PandocServerError:
+                outputs = [None] * len(chunk)
+            elapsed = (time.perf_counter() - started) / len(chunk)
+            for (input_file, output_file, cache_key, _), output in zip(chunk, outputs):
+                if not isinstance(output, bytes):
+                    # Fehler-Isolation: dieses Dokument einzeln über die CLI
+                    self.metrics.count('engine_fallbacks', source='pandoc_server', target='pandoc')
+                    single.append(input_file)
+                    continue
+                output_file.write_bytes(output)
+                if cache_key is not None:
+                    self.cache.put(cache_key, str(output_file))
+                self._record_telemetry(input_file, output_format, options, elapsed, str(output_file), True, 'pandoc')
+                results.append((input_file, str(output_file), True))
+        
+        for input_file in single:
+            try:
+                results.append((input_file, self.convert(input_file, output_format, output_dir, options), True))
+            except Exception as e:
+                results.append((input_file, str(e), False))
+        return results
+    
+    def _run_pandoc_bytes(self, data: bytes, reader: str, writer: str, options: dict,
+                          extra_args: List[str] = None) -> bytes:
+        """Pandoc über stdin/stdout - keine Dateien auf der Platte"""
+        return self._run_pandoc_stream([data], reader, writer, options, extra_args)
+    
+    def _run_pandoc_file(self, input_file: str, output_file: Path, options: dict, extra_args: List[str] = None):
+        """Pandoc von Datei zu Datei - Markdown wird dabei normalisiert über stdin gestreamt"""
+        input_ext = detect_format(input_file)
+        if input_ext in ('md', 'markdown'):
+            with open(input_file, 'rb') as source:
+                self._run_pandoc_stream(self._iter_markdown_utf8(source), 'markdown', None, options,
+                                        extra_args, output_file)
+        elif input_ext in PANDOC_READERS and self._get_pandoc_server() is not None:
+            # Der Server liest keine Dateien - Text geht im Request mit
+            with open(input_file, 'rb') as source:
+                self._run_pandoc_stream([source.read()], PANDOC_READERS[input_ext], None, options,
+                                        extra_args, output_file)
+        else:
+            self._run_pandoc_stream(None, None, None, options, extra_args, output_file, input_file=input_file)
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _weasyprint_available() -> bool:
+        """WeasyPrint nutzbar? (ImportError oder OSError ohne Pango-Runtime)"""
+        try:
+            import weasyprint  # noqa: F401
+            return True
+        except (ImportError, OSError):
+            return False
+    
+    @staticmethod
+    def _libreoffice_timeout(options: dict) -> int:
+        # PERFORMANCE: Erhöhtes Timeout für große Dateien
+        return 120 if options.get('quality', 2) == 3 else 60
+    
+    def _render_html_pdf(self, html: bytes, options: dict = None) -> Optional[bytes]:
+        """
+        HTML -> PDF im Speicher: warmer LibreOffice-Pool, sonst WeasyPrint (in-process)
+        
+        None = kein schneller Renderer verfügbar (Aufrufer nimmt den Weg über soffice).
+        """
+        pool = self._html_pdf_pool()
+        if pool is not None:
+            from libreoffice_pool import LibreOfficePoolError, LibreOfficeTimeoutError
+            job_timeout = self._libreoffice_timeout(options or {})
+            try:
+                with self.metrics.span('libreoffice.render'):
+                    # Als Writer-Dokument importieren (nicht Writer/Web) -> normales Seitenlayout
+                    return pool.convert_bytes(html, 'pdf', infiltername='HTML (StarWriter)',
+                                              job_timeout=job_timeout)
+            except LibreOfficeTimeoutError as e:
+                raise ConversionError(str(e))
+            except LibreOfficePoolError:
+                self.metrics.count('engine_fallbacks', source='libreoffice_pool', target='weasyprint')
+        
+        if self._weasyprint_available():
+            from weasyprint import HTML
+            try:
+                with self.metrics.span('html.render'):
+                    return HTML(string=html.decode('utf-8', errors='replace')).write_pdf()
+            except Exception:
+                self.metrics.count('engine_fallbacks', source='weasyprint', target='soffice')
+        return None
+    
+    def _html_pdf_pool(self):
+        """LibreOffice-Pool für HTML -> PDF; None ohne LibreOffice, damit WeasyPrint übernehmen kann"""
+        try:
+            return self._get_libreoffice_pool()
+        except ConversionError:
+            return None  # soffice nicht installiert
+    
+    def _has_fast_html_pdf(self) -> bool:
+        return self._html_pdf_pool() is not None or self._weasyprint_available()
+    
+    def _pandoc_pdf_bytes(self, source, input_ext: str, options: dict) -> Optional[bytes]:
+        """
+        Markdown -> PDF ohne Zwischendateien: pandoc (stdin/stdout) -> HTML -> _render_html_pdf
+        
+        PERFORMANCE: Statt bereinigter Kopie, HTML-Temp-Datei und kaltem soffice-Prozess
+        pro Dokument nur ein pandoc-Aufruf und ein Render-Auftrag an eine warme Engine.
+        None = kein schneller Renderer verfügbar.
+        """
+        if not self._has_fast_html_pdf():
+            return None
+        reader = PANDOC_READERS.get(input_ext, 'markdown')
+        if reader == 'html':
+            return self._render_html_pdf(source.read(), options)
+        chunks = self._iter_markdown_utf8(source) if reader == 'markdown' else [source.read()]
+        with self.metrics.span('pandoc.html'):
+            html = self._run_pandoc_stream(chunks, reader, 'html', options, ['--standalone'])
+        return self._render_html_pdf(html, options)
+    
     def _convert_with_pandoc(self, input_file: str, output_file: Path, output_format: str, options: dict) -> str:
         """Konvertierung mit Pandoc - OPTIMIERT mit BOM-Bereinigung"""
         
@@ -163,106 +1125,51 @@ class DocumentConverter:
         if not self._check_pandoc_available():
             # Für Markdown zu PDF: Nutze markdown-pdf Library
             if output_format == 'pdf':
+                self.metrics.count('engine_fallbacks', source='pandoc', target='markdown_pdf')
                 return self._convert_markdown_to_pdf_native(input_file, output_file, options)
             # Für andere Formate: Fehler
             raise ConversionError("Pandoc nicht installiert. Bitte Terminal neu starten oder von https://pandoc.org installieren.")
         
-        try:
-            # BOM-Bereinigung für Markdown-Dateien
-            input_path = Path(input_file)
-            if input_path.suffix.lower() in ['.md', '.markdown']:
-                # Versuche verschiedene Encodings
-                content = None
-                for encoding in ['utf-8-sig', 'utf-16', 'utf-16-le', 'utf-16-be', 'utf-8', 'latin-1']:
-                    try:
-                        with open(input_file, 'r', encoding=encoding) as f:
-                            content = f.read()
-                        break
-                    except (UnicodeDecodeError, UnicodeError):
-                        continue
-                
-                if content is None:
-                    raise ConversionError("Konnte Markdown-Datei nicht lesen. Unbekanntes Encoding.")
-                
-                # Entferne BOM-Zeichen
-                content = content.replace('\ufeff', '').replace('ÿþ', '')
-                
-                # Erstelle temporäre bereinigte Datei
-                temp_input = input_path.parent / f"{input_path.stem}_clean{input_path.suffix}"
-                with open(temp_input, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                input_file = str(temp_input)
-                cleanup_temp = True
-            else:
-                cleanup_temp = False
-            
-            format_map = {
-                'markdown': 'md',
-                'md': 'md',
-                'docx': 'docx',
-                'html': 'html',
-                'pdf': 'pdf',
-                'pptx': 'pptx'
-            }
-            
-            output_ext = format_map.get(output_format, output_format)
-            output_file = output_file.with_suffix(f'.{output_ext}')
-            
-            # PERFORMANCE: Timeout basierend auf Qualität
-            quality = options.get('quality', 2)
-            timeout = 90 if quality == 3 else 45
-            
-            cmd = ['pandoc', input_file, '-o', str(output_file)]
-            
-            # PERFORMANCE: Qualitäts-basierte Optimierung
-            if quality == 3:
-                cmd.extend(['--standalone', '--toc', '--number-sections'])
-            elif quality == 1:
-                cmd.append('--no-highlight')  # Schneller ohne Syntax-Highlighting
-            
-            # PDF-Engine: Nutze LibreOffice als Fallback
-            if output_format == 'pdf':
-                # Konvertiere erst zu HTML, dann mit LibreOffice zu PDF
-                html_temp = output_file.with_suffix('.html')
-                cmd_html = ['pandoc', input_file, '-o', str(html_temp), '--standalone']
-                subprocess.run(cmd_html, capture_output=True, text=True, check=True, timeout=timeout)
-                
-                # Jetzt HTML zu PDF mit LibreOffice
-                result = self._convert_with_libreoffice(str(html_temp), output_file, 'pdf', options)
-                html_temp.unlink(missing_ok=True)  # Cleanup
-                
-                # Cleanup temp input
-                if cleanup_temp:
-                    Path(input_file).unlink(missing_ok=True)
-                
-                return result
-            
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                check=True, 
-                timeout=timeout
-            )
-            
-            # Cleanup temp input
-            if cleanup_temp:
-                Path(input_file).unlink(missing_ok=True)
-            
-            if not output_file.exists():
-                raise ConversionError("Ausgabedatei wurde nicht erstellt")
-            
-            return str(output_file)
-        except FileNotFoundError:
-            raise ConversionError("Pandoc nicht installiert. Bitte von https://pandoc.org installieren.")
-        except subprocess.CalledProcessError as e:
-            raise ConversionError(f"Pandoc-Fehler: {e.stderr}")
-        except subprocess.TimeoutExpired:
-            raise ConversionError(f"Pandoc-Konvertierung dauerte zu lange (>{timeout}s)")
-        finally:
-            # Cleanup temp file falls Exception
-            if 'cleanup_temp' in locals() and cleanup_temp and 'input_file' in locals():
-                Path(input_file).unlink(missing_ok=True)
+        if output_format == 'pdf':
+            # PERFORMANCE: Schneller Weg komplett im Speicher, sonst unten über HTML-Datei + soffice
+            with open(input_file, 'rb') as source:
+                pdf = self._pandoc_pdf_bytes(source, detect_format(input_file), options)
+            if pdf is not None:
+                output_file = output_file.with_suffix('.pdf')
+                output_file.write_bytes(pdf)
+                return str(output_file)
+            self.metrics.count('engine_fallbacks', source='pandoc_pipe', target='soffice')
+        
+        format_map = {
+            'markdown': 'md',
+            'md': 'md',
+            'docx': 'docx',
+            'html': 'html',
+            'pdf': 'pdf',
+            'pptx': 'pptx'
+        }
+        
+        output_ext = format_map.get(output_format, output_format)
+        output_file = output_file.with_suffix(f'.{output_ext}')
+        
+        # PDF-Engine: Nutze LibreOffice als Fallback
+        if output_format == 'pdf':
+            # Konvertiere erst zu HTML, dann mit LibreOffice zu PDF
+            html_temp = output_file.with_suffix('.html')
+            try:
+                with self.metrics.span('pandoc.html'):
+                    self._run_pandoc_file(input_file, html_temp, options, ['--standalone'])
+                return self._convert_with_libreoffice(str(html_temp), output_file, 'pdf', options)
+            finally:
+                html_temp.unlink(missing_ok=True)
+        
+        # BOM-Bereinigung und Encoding-Erkennung passieren beim Streamen nach stdin
+        self._run_pandoc_file(input_file, output_file, options)
+        
+        if not output_file.exists():
+            raise ConversionError("Ausgabedatei wurde nicht erstellt")
+        
+        return str(output_file)
     
     @lru_cache(maxsize=1)
     def _find_soffice_path(self) -> str:
@@ -284,8 +1191,47 @@ class DocumentConverter:
         
         raise ConversionError("LibreOffice nicht gefunden. Bitte installieren: https://www.libreoffice.org")
     
+    def _get_libreoffice_pool(self):
+        """Lazy Start des LibreOffice-Pools (None wenn deaktiviert oder nicht startbar)"""
+        if self.libreoffice_pool_size <= 0 or self._libreoffice_pool_failed:
+            return None
+        if self._libreoffice_pool is None:
+            # Double-checked: gleichzeitige erste Requests (HTTP-Dienst) starten nur einen Pool
+            with self._engine_start_lock:
+                if self._libreoffice_pool is None and not self._libreoffice_pool_failed:
+                    from libreoffice_pool import LibreOfficePool, LibreOfficePoolError
+                    pool = LibreOfficePool(
+                        size=self.libreoffice_pool_size,
+                        soffice_path=self._find_soffice_path(),
+                        max_jobs_per_instance=self.libreoffice_max_jobs
+                    )
+                    try:
+                        with self.metrics.span('libreoffice.pool_start'):
+                            pool.start()
+                    except LibreOfficePoolError:
+                        # Kein unoserver verfügbar: dauerhaft auf soffice --convert-to zurückfallen
+                        self._libreoffice_pool_failed = True
+                        self.metrics.count('engine_fallbacks', source='libreoffice_pool', target='soffice')
+                        return None
+                    self._libreoffice_pool = pool
+        return self._libreoffice_pool
+    
     def _convert_with_libreoffice(self, input_file: str, output_file: Path, output_format: str, options: dict) -> str:
         """Konvertierung mit LibreOffice (headless) - OPTIMIERT"""
+        timeout = self._libreoffice_timeout(options)
+        pool = self._get_libreoffice_pool()
+        if pool is not None:
+            from libreoffice_pool import LibreOfficePoolError, LibreOfficeTimeoutError
+            try:
+                with self.metrics.span('libreoffice.render'):
+                    return pool.convert(input_file, str(output_file), output_format, job_timeout=timeout)
+            except LibreOfficeTimeoutError as e:
+                # Kein zweiter Versuch per soffice: dasselbe Dokument hinge dort genauso
+                raise ConversionError(str(e))
+            except LibreOfficePoolError:
+                # Fallback: einmaliger soffice-Prozess
+                self.metrics.count('engine_fallbacks', source='libreoffice_pool', target='soffice')
+        
         try:
             format_map = {
                 'pdf': 'pdf',
@@ -316,16 +1262,14 @@ class DocumentConverter:
                 input_file
             ]
             
-            # PERFORMANCE: Erhöhtes Timeout für große Dateien
-            timeout = 120 if options.get('quality', 2) == 3 else 60
-            
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                timeout=timeout,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            )
+            with self.metrics.span('libreoffice.soffice'):
+                result = subprocess.run(
+                    cmd, 
+                    capture_output=True, 
+                    text=True, 
+                    timeout=timeout,
+                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                )
             
             expected_output = output_dir / f"{Path(input_file).stem}.{lo_format}"
             
@@ -353,32 +1297,424 @@ class DocumentConverter:
         from PIL import Image
         return Image
     
+    @staticmethod
+    def _pdf_save_kwargs(quality: int) -> dict:
+        # PERFORMANCE: Qualitäts-basierte DPI
+        dpi = {1: 72, 2: 150, 3: 300}.get(quality, 150)
+        
+        # PERFORMANCE: Optimierte Save-Parameter
+        return {
+            'format': 'PDF',
+            'resolution': float(dpi),
+            'optimize': quality < 3  # Nur bei niedriger/mittlerer Qualität
+        }
+    
+    def _write_pdf_image(self, img, target, quality: int):
+        """Speichert ein Pillow-Bild als PDF (target: Pfad oder file-like)"""
+        # RGB konvertieren falls nötig
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        img.save(target, **self._pdf_save_kwargs(quality))
+    
+    @staticmethod
+    def _target_box(options: dict) -> Optional[tuple]:
+        """(max. Breite, max. Höhe) aus max_dimension/max_width/max_height - None = Originalgröße"""
+        max_dimension = int(options.get('max_dimension') or 0)
+        width = int(options.get('max_width') or max_dimension)
+        height = int(options.get('max_height') or max_dimension)
+        if width <= 0 and height <= 0:
+            return None
+        return (width if width > 0 else 2 ** 31, height if height > 0 else 2 ** 31)
+    
+    def _decode_image(self, img, options: dict):
+        """
+        Dekodiert ein geöffnetes Bild - mit Zielgröße (_target_box) gleich verkleinert
+        
+        PERFORMANCE: Bei JPEG skaliert draft() schon im Decoder (DCT-Skalierung auf 1/2,
+        1/4 oder 1/8) - ein 24-MP-Foto für 1600 px wird mit 1/8 der Pixel dekodiert.
+        Andere Formate (HEIC, PNG, TIFF) werden voll dekodiert; thumbnail() verkleinert
+        dann erst per reduce() in ganzzahligen Schritten und danach fein.
+        """
+        box = self._target_box(options)
+        with self.metrics.span('image.decode'):
+            if box is None or (img.width <= box[0] and img.height <= box[1]):
+                img.load()
+                return img
+            if img.format == 'JPEG':
+                scale = min(box[0] / img.width, box[1] / img.height)
+                # draft wählt den kleinsten DCT-Faktor, der mindestens diese Größe liefert
+                img.draft(None, (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+            img.load()
+        with self.metrics.span('image.resize'):
+            img.thumbnail(box)
+        return img
+    
+    @staticmethod
+    def _fit_frame(frame, box: Optional[tuple]):
+        if box is not None:
+            frame.thumbnail(box)
+        return frame
+    
+    @staticmethod
+    def _frame_count(img) -> int:
+        # MPO (Handy-Fotos): weitere "Frames" sind Vorschau-/Tiefenbilder, keine Seiten
+        if img.format == 'MPO':
+            return 1
+        return getattr(img, 'n_frames', 1)
+    
+    def _frame_range(self, img, options: dict) -> tuple:
+        """(erster, letzter) Frame, 1-basiert - options['pages'] wählt wie bei PDFs einen Bereich"""
+        count = self._frame_count(img)
+        if options.get('pages'):
+            return self._parse_page_range(options['pages'], count)
+        return 1, count
+    
+    def _iter_frames(self, img, first: int = 1, last: Optional[int] = None):
+        """
+        Liefert (Nummer, Frame) für die Frames first..last als unabhängige Kopien
+        
+        PERFORMANCE: ImageSequence dekodiert lazy, Frame für Frame. Die Kopie ist nötig,
+        weil der nächste seek() den aktuellen Frame überschreibt.
+        """
+        from PIL import ImageSequence
+        for number, frame in enumerate(ImageSequence.Iterator(img), 1):
+            if number < first:
+                continue
+            if last is not None and number > last:
+                break
+            with self.metrics.span('image.decode'):
+                copy = frame.copy()
+            yield number, copy
+    
+    def _map_frames(self, func, frames, options: dict):
+        """
+        Wendet func(nummer, frame) parallel auf Frames an und liefert die Ergebnisse in Reihenfolge
+        
+        PERFORMANCE: Pillow gibt beim Konvertieren und Kodieren die GIL frei. Höchstens
+        options['frame_buffer'] Frames (Standard FRAME_BUFFER) sind gleichzeitig in Arbeit,
+        options['image_threads'] begrenzt die Threads.
+        """
+        threads = max(1, int(options.get('image_threads', min(os.cpu_count() or 1, 4))))
+        buffer = max(threads, int(options.get('frame_buffer', FRAME_BUFFER)))
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            in_flight = deque()
+            for number, frame in frames:
+                in_flight.append(executor.submit(func, number, frame))
+                if len(in_flight) >= buffer:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+    
+    def _write_pdf_frames(self, img, target, options: dict, first: int = 1, last: Optional[int] = None):
+        """
+        Mehrseitiges PDF aus den Frames eines Bildes (GIF, TIFF, HEIC-Sequenz)
+        
+        PERFORMANCE: Frames werden parallel nach RGB gewandelt und in Blöcken von höchstens
+        options['frame_block_mb'] (Standard FRAME_BLOCK_BYTES) dekodierten Bytes geschrieben -
+        der erste Block per save_all/append_images, jeder weitere per append an dieselbe
+        Datei. Ein Bild mit 500 Frames liegt so nie komplett dekodiert im Speicher; kleine
+        Animationen passen in einen Block und kosten kein erneutes Einlesen des PDFs.
+        target: Pfad oder echte Datei (mit fileno).
+        """
+        save_kwargs = self._pdf_save_kwargs(options.get('quality', 2))
+        box = self._target_box(options)
+        
+        def to_rgb(number, frame):
+            frame = self._fit_frame(frame, box)
+            return frame if frame.mode == 'RGB' else frame.convert('RGB')
+        
+        def save_block(block, appending):
+            block[0].save(target, save_all=True, append_images=block[1:], append=appending, **save_kwargs)
+        
+        self._save_frame_blocks(self._map_frames(to_rgb, self._iter_frames(img, first, last), options),
+                                save_block, options)
+    
+    def _write_tiff_frames(self, img, target, options: dict):
+        """
+        Mehrseitiges TIFF mit verkleinerten Frames, Seite für Seite geschrieben
+        
+        PERFORMANCE: Pillows TIFF-Writer sammelt append_images in einer Liste; hier
+        schreibt ein einziger AppendingTiffWriter jeden Frame sofort, sobald er aus der
+        Pipeline kommt - im Speicher sind nur die Frames im Puffer von _map_frames.
+        target: Pfad oder seekbare Datei.
+        """
+        from PIL import TiffImagePlugin
+        box = self._target_box(options)
+        frames = self._map_frames(lambda number, frame: self._fit_frame(frame, box), self._iter_frames(img), options)
+        written = 0
+        with TiffImagePlugin.AppendingTiffWriter(str(target) if isinstance(target, Path) else target,
+                                                 new=True) as writer:
+            for frame in frames:
+                with self.metrics.span('image.encode'):
+                    frame.save(writer, 'TIFF', compression='tiff_deflate')
+                    writer.newFrame()
+                frame.close()
+                written += 1
+        if not written:
+            raise ConversionError("Keine Frames im Bild gefunden")
+    
+    def _save_frame_blocks(self, frames, save_block, options: dict):
+        """
+        Sammelt Frames bis options['frame_block_mb'] (Standard FRAME_BLOCK_BYTES) dekodierte
+        Bytes erreicht sind und schreibt sie per save_block(block, appending) - der erste
+        Block legt die Datei an, jeder weitere wird angehängt
+        """
+        block_budget = int(options.get('frame_block_mb', FRAME_BLOCK_BYTES // (1024 * 1024))) * 1024 * 1024
+        block = []
+        block_bytes = 0
+        appending = False
+        
+        def flush():
+            with self.metrics.span('image.encode'):
+                save_block(block, appending)
+            for frame in block:
+                frame.close()
+            block.clear()
+        
+        for frame in frames:
+            block.append(frame)
+            block_bytes += frame.width * frame.height * len(frame.getbands())
+            if block_bytes >= block_budget:
+                flush()
+                block_bytes = 0
+                appending = True
+        if block:
+            flush()
+        elif not appending:
+            raise ConversionError("Keine Frames im Bild gefunden")
+    
+    
+    def _write_frames(self, img, target, output_format: str, quality: int, append_images: Optional[Iterable] = None) -> bool:
+        """
+        Speichert alle Frames in einem mehrbildfähigen Format (animiertes GIF/PNG,
+        mehrseitiges TIFF, HEIC-Sequenz)
+        
+        Pillow liest die Frames dabei selbst über ImageSequence (oder nimmt img +
+        append_images). False = für dieses Format/diesen Modus nicht möglich (Aufrufer
+        schreibt nur den ersten Frame).
+        """
+        frames = {'save_all': True}
+        if append_images is not None:
+            frames['append_images'] = append_images
+        if output_format == 'gif':
+            # Dauer pro Frame übernimmt Pillow aus den Frame-Infos, die Wiederholung nicht
+            if 'loop' in img.info:
+                frames['loop'] = img.info['loop']
+            img.save(target, 'GIF', optimize=True, **frames)
+        elif output_format == 'png':
+            compress_level = {1: 1, 2: 6, 3: 9}.get(quality, 6)
+            img.save(target, 'PNG', compress_level=compress_level, **frames)
+        elif output_format in ['tiff', 'tif']:
+            img.save(target, 'TIFF', compression='tiff_deflate', **frames)
+        elif output_format == 'webp':
+            quality_value = {1: 60, 2: 80, 3: 90}.get(quality, 80)
+            img.save(target, 'WEBP', quality=quality_value, **frames)
+        elif output_format in ['heic', 'heif'] and img.mode in ('RGB', 'RGBA'):
+            quality_value = {1: 60, 2: 85, 3: 95}.get(quality, 85)
+            img.save(target, 'HEIF', quality=quality_value, **frames)
+        else:
+            return False
+        return True
+    
+    def _write_frame_files(self, img, output_file: Path, output_format: str, options: dict,
+                           first: int, last: int) -> List[str]:
+        """Einzelbild-Formate (JPG): ein nummeriertes Bild pro Frame, parallel kodiert"""
+        quality = options.get('quality', 2)
+        digits = max(3, len(str(last)))
+        box = self._target_box(options)
+        
+        def encode(number, frame):
+            frame = self._fit_frame(frame, box)
+            frame_file = output_file.with_name(f"{output_file.stem}_{number:0{digits}d}{output_file.suffix}")
+            with self.metrics.span('image.encode'):
+                self._write_image(frame, frame_file, output_format, quality)
+            frame.close()
+            return str(frame_file)
+        
+        return list(self._map_frames(encode, self._iter_frames(img, first, last), options))
+    
+    def _write_all_frames(self, img, target, route: str, output_format: str, options: dict) -> bool:
+        """Mehrbildige Eingabe komplett schreiben (PDF oder Mehrbild-Format); False = nicht möglich"""
+        if route == 'image_pdf':
+            self._write_pdf_frames(img, target, options, *self._frame_range(img, options))
+            return True
+        quality = options.get('quality', 2)
+        box = self._target_box(options)
+        if box is not None and (img.width > box[0] or img.height > box[1]):
+            if output_format in ['tiff', 'tif']:
+                self._write_tiff_frames(img, target, options)
+                return True
+            def prepare(frame):
+                frame = self._fit_frame(frame, box)
+                # GIF-Frames sind teils P, teils RGB - APNG/HEIC brauchen einheitliche Modi
+                if output_format != 'gif' and frame.mode == 'P':
+                    frame = frame.convert('RGBA' if 'transparency' in frame.info else 'RGB')
+                return frame
+            
+            # Erster Frame verkleinert vorab, die übrigen lazy während des Schreibens
+            first_frame = prepare(next(self._iter_frames(img, 1, 1))[1])
+            with self.metrics.span('image.encode'):
+                return self._write_frames(first_frame, target, output_format, quality,
+                                          ResizedFrames(self, img, prepare, options))
+        with self.metrics.span('image.encode'):
+            return self._write_frames(img, target, output_format, quality)
+    
+    @staticmethod
+    def _image_dpi(img, quality: int) -> float:
+        """Auflösung aus den Bild-Metadaten (Scans), sonst qualitäts-basiert wie _pdf_save_kwargs"""
+        try:
+            dpi = float(img.info.get('dpi', (0,))[0])
+        except (TypeError, ValueError, IndexError):
+            dpi = 0.0
+        return dpi if dpi >= 10 else float({1: 72, 2: 150, 3: 300}.get(quality, 150))
+    
+    def _iter_image_pages(self, files: List[str]):
+        """Liefert (Seitennummer, (Datei, Frame)) - mehrseitige TIFFs/GIFs ergeben mehrere Seiten"""
+        Image = self._load_pil()
+        number = 0
+        for path in files:
+            try:
+                with Image.open(path) as img:
+                    frames = self._frame_count(img)
+            except Exception as e:
+                raise ConversionError(f"{Path(path).name}: {e}")
+            for frame in range(frames):
+                number += 1
+                yield number, (path, frame)
+    
+    def _prepare_pdf_page(self, path: str, frame: int, options: dict) -> dict:
+        """
+        Bereitet eine Seite für ImagePdfWriter vor (Argumente für add_image_page)
+        
+        JPEG (RGB/Graustufen, ohne Verkleinerung): nur der Header wird gelesen, die Datei
+        selbst wird später unverändert kopiert. Sonst dekodieren (ggf. verkleinert) und als
+        JPEG kodieren, Schwarzweiß ('1') verlustfrei per Flate. Die physische Seitengröße
+        bleibt auch beim Verkleinern erhalten.
+        """
+        from PIL import ImageOps
+        Image = self._load_pil()
+        quality = options.get('quality', 2)
+        try:
+            with Image.open(path) as img:
+                if frame:
+                    img.seek(frame)
+                points_per_pixel = 72.0 / self._image_dpi(img, quality)
+                is_jpeg = img.format in ('JPEG', 'MPO')
+                orientation = img.getexif().get(0x0112, 1) if is_jpeg else 1
+                box = self._target_box(options)
+                fits = box is None or (img.width <= box[0] and img.height <= box[1])
+                if is_jpeg and img.mode in ('RGB', 'L') and orientation in EXIF_PAGE_ROTATION and fits:
+                    return {
+                        'mode': 'passthrough',
+                        'path': path,
+                        'length': os.path.getsize(path),
+                        'width': img.width,
+                        'height': img.height,
+                        'color_space': 'DeviceRGB' if img.mode == 'RGB' else 'DeviceGray',
+                        'rotate': EXIF_PAGE_ROTATION[orientation],
+                        'page_size': (img.width * points_per_pixel, img.height * points_per_pixel),
+                    }
+                
+                original_width = img.width
+                img = self._decode_image(img, options)
+                points_per_pixel *= original_width / img.width
+                img = ImageOps.exif_transpose(img)
+                page = {
+                    'mode': 'encoded',
+                    'width': img.width,
+                    'height': img.height,
+                    'page_size': (img.width * points_per_pixel, img.height * points_per_pixel),
+                }
+                with self.metrics.span('image.encode'):
+                    if img.mode == '1':
+                        page.update(data=zlib.compress(img.tobytes(), 6), filter_name='FlateDecode',
+                                    color_space='DeviceGray', bits=1)
+                    else:
+                        if img.mode not in ('RGB', 'L'):
+                            img = img.convert('RGB')
+                        buffer = io.BytesIO()
+                        img.save(buffer, 'JPEG', quality={1: 60, 2: 85, 3: 95}.get(quality, 85))
+                        page.update(data=buffer.getvalue(),
+                                    color_space='DeviceRGB' if img.mode == 'RGB' else 'DeviceGray')
+                page['length'] = len(page['data'])
+                return page
+        except ConversionError:
+            raise
+        except Exception as e:
+            raise ConversionError(f"{Path(path).name}: {e}")
+    
+    def images_to_pdf(self, inputs, output_file: str, options: dict = None) -> str:
+        """
+        Fügt viele Bilder zu einem PDF zusammen - eine Seite pro Bild bzw. Frame
+        
+        inputs: Liste in Seitenreihenfolge oder Glob-Muster (natürlich sortiert: scan_2
+        vor scan_10). Gibt den Pfad des PDFs zurück.
+        
+        PERFORMANCE: Seiten werden einzeln vorbereitet und sofort in die Datei geschrieben,
+        der Speicher bleibt auch bei hunderten Seiten konstant. JPEGs werden nicht
+        dekodiert: ihre DCT-Daten gehen unverändert ins PDF (kein Qualitätsverlust).
+        Andere Bilder werden parallel kodiert (_map_frames, begrenzter Puffer).
+        """
+        from pdf_assembler import ImagePdfWriter, expand_inputs
+        options = options or {}
+        files = expand_inputs(inputs)
+        if not files:
+            raise ConversionError("Keine Bilder gefunden")
+        for path in files:
+            if not Path(path).exists():
+                raise ConversionError(f"Datei nicht gefunden: {path}")
+        self._load_pil()
+        self._register_heif()
+        
+        output_file = Path(output_file).with_suffix('.pdf')
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        # Erst vollständig schreiben, dann umbenennen - Watch-Ordner sehen nie ein halbes PDF
+        partial = output_file.with_name(output_file.name + '.part')
+        
+        with self.metrics.job(engine='image', input_format='images', output_format='pdf'):
+            try:
+                with open(partial, 'wb') as target:
+                    writer = ImagePdfWriter(target)
+                    pages = self._map_frames(lambda number, page: self._prepare_pdf_page(*page, options),
+                                             self._iter_image_pages(files), options)
+                    for page in pages:
+                        self.metrics.count('pdf_pages', mode=page.pop('mode'))
+                        path = page.pop('path', None)
+                        with self.metrics.span('pdf.write'):
+                            if path is None:
+                                writer.add_image_page(**page)
+                            else:
+                                with open(path, 'rb') as source:
+                                    writer.add_image_page(data=source, **page)
+                    writer.close()
+                os.replace(partial, output_file)
+            except ConversionError:
+                partial.unlink(missing_ok=True)
+                raise
+            except Exception as e:
+                partial.unlink(missing_ok=True)
+                raise ConversionError(f"PDF-Zusammenführung fehlgeschlagen: {e}")
+        
+        return str(output_file)
+    
     def _convert_image_to_pdf(self, input_file: str, output_file: Path, options: dict) -> str:
         """Konvertiert Bilder zu PDF - OPTIMIERT"""
         try:
             Image = self._load_pil()
             self._register_heif()
             
+            output_file = output_file.with_suffix('.pdf')
+            
             # PERFORMANCE: Lazy loading mit Context Manager
             with Image.open(input_file) as img:
-                # RGB konvertieren falls nötig
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # PERFORMANCE: Qualitäts-basierte DPI
-                quality = options.get('quality', 2)
-                dpi = {1: 72, 2: 150, 3: 300}.get(quality, 150)
-                
-                output_file = output_file.with_suffix('.pdf')
-                
-                # PERFORMANCE: Optimierte Save-Parameter
-                save_kwargs = {
-                    'format': 'PDF',
-                    'resolution': float(dpi),
-                    'optimize': quality < 3  # Nur bei niedriger/mittlerer Qualität
-                }
-                
-                img.save(output_file, **save_kwargs)
+                if self._frame_count(img) > 1:
+                    # Mehrseitiges TIFF, animiertes GIF, HEIC-Sequenz -> eine PDF-Seite pro Frame
+                    self._write_pdf_frames(img, output_file, options, *self._frame_range(img, options))
+                    return str(output_file)
+                img = self._decode_image(img, options)
+                with self.metrics.span('image.encode'):
+                    self._write_pdf_image(img, output_file, options.get('quality', 2))
             
             return str(output_file)
         except ImportError:
@@ -395,40 +1731,83 @@ class DocumentConverter:
                 self._pillow_heif_registered = True
             except ImportError:
                 pass  # HEIF support optional
+            # AVIF: Pillow ab 11.2 nativ (mit libavif), sonst über ältere pillow-heif-Versionen
+            from PIL import features
+            try:
+                native_avif = features.check_module('avif')
+            except ValueError:
+                native_avif = False
+            if not native_avif:
+                try:
+                    from pillow_heif import register_avif_opener
+                    register_avif_opener()
+                except ImportError:
+                    pass  # AVIF support optional
+    
+    def _write_image(self, img, target, output_format: str, quality: int):
+        """Speichert ein Pillow-Bild im Zielformat (target: Pfad oder file-like)"""
+        quality_value = {1: 60, 2: 85, 3: 95}.get(quality, 85)
+        
+        # Format-spezifische Konvertierung
+        if output_format in ['jpg', 'jpeg']:
+            if img.mode not in ('RGB', 'L', 'CMYK'):
+                img = img.convert('RGB')
+            img.save(target, 'JPEG', quality=quality_value, optimize=True)
+        
+        elif output_format == 'png':
+            compress_level = {1: 1, 2: 6, 3: 9}.get(quality, 6)
+            img.save(target, 'PNG', compress_level=compress_level, optimize=True)
+        
+        elif output_format == 'gif':
+            if img.mode not in ('P', 'L'):
+                img = img.convert('P', palette=self._load_pil().ADAPTIVE)
+            img.save(target, 'GIF', optimize=True)
+        
+        elif output_format in ['heic', 'heif']:
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            img.save(target, 'HEIF', quality=quality_value)
+        
+        elif output_format in ['tiff', 'tif']:
+            img.save(target, 'TIFF', compression='tiff_deflate')
+        
+        elif output_format == 'webp':
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+            img.save(target, 'WEBP', quality=quality_value)
+        
+        elif output_format == 'avif':
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGB')
+            img.save(target, 'AVIF', quality=quality_value)
+        
+        else:
+            raise ConversionError(f"Bildformat {output_format} nicht unterstützt")
     
     def _convert_image_format(self, input_file: str, output_file: Path, output_format: str, options: dict) -> str:
-        """Konvertiert zwischen Bildformaten (JPG, PNG, GIF, HEIC, HEIF)"""
+        """
+        Konvertiert zwischen Bildformaten (JPG, PNG, GIF, HEIC, HEIF, TIFF, WebP, AVIF)
+        
+        Mehrbildige Eingaben bleiben in Mehrbild-Formaten vollständig erhalten; für JPG
+        schreibt options['pages'] nummerierte Bilder pro Frame, sonst nur den ersten Frame.
+        """
         try:
             Image = self._load_pil()
             self._register_heif()
             
-            quality = options.get('quality', 2)
-            quality_value = {1: 60, 2: 85, 3: 95}.get(quality, 85)
+            output_file = output_file.with_suffix(IMAGE_SUFFIXES[output_format])
             
             with Image.open(input_file) as img:
-                # Format-spezifische Konvertierung
-                if output_format in ['jpg', 'jpeg']:
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        img = img.convert('RGB')
-                    output_file = output_file.with_suffix('.jpg')
-                    img.save(output_file, 'JPEG', quality=quality_value, optimize=True)
-                
-                elif output_format == 'png':
-                    output_file = output_file.with_suffix('.png')
-                    compress_level = {1: 1, 2: 6, 3: 9}.get(quality, 6)
-                    img.save(output_file, 'PNG', compress_level=compress_level, optimize=True)
-                
-                elif output_format == 'gif':
-                    output_file = output_file.with_suffix('.gif')
-                    if img.mode not in ('P', 'L'):
-                        img = img.convert('P', palette=Image.ADAPTIVE)
-                    img.save(output_file, 'GIF', optimize=True)
-                
-                elif output_format in ['heic', 'heif']:
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    output_file = output_file.with_suffix('.heic')
-                    img.save(output_file, 'HEIF', quality=quality_value)
+                if self._frame_count(img) > 1:
+                    if output_format in MULTI_FRAME_FORMATS:
+                        if self._write_all_frames(img, output_file, 'image_format', output_format, options):
+                            return str(output_file)
+                    elif options.get('pages'):
+                        return self._write_frame_files(img, output_file, output_format, options,
+                                                       *self._frame_range(img, options))[0]
+                img = self._decode_image(img, options)
+                with self.metrics.span('image.encode'):
+                    self._write_image(img, output_file, output_format, options.get('quality', 2))
             
             return str(output_file)
         except Exception as e:
@@ -441,7 +1820,8 @@ class DocumentConverter:
                 try:
                     import cairosvg
                     output_file = output_file.with_suffix('.pdf')
-                    cairosvg.svg2pdf(url=input_file, write_to=str(output_file))
+                    with self.metrics.span('svg.render'):
+                        cairosvg.svg2pdf(url=input_file, write_to=str(output_file))
                     return str(output_file)
                 except (ImportError, OSError):
                     # Fallback: SVG -> PNG -> PDF
@@ -453,7 +1833,8 @@ class DocumentConverter:
                     output_file = output_file.with_suffix('.png')
                     quality = options.get('quality', 2)
                     dpi = {1: 72, 2: 150, 3: 300}.get(quality, 150)
-                    cairosvg.svg2png(url=input_file, write_to=str(output_file), dpi=dpi)
+                    with self.metrics.span('svg.render'):
+                        cairosvg.svg2png(url=input_file, write_to=str(output_file), dpi=dpi)
                     return str(output_file)
                 except (ImportError, OSError):
                     # Fallback: Nutze Pillow mit SVG-Support
@@ -466,7 +1847,8 @@ class DocumentConverter:
                     temp_png = output_file.with_suffix('.png')
                     quality = options.get('quality', 2)
                     dpi = {1: 72, 2: 150, 3: 300}.get(quality, 150)
-                    cairosvg.svg2png(url=input_file, write_to=str(temp_png), dpi=dpi)
+                    with self.metrics.span('svg.render'):
+                        cairosvg.svg2png(url=input_file, write_to=str(temp_png), dpi=dpi)
                     
                     with Image.open(temp_png) as img:
                         if img.mode != 'RGB':
@@ -488,6 +1870,7 @@ class DocumentConverter:
     
     def _convert_svg_fallback(self, input_file: str, output_file: Path, output_format: str, options: dict) -> str:
         """Fallback für SVG-Konvertierung ohne CairoSVG (nutzt LibreOffice)"""
+        self.metrics.count('engine_fallbacks', source='cairosvg', target='libreoffice')
         try:
             # LibreOffice kann SVG zu PDF konvertieren
             if output_format == 'pdf':
@@ -502,71 +1885,74 @@ class DocumentConverter:
         except Exception as e:
             raise ConversionError(f"SVG-Fallback fehlgeschlagen: {str(e)}")
     
+    @staticmethod
+    def _read_epub_documents(source) -> List[str]:
+        """Liest die HTML-Kapitel eines EPUB (source: Pfad oder file-like)"""
+        import ebooklib
+        from ebooklib import epub
+        
+        book = epub.read_epub(source)
+        return [
+            item.get_content().decode('utf-8')
+            for item in book.get_items()
+            if item.get_type() == ebooklib.ITEM_DOCUMENT
+        ]
+    
+    @staticmethod
+    def _epub_to_html(chapters: List[str]) -> str:
+        return '\n'.join(
+            ['<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>'] + chapters + ['</body></html>']
+        )
+    
+    @staticmethod
+    def _epub_to_text(chapters: List[str]) -> str:
+        from html.parser import HTMLParser
+        
+        class HTMLTextExtractor(HTMLParser):
+            def __init__(self):
+                super().__init__()
+                self.text = []
+            
+            def handle_data(self, data):
+                self.text.append(data)
+            
+            def get_text(self):
+                return ''.join(self.text)
+        
+        text_content = []
+        for chapter in chapters:
+            parser = HTMLTextExtractor()
+            parser.feed(chapter)
+            text_content.append(parser.get_text())
+        return '\n\n'.join(text_content)
+    
     def _convert_epub(self, input_file: str, output_file: Path, output_format: str, options: dict) -> str:
         """Konvertiert EPUB zu anderen Formaten"""
         try:
             if output_format == 'pdf':
                 # EPUB -> HTML -> PDF via LibreOffice
-                import ebooklib
-                from ebooklib import epub
-                
-                book = epub.read_epub(input_file)
-                html_content = []
-                
-                for item in book.get_items():
-                    if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                        html_content.append(item.get_content().decode('utf-8'))
+                with self.metrics.span('epub.read'):
+                    chapters = self._read_epub_documents(input_file)
                 
                 temp_html = output_file.with_suffix('.html')
-                temp_html.write_text('\n'.join(html_content), encoding='utf-8')
+                temp_html.write_text('\n'.join(chapters), encoding='utf-8')
                 
                 result = self._convert_with_libreoffice(str(temp_html), output_file, 'pdf', options)
                 temp_html.unlink(missing_ok=True)
                 return result
             
             elif output_format == 'html':
-                import ebooklib
-                from ebooklib import epub
-                
-                book = epub.read_epub(input_file)
-                html_content = ['<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>']
-                
-                for item in book.get_items():
-                    if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                        html_content.append(item.get_content().decode('utf-8'))
-                
-                html_content.append('</body></html>')
                 output_file = output_file.with_suffix('.html')
-                output_file.write_text('\n'.join(html_content), encoding='utf-8')
+                with self.metrics.span('epub.read'):
+                    chapters = self._read_epub_documents(input_file)
+                output_file.write_text(self._epub_to_html(chapters), encoding='utf-8')
                 return str(output_file)
             
             elif output_format == 'txt':
-                import ebooklib
-                from ebooklib import epub
-                from html.parser import HTMLParser
-                
-                class HTMLTextExtractor(HTMLParser):
-                    def __init__(self):
-                        super().__init__()
-                        self.text = []
-                    
-                    def handle_data(self, data):
-                        self.text.append(data)
-                    
-                    def get_text(self):
-                        return ''.join(self.text)
-                
-                book = epub.read_epub(input_file)
-                text_content = []
-                
-                for item in book.get_items():
-                    if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                        parser = HTMLTextExtractor()
-                        parser.feed(item.get_content().decode('utf-8'))
-                        text_content.append(parser.get_text())
-                
                 output_file = output_file.with_suffix('.txt')
-                output_file.write_text('\n\n'.join(text_content), encoding='utf-8')
+                with self.metrics.span('epub.read'):
+                    chapters = self._read_epub_documents(input_file)
+                output_file.write_text(self._epub_to_text(chapters), encoding='utf-8')
                 return str(output_file)
             
             else:
@@ -577,32 +1963,91 @@ class DocumentConverter:
         except Exception as e:
             raise ConversionError(f"EPUB-Konvertierung fehlgeschlagen: {str(e)}")
     
+    @staticmethod
+    def _parse_page_range(pages, page_count: int) -> tuple:
+        """'all', '5' oder '3-10' -> (erste, letzte) Seite, begrenzt auf das Dokument"""
+        if pages in (None, '', 'all'):
+            return 1, page_count
+        first, separator, last = str(pages).partition('-')
+        try:
+            first_page = int(first) if first.strip() else 1
+            last_page = int(last) if last.strip() else (page_count if separator else first_page)
+        except ValueError:
+            raise ConversionError(f"Ungültiger Seitenbereich: {pages}")
+        first_page = max(1, first_page)
+        last_page = min(page_count, last_page)
+        if first_page > last_page:
+            raise ConversionError(f"Seitenbereich {pages} liegt außerhalb des Dokuments ({page_count} Seiten)")
+        return first_page, last_page
+    
+    def _save_raster_page(self, img, output_file: Path, output_format: str, quality: int) -> Path:
+        """Speichert eine gerenderte PDF-Seite als JPG/PNG"""
+        output_file = output_file.with_suffix(IMAGE_SUFFIXES[output_format])
+        self._write_image(img, output_file, output_format, quality)
+        return output_file
+    
+    def iter_pdf_pages(self, input_file: str, output_file: Path, output_format: str, options: dict):
+        """
+        Rendert einen Seitenbereich (options['pages']: 'all', '5', '3-10') zu nummerierten Bildern
+        und liefert die Pfade, sobald sie geschrieben sind
+        
+        PERFORMANCE: Seiten werden in Blöcken von options['page_chunk_size'] (Standard 8)
+        gerendert - der Speicher bleibt auch bei 1000 Seiten konstant. Innerhalb eines
+        Blocks rendert poppler parallel (options['raster_threads']).
+        """
+        try:
+            from pdf2image import convert_from_path, pdfinfo_from_path
+        except ImportError:
+            raise ConversionError("pdf2image nicht installiert. Bitte 'pip install pdf2image' ausführen.")
+        
+        quality = options.get('quality', 2)
+        dpi = {1: 72, 2: 150, 3: 300}.get(quality, 150)
+        chunk_size = max(1, int(options.get('page_chunk_size', 8)))
+        threads = max(1, int(options.get('raster_threads', min(os.cpu_count() or 1, 4))))
+        
+        page_count = pdfinfo_from_path(input_file)['Pages']
+        first_page, last_page = self._parse_page_range(options.get('pages', 'all'), page_count)
+        digits = max(3, len(str(last_page)))
+        output_file = Path(output_file)
+        
+        for chunk_start in range(first_page, last_page + 1, chunk_size):
+            chunk_end = min(chunk_start + chunk_size - 1, last_page)
+            with self.metrics.span('raster.render'):
+                images = convert_from_path(
+                    input_file,
+                    dpi=dpi,
+                    first_page=chunk_start,
+                    last_page=chunk_end,
+                    thread_count=min(threads, chunk_end - chunk_start + 1)
+                )
+            try:
+                for page_number, img in enumerate(images, chunk_start):
+                    page_file = output_file.with_name(f"{output_file.stem}_{page_number:0{digits}d}{output_file.suffix}")
+                    yield str(self._save_raster_page(img, page_file, output_format, quality))
+            finally:
+                for img in images:
+                    img.close()
+    
     def _convert_pdf_to_image(self, input_file: str, output_file: Path, output_format: str, options: dict) -> str:
-        """Konvertiert PDF zu Bild (erste Seite)"""
+        """Konvertiert PDF zu Bild (erste Seite, mit options['pages'] mehrere nummerierte Seiten)"""
         try:
+            if options.get('pages'):
+                # Mehrseitig: Rückgabe ist die erste erzeugte Seite
+                page_files = list(self.iter_pdf_pages(input_file, output_file, output_format, options))
+                if not page_files:
+                    raise ConversionError("Keine Seiten im PDF gefunden")
+                return page_files[0]
+            
             from pdf2image import convert_from_path
             
             quality = options.get('quality', 2)
             dpi = {1: 72, 2: 150, 3: 300}.get(quality, 150)
             
-            images = convert_from_path(input_file, dpi=dpi, first_page=1, last_page=1)
+            with self.metrics.span('raster.render'):
+                images = convert_from_path(input_file, dpi=dpi, first_page=1, last_page=1)
             
             if images:
-                img = images[0]
-                
-                if output_format in ['jpg', 'jpeg']:
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    output_file = output_file.with_suffix('.jpg')
-                    quality_value = {1: 60, 2: 85, 3: 95}.get(quality, 85)
-                    img.save(output_file, 'JPEG', quality=quality_value, optimize=True)
-                
-                elif output_format == 'png':
-                    output_file = output_file.with_suffix('.png')
-                    compress_level = {1: 1, 2: 6, 3: 9}.get(quality, 6)
-                    img.save(output_file, 'PNG', compress_level=compress_level, optimize=True)
-                
-                return str(output_file)
+                return str(self._save_raster_page(images[0], output_file, output_format, quality))
             else:
                 raise ConversionError("Keine Seiten im PDF gefunden")
         
@@ -616,17 +2061,9 @@ class DocumentConverter:
         try:
             from markdown_pdf import MarkdownPdf, Section
             
-            # Lese Markdown-Datei mit korrektem Encoding (entfernt BOM)
-            with open(input_file, 'r', encoding='utf-8-sig') as f:
-                markdown_content = f.read()
-            
-            # Entferne zusätzliche BOM-Zeichen falls vorhanden
-            markdown_content = markdown_content.replace('\ufeff', '')
-            
-            # Erstelle temporäre bereinigte Markdown-Datei
-            temp_md = output_file.parent / f"{output_file.stem}_clean.md"
-            with open(temp_md, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
+            # Lese Markdown-Datei mit erkanntem Encoding (entfernt BOM-Zeichen)
+            with open(input_file, 'rb') as source:
+                markdown_content = b''.join(self._iter_markdown_utf8(source)).decode('utf-8')
             
             output_file = output_file.with_suffix('.pdf')
             
@@ -635,20 +2072,14 @@ class DocumentConverter:
             pdf.add_section(Section(markdown_content))
             pdf.save(str(output_file))
             
-            # Cleanup
-            temp_md.unlink(missing_ok=True)
-            
             return str(output_file)
         
         except ImportError:
-            # Fallback: Bereinige Markdown und nutze LibreOffice
-            with open(input_file, 'r', encoding='utf-8-sig') as f:
-                content = f.read()
-            content = content.replace('\ufeff', '')
-            
+            # Fallback: LibreOffice braucht eine Datei - bereinigte UTF-8-Kopie blockweise schreiben
             temp_md = output_file.parent / f"{output_file.stem}_clean.md"
-            with open(temp_md, 'w', encoding='utf-8') as f:
-                f.write(content)
+            with open(input_file, 'rb') as source, open(temp_md, 'wb') as target:
+                for chunk in self._iter_markdown_utf8(source):
+                    target.write(chunk)
             
             try:
                 result = self._convert_with_libreoffice(str(temp_md), output_file, 'pdf', options)
@@ -1,41 +1,80 @@
 """Datei-Analyse und Metadaten-Extraktion"""
+import concurrent.futures
+import mmap
 import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import mimetypes
+from format_sniffer import detect_format
+
+# Letztes Trailer-/Root-Vorkommen im Dateiende (inkrementelle Updates hängen hinten an)
+PDF_TAIL_BYTES = 64 * 1024
+
+def pdf_page_count(file_path: str) -> Optional[int]:
+    """Seitenzahl eines PDFs ohne Seitenobjekte zu laden (None = nicht ermittelbar)"""
+    return FileAnalyzer._analyze_pdf(Path(file_path)).get('pages')
 
 class FileAnalyzer:
     """Analysiert Dateien und extrahiert Metadaten"""
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 100000):
         mimetypes.init()
+        # PERFORMANCE: Ergebnisse pro (Pfad, Größe, mtime) - unveränderte Dateien nie doppelt
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def analyze(self, file_path: str) -> Dict[str, Any]:
         """Analysiert eine Datei und gibt Metadaten zurück"""
         path = Path(file_path)
         
-        if not path.exists():
+        try:
+            stats = path.stat()
+        except OSError:
             return {'error': 'Datei nicht gefunden'}
         
-        stats = path.stat()
-        mime_type, _ = mimetypes.guess_type(str(path))
+        cache_key = (os.path.abspath(file_path), stats.st_size, stats.st_mtime_ns)
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return dict(cached)
+        
+        info = self._analyze_uncached(path, stats)
+        
+        with self._cache_lock:
+            self._cache[cache_key] = info
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(info)
+    
+    def _analyze_uncached(self, path: Path, stats: os.stat_result) -> Dict[str, Any]:
+        """Eigentliche Analyse (ohne Cache)"""
+        # Format am Inhalt erkennen (Magic Bytes), Endung nur als Fallback
+        detected_format = detect_format(str(path))
+        mime_type, _ = mimetypes.guess_type(f"file.{detected_format}" if detected_format else str(path))
         
         info = {
             'name': path.name,
             'size': self._format_size(stats.st_size),
             'size_bytes': stats.st_size,
             'extension': path.suffix.lower(),
+            'detected_format': detected_format,
             'mime_type': mime_type or 'unknown',
             'modified': stats.st_mtime,
-            'is_image': self._is_image(path),
-            'is_document': self._is_document(path),
-            'recommended_formats': self._get_recommended_formats(path)
+            'is_image': self._is_image(detected_format),
+            'is_document': self._is_document(detected_format),
+            'recommended_formats': self._get_recommended_formats(detected_format)
         }
         
         # Spezifische Analysen
         if info['is_image']:
             info.update(self._analyze_image(path))
-        elif path.suffix.lower() == '.pdf':
+        elif detected_format == 'pdf':
             info.update(self._analyze_pdf(path))
         
         return info
@@ -48,32 +87,35 @@ class FileAnalyzer:
             size_bytes /= 1024.0
         return f"{size_bytes:.1f} TB"
     
-    def _is_image(self, path: Path) -> bool:
-        """Prüft ob Datei ein Bild ist"""
-        return path.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']
+    def _is_image(self, fmt: str) -> bool:
+        """Prüft ob das (erkannte) Format ein Bild ist"""
+        return fmt in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'webp', 'avif', 'heic', 'heif']
     
-    def _is_document(self, path: Path) -> bool:
-        """Prüft ob Datei ein Dokument ist"""
-        return path.suffix.lower() in ['.pdf', '.docx', '.doc', '.odt', '.txt', '.rtf', '.pptx', '.xlsx']
+    def _is_document(self, fmt: str) -> bool:
+        """Prüft ob das (erkannte) Format ein Dokument ist"""
+        return fmt in ['pdf', 'docx', 'doc', 'odt', 'txt', 'rtf', 'pptx', 'xlsx']
     
-    def _get_recommended_formats(self, path: Path) -> list:
+    def _get_recommended_formats(self, fmt: str) -> list:
         """Empfiehlt Zielformate basierend auf Eingabeformat"""
-        ext = path.suffix.lower()
-        
         recommendations = {
-            '.pdf': ['DOCX', 'HTML', 'Markdown'],
-            '.docx': ['PDF', 'HTML', 'ODT'],
-            '.pptx': ['PDF', 'HTML'],
-            '.jpg': ['PDF'],
-            '.png': ['PDF'],
-            '.html': ['PDF', 'DOCX'],
-            '.md': ['PDF', 'DOCX', 'HTML']
+            'pdf': ['DOCX', 'HTML', 'Markdown'],
+            'docx': ['PDF', 'HTML', 'ODT'],
+            'pptx': ['PDF', 'HTML'],
+            'jpg': ['PDF'],
+            'png': ['PDF'],
+            'html': ['PDF', 'DOCX'],
+            'md': ['PDF', 'DOCX', 'HTML']
         }
         
-        return recommendations.get(ext, ['PDF'])
+        return recommendations.get(fmt, ['PDF'])
     
     def _analyze_image(self, path: Path) -> Dict[str, Any]:
-        """Analysiert Bild-Dateien"""
+        """
+        Analysiert Bild-Dateien
+        
+        PERFORMANCE: Image.open liest nur den Header - Pixeldaten werden nie dekodiert
+        (kein load(), kein Zugriff auf Pixel).
+        """
         try:
             from PIL import Image
             with Image.open(path) as img:
@@ -85,45 +127,223 @@ class FileAnalyzer:
         except:
             return {}
     
-    def _analyze_pdf(self, path: Path) -> Dict[str, Any]:
-        """Analysiert PDF-Dateien"""
+    @staticmethod
+    def _analyze_pdf(path: Path) -> Dict[str, Any]:
+        """
+        Analysiert PDF-Dateien
+        
+        PERFORMANCE: Seitenzahl direkt aus Trailer -> /Root -> /Pages -> /Count, ohne
+        Seitenobjekte zu laden - über die klassische xref-Tabelle oder den xref-Stream
+        (PDF 1.5). PyPDF2 nur als Fallback (z.B. Objekte in Object Streams), und auch
+        dann nur über den Trailer statt len(pdf.pages).
+        """
+        try:
+            info = FileAnalyzer._read_pdf_page_count(path)
+            if info is not None:
+                return info
+        except (OSError, ValueError):
+            pass
+        
         try:
             import PyPDF2
             with open(path, 'rb') as f:
-                pdf = PyPDF2.PdfReader(f)
+                pdf = PyPDF2.PdfReader(f, strict=False)
+                encrypted = pdf.is_encrypted
+                if encrypted:
+                    return {'encrypted': True}
                 return {
-                    'pages': len(pdf.pages),
-                    'encrypted': pdf.is_encrypted
+                    'pages': int(pdf.trailer['/Root']['/Pages']['/Count']),
+                    'encrypted': False
                 }
         except:
             return {}
     
-    def batch_analyze(self, file_paths: list) -> Dict[str, Dict[str, Any]]:
-        """Analysiert mehrere Dateien"""
-        results = {}
-        for file_path in file_paths:
-            results[file_path] = self.analyze(file_path)
-        return results
+    @staticmethod
+    def _read_pdf_page_count(path: Path) -> Optional[Dict[str, Any]]:
+        """Seitenzahl ohne PDF-Bibliothek (None = nicht ermittelbar)"""
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            tail = data[-PDF_TAIL_BYTES:]
+            roots = re.findall(rb'/Root\s+(\d+)\s+(\d+)\s+R', tail)
+            if not roots:
+                return None
+            encrypted = b'/Encrypt' in tail
+            
+            offsets, classic = FileAnalyzer._pdf_xref_offsets(data, tail)
+            # Suche über die ganze Datei nur bei klassischer Tabelle - bei xref-Streams
+            # liegen fehlende Objekte in Object Streams, dort hilft nur PyPDF2
+            root = FileAnalyzer._pdf_object(data, offsets, *roots[-1], scan=classic)
+            pages_ref = re.search(rb'/Pages\s+(\d+)\s+(\d+)\s+R', root or b'')
+            if not pages_ref:
+                return None
+            pages = FileAnalyzer._pdf_object(data, offsets, *pages_ref.groups(), scan=classic)
+            count = re.search(rb'/Count\s+(\d+)\b(?!\s+\d+\s+R)', pages or b'')
+            if count:
+                return {'pages': int(count.group(1)), 'encrypted': encrypted}
+            # Indirekte Seitenzahl (/Count 12 0 R): Zahl aus dem referenzierten Objekt
+            count_ref = re.search(rb'/Count\s+(\d+)\s+(\d+)\s+R', pages or b'')
+            if not count_ref:
+                return None
+            value = FileAnalyzer._pdf_object(data, offsets, *count_ref.groups(), scan=classic)
+            count = re.search(rb'obj\s+(\d+)\s*$', value or b'')
+            if not count:
+                return None
+            return {'pages': int(count.group(1)), 'encrypted': encrypted}
+    
+    @staticmethod
+    def _pdf_xref_offsets(data: mmap.mmap, tail: bytes) -> Tuple[Dict[int, int], bool]:
+        """(Objekt-Offsets, klassische Tabelle?) aus dem letzten Querverweis (Tabelle oder Stream)"""
+        startxref = re.findall(rb'startxref\s+(\d+)', tail)
+        if not startxref:
+            return {}, True
+        position = int(startxref[-1])
+        if data[position:position + 4] != b'xref':
+            return FileAnalyzer._pdf_xref_stream_offsets(data, position), False
+        
+        offsets = {}
+        section = re.compile(rb'\s*(\d+)\s+(\d+)\s*[\r\n]+')
+        position += 4
+        while True:
+            match = section.match(data, position)
+            if not match:
+                return offsets, True
+            first, count = int(match.group(1)), int(match.group(2))
+            position = match.end()
+            for i in range(count):
+                entry = data[position + i * 20:position + i * 20 + 18]
+                if entry[-1:] == b'n':
+                    offsets[first + i] = int(entry[:10])
+            position += count * 20
     
-    def get_conversion_estimate(self, file_path: str, target_format: str) -> Dict[str, Any]:
-        """Schätzt Konvertierungszeit und -größe"""
+    @staticmethod
+    def _pdf_xref_stream_offsets(data: mmap.mmap, position: int) -> Dict[int, int]:
+        """
+        Objekt-Offsets aus einem xref-Stream (/Type /XRef mit /W, /Index)
+        
+        Enthält nur direkt adressierbare Objekte (Typ 1); leer, wenn der Stream nicht
+        lesbar ist (fremder Filter oder Predictor).
+        """
+        match = re.compile(rb'\d+\s+\d+\s+obj\s*<<').match(data, position)
+        if not match:
+            return {}
+        stream = data.find(b'stream', match.end())
+        if stream == -1:
+            return {}
+        dictionary = data[match.end():stream]
+        widths = re.search(rb'/W\s*\[\s*(\d+)\s+(\d+)\s+(\d+)\s*\]', dictionary)
+        size = re.search(rb'/Size\s+(\d+)', dictionary)
+        if not re.search(rb'/Type\s*/XRef', dictionary) or not widths or not size:
+            return {}
+        
+        start = stream + 6
+        start += 2 if data[start:start + 2] == b'\r\n' else 1
+        length = re.search(rb'/Length\s+(\d+)\b(?!\s+\d+\s+R)', dictionary)
+        end = start + int(length.group(1)) if length else data.find(b'endstream', start)
+        raw = data[start:end]
+        filters = re.findall(rb'/Filter\s*\[?\s*/(\w+)', dictionary)
+        try:
+            if filters == [b'FlateDecode']:
+                raw = zlib.decompress(raw)
+            elif filters:
+                return {}
+        except zlib.error:
+            return {}
+        
+        widths = [int(width) for width in widths.groups()]
+        row = sum(widths)
+        predictor = re.search(rb'/Predictor\s+(\d+)', dictionary)
+        if predictor and int(predictor.group(1)) >= 10:
+            # PNG-Predictor: jede Zeile beginnt mit einem Filter-Byte (0 = None, 2 = Up)
+            rows = []
+            previous = bytes(row)
+            for i in range(0, len(raw) - row, row + 1):
+                line = raw[i + 1:i + 1 + row]
+                if raw[i] == 2:
+                    line = bytes((a + b) & 0xFF for a, b in zip(line, previous))
+                elif raw[i] != 0:
+                    return {}
+                rows.append(line)
+                previous = line
+            raw = b''.join(rows)
+        
+        index = re.search(rb'/Index\s*\[([\d\s]*)\]', dictionary)
+        numbers = [int(n) for n in index.group(1).split()] if index else [0, int(size.group(1))]
+        offsets = {}
+        entry = 0
+        for first, count in zip(numbers[::2], numbers[1::2]):
+            for number in range(first, first + count):
+                fields = []
+                position = entry * row
+                for width in widths:
+                    fields.append(int.from_bytes(raw[position:position + width], 'big'))
+                    position += width
+                entry += 1
+                if (fields[0] if widths[0] else 1) == 1:
+                    offsets[number] = fields[1]
+        return offsets
+    
+    @staticmethod
+    def _pdf_object(data: mmap.mmap, offsets: Dict[int, int], number: bytes, generation: bytes,
+                    scan: bool = True) -> Optional[bytes]:
+        """Dictionary-Text eines Objekts - per xref-Offset, sonst (scan) per Suche (letztes Vorkommen)"""
+        header = re.compile(rb'(?<!\d)' + number + rb'\s+' + generation + rb'\s+obj\b')
+        start = None
+        offset = offsets.get(int(number))
+        if offset is not None and header.match(data, offset):
+            start = offset
+        elif scan:
+            for match in header.finditer(data):
+                start = match.start()
+        if start is None:
+            return None
+        end = data.find(b'endobj', start)
+        return data[start:end if end != -1 else start + 4096]
+    
+    def batch_analyze(self, file_paths: list, max_workers: int = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Analysiert mehrere Dateien
+        
+        PERFORMANCE: Thread-Pool - die Arbeit ist fast nur I/O (stat, Header lesen),
+        bei Netzlaufwerken überlappen sich die Latenzen. Zusammen mit dem Cache sind
+        Wiederholungen über große Archive nahezu kostenlos.
+        """
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(file_paths, executor.map(self.analyze, file_paths)))
+    
+    def get_conversion_estimate(self, file_path: str, target_format: str, estimator=None,
+                                quality: int = 2) -> Dict[str, Any]:
+        """
+        Schätzt Konvertierungszeit und -größe
+        
+        estimator: ConversionEstimator (aus der Telemetrie gelernt). Ohne Estimator bzw.
+        ohne passende Messungen gelten die groben Standardwerte pro MB.
+        """
+        from conversion_telemetry import ConversionEstimator
+        from converter_engine import DocumentConverter
+        
         info = self.analyze(file_path)
         size_bytes = info.get('size_bytes', 0)
+        target_format = target_format.lower()
+        estimator = estimator or ConversionEstimator()
         
-        # Grobe Schätzungen basierend auf Dateigröße
-        time_per_mb = {
-            'pdf': 2,      # Sekunden pro MB
-            'docx': 1,
-            'html': 0.5,
-            'markdown': 0.3
-        }
-        
+        estimate = estimator.estimate(
+            DocumentConverter().get_engine(file_path, target_format),
+            info.get('detected_format', ''),
+            target_format,
+            size_bytes,
+            info.get('pages'),
+            quality
+        )
+        estimated_time = estimate['seconds']
         size_mb = size_bytes / (1024 * 1024)
-        estimated_time = size_mb * time_per_mb.get(target_format.lower(), 1)
         
         return {
             'estimated_time_seconds': max(1, int(estimated_time)),
             'estimated_time_text': self._format_time(estimated_time),
+            'estimated_output_bytes': estimate['output_bytes'],
+            'estimate_basis': estimate['basis'],
             'complexity': 'niedrig' if size_mb < 1 else 'mittel' if size_mb < 10 else 'hoch'
         }
     
@@ -0,0 +1,267 @@
+"""Format-Erkennung am Dateiinhalt (Magic Bytes) statt an der Dateiendung"""
+import codecs
+import os
+import struct
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+# Mehr wird nie gelesen (ZIP-Fallback liest nur das zentrale Verzeichnis am Dateiende)
+SNIFF_BYTES = 8192
+
+# Gleichwertige Schreibweisen - die Endung des Aufrufers bleibt dann erhalten
+FORMAT_ALIASES = {'jpeg': 'jpg', 'tif': 'tiff', 'htm': 'html', 'heif': 'heic', 'markdown': 'md'}
+
+# Stichprobe am Dateianfang für die Encoding-Erkennung von Textdateien
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+# Endungen reiner Textformate: HTML/SVG-Erkennung überstimmt diese nicht
+TEXT_EXTENSIONS = {'md', 'markdown', 'txt', 'html', 'htm', 'svg', 'xml', 'csv', 'rst', 'tex'}
+
+# Office-Familien: Vorlagen/Makro-Varianten teilen den Container mit dem Hauptformat.
+# Erkennt der Inhalt nur die Familie, bleibt die genauere Endung erhalten.
+OFFICE_FAMILIES = {
+    'docx': {'docx', 'docm', 'dotx', 'dotm'},
+    'xlsx': {'xlsx', 'xlsm', 'xltx', 'xltm', 'xlsb'},
+    'pptx': {'pptx', 'pptm', 'ppsx', 'ppsm', 'potx', 'potm'},
+    'doc': {'doc', 'dot'},
+    'xls': {'xls', 'xlt'},
+    'ppt': {'ppt', 'pps', 'pot'},
+    'odt': {'odt', 'ott'},
+    'ods': {'ods', 'ots'},
+    'odp': {'odp', 'otp'},
+    'odg': {'odg', 'otg'},
+}
+
+# Alte Office-Formate (OLE2-Container) und ihre OOXML-Gegenstücke
+OLE_EXTENSIONS = OFFICE_FAMILIES['doc'] | OFFICE_FAMILIES['xls'] | OFFICE_FAMILIES['ppt']
+OOXML_TO_OLE = {'docx': 'doc', 'xlsx': 'xls', 'pptx': 'ppt'}
+
+# Stream-Namen im OLE-Verzeichnis (UTF-16LE) - stehen bei kleinen Dateien oft im Anfang
+OLE_STREAMS = (
+    ('WordDocument'.encode('utf-16-le'), 'doc'),
+    ('Workbook'.encode('utf-16-le'), 'xls'),
+    ('PowerPoint Document'.encode('utf-16-le'), 'ppt'),
+)
+
+ODF_MIMETYPES = {
+    b'application/vnd.oasis.opendocument.text': 'odt',
+    b'application/vnd.oasis.opendocument.spreadsheet': 'ods',
+    b'application/vnd.oasis.opendocument.presentation': 'odp',
+    b'application/vnd.oasis.opendocument.graphics': 'odg',
+}
+
+OOXML_PREFIXES = (('word/', 'docx'), ('xl/', 'xlsx'), ('ppt/', 'pptx'))
+
+HEIC_BRANDS = {b'heic', b'heix', b'hevc', b'hevx', b'heim', b'heis', b'hevm', b'hevs'}
+
+
+def _zip_local_names(head: bytes) -> list:
+    """Dateinamen der lokalen ZIP-Header, soweit sie im gelesenen Anfang liegen"""
+    names = []
+    pos = 0
+    while head[pos:pos + 4] == b'PK\x03\x04' and pos + 30 <= len(head):
+        flags, = struct.unpack('<H', head[pos + 6:pos + 8])
+        compressed_size, = struct.unpack('<I', head[pos + 18:pos + 22])
+        name_len, extra_len = struct.unpack('<HH', head[pos + 26:pos + 30])
+        names.append(head[pos + 30:pos + 30 + name_len])
+        if flags & 0x08:
+            break  # Größe steht erst im Data Descriptor hinter den Daten
+        pos += 30 + name_len + extra_len + compressed_size
+    return names
+
+
+def _format_from_zip_names(names) -> Optional[str]:
+    for name in names:
+        for prefix, fmt in OOXML_PREFIXES:
+            if name.startswith(prefix):
+                return fmt
+    return None
+
+
+def _sniff_zip(head: bytes, source=None) -> str:
+    """EPUB/ODF über den 'mimetype'-Eintrag, OOXML über die Ordnerstruktur"""
+    name_len, extra_len = struct.unpack('<HH', head[26:30])
+    if head[30:30 + name_len] == b'mimetype':
+        # EPUB und ODF speichern 'mimetype' als ersten, unkomprimierten Eintrag
+        start = 30 + name_len + extra_len
+        mimetype = head[start:start + 64]
+        if mimetype.startswith(b'application/epub+zip'):
+            return 'epub'
+        for odf_mimetype, fmt in ODF_MIMETYPES.items():
+            if mimetype.startswith(odf_mimetype):
+                return fmt
+
+    names = [name.decode('cp437', 'replace') for name in _zip_local_names(head)]
+    fmt = _format_from_zip_names(names)
+    if fmt is None and source is not None:
+        # Nur das zentrale Verzeichnis am Dateiende wird gelesen, nicht der Inhalt
+        try:
+            with zipfile.ZipFile(source) as archive:
+                fmt = _format_from_zip_names(archive.namelist())
+        except (zipfile.BadZipFile, OSError, ValueError):
+            pass
+        finally:
+            if hasattr(source, 'seek'):
+                source.seek(0)
+    return fmt or 'zip'
+
+
+def _sniff_ole(head: bytes) -> str:
+    """Word/Excel/PowerPoint am Stream-Namen, sonst nur 'ole' (Verzeichnis nicht im Anfang)"""
+    for stream_name, fmt in OLE_STREAMS:
+        if stream_name in head:
+            return fmt
+    return 'ole'
+
+
+def _office_family(fmt: str) -> Optional[str]:
+    for family, extensions in OFFICE_FAMILIES.items():
+        if fmt in extensions:
+            return family
+    return None
+
+
+def _sniff_ftyp(head: bytes) -> Optional[str]:
+    """ISO-BMFF (HEIC/HEIF/AVIF) über Major- und Compatible-Brands der ftyp-Box"""
+    box_size, = struct.unpack('>I', head[0:4])
+    brands = {head[8:12]}
+    brands.update(head[i:i + 4] for i in range(16, min(box_size, len(head)) - 3, 4))
+    if brands & HEIC_BRANDS:
+        return 'heic'
+    if b'avif' in brands:
+        return 'avif'
+    if brands & {b'mif1', b'msf1'}:
+        return 'heif'
+    return None  # z.B. MP4/MOV
+
+
+def _sniff_text(head: bytes) -> Optional[str]:
+    """SVG/HTML in Textdateien (BOM-sicher)"""
+    sample = head[:1024]
+    for bom, encoding in ((b'\xef\xbb\xbf', 'utf-8'), (b'\xff\xfe', 'utf-16-le'), (b'\xfe\xff', 'utf-16-be')):
+        if sample.startswith(bom):
+            text = sample[len(bom):].decode(encoding, 'ignore')
+            break
+    else:
+        text = sample.decode('utf-8', 'ignore')
+
+    text = text.lstrip().lower()
+    if not text.startswith('<'):
+        return None
+    if text.startswith(('<!doctype html', '<html', '<head', '<body')):
+        return 'html'  # Vor SVG prüfen: HTML mit eingebettetem <svg>
+    if '<svg' in text:
+        return 'svg'
+    if '<html' in text:
+        return 'html'
+    return None
+
+
+def sniff_bytes(head: bytes, source=None) -> Optional[str]:
+    """
+    Erkennt das Format aus den ersten Bytes (None = unbekannt)
+
+    source: optional Pfad oder seekbarer Stream - nur für ZIP-Container, deren Typ
+    nicht schon aus den ersten lokalen Headern hervorgeht.
+    """
+    if head.startswith(b'%PDF-') or b'%PDF-' in head[:1024]:
+        return 'pdf'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+        return 'webp'
+    if head.startswith((b'II*\x00', b'MM\x00*')):
+        return 'tiff'
+    if head[4:8] == b'ftyp' and len(head) >= 12:
+        return _sniff_ftyp(head)
+    if head.startswith(b'PK\x03\x04') and len(head) >= 30:
+        return _sniff_zip(head, source)
+    if head.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
+        return _sniff_ole(head)
+    if head.startswith(b'{\\rtf'):
+        return 'rtf'
+    return _sniff_text(head)
+
+
+@lru_cache(maxsize=4096)
+def _sniff_path(path: str, mtime_ns: int, size: int) -> Optional[str]:
+    # mtime_ns/size sind Teil des Cache-Keys: geänderte Dateien werden neu erkannt
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    return sniff_bytes(head, path)
+
+
+def sniff_file(file_path: str) -> Optional[str]:
+    """Format einer Datei am Inhalt erkennen (memoisiert pro Pfad, mtime und Größe)"""
+    try:
+        stats = os.stat(file_path)
+        return _sniff_path(os.path.abspath(file_path), stats.st_mtime_ns, stats.st_size)
+    except OSError:
+        return None
+
+
+def resolve_format(sniffed: Optional[str], extension: str) -> str:
+    """
+    Effektives Eingabeformat aus Inhalt und Endung
+
+    Binäre Signaturen gewinnen immer (z.B. '.pdf', das eigentlich ein PNG ist).
+    HTML/SVG-Erkennung gilt nur, wenn die Endung kein Textformat ist. Nicht am
+    Inhalt erkennbare Formate (Markdown, TXT, CSV, generische ZIPs) behalten die Endung.
+    Bei Office-Containern entscheidet der Inhalt nur, wenn die Familie nicht passt
+    ('.docm' bleibt '.docm', ein OLE-'.docx' wird 'doc').
+    """
+    extension = extension.lower().lstrip('.')
+    if sniffed is None or sniffed == 'zip':
+        return extension
+    if FORMAT_ALIASES.get(sniffed, sniffed) == FORMAT_ALIASES.get(extension, extension):
+        return extension
+    family = _office_family(extension)
+    if sniffed == 'ole':
+        if extension in OLE_EXTENSIONS:
+            return extension
+        # z.B. verschlüsselte OOXML-Dateien oder alte Dateien mit neuer Endung
+        return OOXML_TO_OLE.get(family, 'doc')
+    if family is not None and _office_family(sniffed) == family:
+        return extension
+    if sniffed in ('html', 'svg') and extension in TEXT_EXTENSIONS:
+        return extension
+    return sniffed
+
+
+def detect_format(file_path: str) -> str:
+    """Effektives Format einer Datei (Inhalt vor Endung)"""
+    return resolve_format(sniff_file(file_path), Path(file_path).suffix)
+
+
+def detect_text_encoding(sample: bytes) -> str:
+    """
+    Encoding einer Textdatei aus einer Stichprobe am Anfang (ENCODING_SAMPLE_BYTES)
+
+    BOM -> utf-8-sig / utf-16, UTF-16 ohne BOM am NUL-Muster, gültiges UTF-8 -> utf-8,
+    sonst latin-1 (dekodiert jedes Byte). Ein am Ende abgeschnittenes UTF-8-Zeichen
+    in der Stichprobe zählt nicht als Fehler.
+    """
+    if sample.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    if sample.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return 'utf-16'
+
+    head = sample[:1024]
+    if len(head) >= 2:
+        even_nuls, odd_nuls = head[0::2].count(0), head[1::2].count(0)
+        if odd_nuls > len(head) // 8 and even_nuls == 0:
+            return 'utf-16-le'
+        if even_nuls > len(head) // 8 and odd_nuls == 0:
+            return 'utf-16-be'
+
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
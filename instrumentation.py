@@ -0,0 +1,265 @@
+"""Laufzeit-Instrumentierung: Zeiten pro Stufe, Zähler und Peak-RSS pro Konvertierung"""
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from conversion_telemetry import append_json_line
+
+# Histogramm-Grenzen (Sekunden) für den Prometheus-Export
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, math.inf)
+
+
+class _NullSpan:
+    """Kontextmanager ohne Wirkung"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullInstrumentation:
+    """
+    Deaktivierte Instrumentierung
+
+    PERFORMANCE: Jede Stufe kostet nur einen Methodenaufruf, der ein geteiltes
+    No-op-Objekt zurückgibt - keine Uhr, kein Lock, keine Allokation.
+    """
+    enabled = False
+
+    def span(self, stage: str):
+        return _NULL_SPAN
+
+    def job(self, **labels):
+        return _NULL_SPAN
+
+    def count(self, name: str, value: int = 1, **labels):
+        pass
+
+    def snapshot(self) -> dict:
+        return {}
+
+    def prometheus_text(self) -> str:
+        return ''
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+def _reset_peak_rss():
+    """Linux: Hochwassermarke (VmHWM) zurücksetzen, damit der Peak pro Job messbar ist"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak-RSS des Prozesses (Linux seit dem letzten Reset, sonst seit Prozessstart)"""
+    try:
+        with open('/proc/self/status', 'rb') as f:
+            for line in f:
+                if line.startswith(b'VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil  # Windows: Peak Working Set
+        return getattr(psutil.Process().memory_info(), 'peak_wset', None)
+    except ImportError:
+        return None
+
+
+class _Span:
+    __slots__ = ('owner', 'stage', 'started')
+
+    def __init__(self, owner: 'Instrumentation', stage: str):
+        self.owner = owner
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.owner._finish_span(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _Job:
+    """Eine Konvertierung: sammelt Stufen-Zeiten und Zähler, schreibt am Ende eine JSON-Zeile"""
+
+    def __init__(self, owner: 'Instrumentation', labels: dict):
+        self.owner = owner
+        self.labels = labels
+        self.spans: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    def __enter__(self):
+        self.owner._start_job(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.owner._finish_job(self, time.perf_counter() - self.started, exc_type is None)
+        return False
+
+
+class Instrumentation:
+    """
+    Stufen-Zeiten (Spans), Zähler (z.B. Cache-Treffer, Engine-Fallbacks) und Peak-RSS
+
+    Export als JSON Lines (eine Zeile pro Job, jsonl_path) und im Prometheus-Textformat
+    (prometheus_text). Verschachtelte Jobs (z.B. Dokument -> PDF -> Bild) zählen zum
+    äußeren Job. Laufen mehrere Jobs gleichzeitig im selben Prozess, ist der Peak-RSS
+    der des Prozesses während des Jobs.
+    """
+    enabled = True
+
+    def __init__(self, jsonl_path: Optional[str] = None, prefix: str = 'papa_convert'):
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        if self.jsonl_path is not None:
+            self.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._active_jobs = 0
+        self._stages: Dict[str, list] = {}  # stage -> [count, sum, bucket_counts]
+        self._counters: Dict[tuple, int] = {}  # (name, labels) -> Wert
+        self._peak_rss = 0
+
+    def span(self, stage: str) -> _Span:
+        """Misst eine Stufe: with metrics.span('pandoc.render'): ..."""
+        return _Span(self, stage)
+
+    def job(self, **labels):
+        """Klammert eine komplette Konvertierung (verschachtelte Jobs zählen zum äußeren)"""
+        if getattr(self._local, 'job', None) is not None:
+            return _NULL_SPAN
+        return _Job(self, labels)
+
+    def count(self, name: str, value: int = 1, **labels):
+        """Erhöht einen Zähler, z.B. count('engine_fallbacks', source='pandoc', target='markdown_pdf')"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        job = getattr(self._local, 'job', None)
+        if job is not None:
+            job.counters[name] = job.counters.get(name, 0) + value
+
+    def _finish_span(self, stage: str, seconds: float):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = [0, 0.0, [0] * len(DURATION_BUCKETS)]
+            stats[0] += 1
+            stats[1] += seconds
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    stats[2][i] += 1
+                    break
+        job = getattr(self._local, 'job', None)
+        if job is not None:
+            job.spans[stage] = job.spans.get(stage, 0.0) + seconds
+
+    def _start_job(self, job: _Job):
+        self._local.job = job
+        with self._lock:
+            self._active_jobs += 1
+            if self._active_jobs == 1:
+                _reset_peak_rss()
+
+    def _finish_job(self, job: _Job, seconds: float, success: bool):
+        self._local.job = None
+        peak_rss = peak_rss_bytes()
+        with self._lock:
+            self._active_jobs -= 1
+            if peak_rss:
+                self._peak_rss = max(self._peak_rss, peak_rss)
+        self._finish_span('job', seconds)
+        self.count('jobs', status='ok' if success else 'error', engine=job.labels.get('engine', ''))
+
+        if self.jsonl_path is not None:
+            entry = {
+                'ts': round(time.time(), 3),
+                **job.labels,
+                'success': success,
+                'seconds': round(seconds, 4),
+                'spans': {stage: round(value, 4) for stage, value in job.spans.items()},
+                'counters': job.counters,
+                'peak_rss_bytes': peak_rss,
+            }
+            try:
+                append_json_line(self.jsonl_path, entry)
+            except OSError:
+                pass  # Messung darf nie eine Konvertierung scheitern lassen
+
+    def snapshot(self) -> dict:
+        """Aggregierte Werte als Dict (z.B. für /health)"""
+        with self._lock:
+            return {
+                'stages': {
+                    stage: {'count': stats[0], 'seconds': round(stats[1], 4)}
+                    for stage, stats in self._stages.items()
+                },
+                'counters': {
+                    name + ''.join(f"[{k}={v}]" for k, v in labels): value
+                    for (name, labels), value in self._counters.items()
+                },
+                'peak_rss_bytes': self._peak_rss,
+            }
+
+    @staticmethod
+    def _labels(labels) -> str:
+        if not labels:
+            return ''
+        parts = []
+        for key, value in labels:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            parts.append(f'{key}="{value}"')
+        return '{' + ','.join(parts) + '}'
+
+    def prometheus_text(self) -> str:
+        """Alle Metriken im Prometheus-Textformat (Version 0.0.4)"""
+        metric = f"{self.prefix}_stage_seconds"
+        lines = [
+            f"# HELP {metric} Dauer pro Konvertierungsstufe",
+            f"# TYPE {metric} histogram",
+        ]
+        with self._lock:
+            for stage, (count, total, buckets) in sorted(self._stages.items()):
+                cumulative = 0
+                for bound, bucket in zip(DURATION_BUCKETS, buckets):
+                    cumulative += bucket
+                    le = '+Inf' if bound == math.inf else repr(bound)
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {total:.6f}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {count}')
+
+            names = sorted({name for name, _ in self._counters})
+            for name in names:
+                counter = f"{self.prefix}_{name}_total"
+                lines.append(f"# TYPE {counter} counter")
+                for (counter_name, labels), value in sorted(self._counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{counter}{self._labels(labels)} {value}")
+
+            gauge = f"{self.prefix}_peak_rss_bytes"
+            lines.append(f"# TYPE {gauge} gauge")
+            lines.append(f"{gauge} {self._peak_rss}")
+        return '\n'.join(lines) + '\n'
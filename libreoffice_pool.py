@@ -0,0 +1,335 @@
+"""Persistenter LibreOffice-Worker-Pool über unoserver (statt soffice pro Datei)"""
+import atexit
+import os
+import queue
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+
+class LibreOfficePoolError(Exception):
+    """Fehler im Pool - Aufrufer kann auf soffice --convert-to zurückfallen"""
+    pass
+
+
+class LibreOfficeTimeoutError(LibreOfficePoolError):
+    """Konvertierung hat das Job-Timeout überschritten - die Instanz wurde beendet"""
+    pass
+
+
+def _free_port() -> int:
+    """Sucht einen freien lokalen TCP-Port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _unoserver_command() -> List[str]:
+    """Startbefehl für unoserver (Console-Script oder Modul)"""
+    executable = shutil.which('unoserver')
+    if executable:
+        return [executable]
+    return [sys.executable, '-m', 'unoserver.server']
+
+
+def _process_group_options() -> dict:
+    """Popen-Optionen für eine eigene Prozessgruppe (unoserver + soffice-Kindprozess)"""
+    if os.name == 'nt':
+        return {'creationflags': subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+
+def _signal_group(process: subprocess.Popen, force: bool):
+    """Signal an die ganze Gruppe - terminate()/kill() erreichen nur unoserver selbst"""
+    if os.name == 'nt':
+        if force:
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                           capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+        else:
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        # Keine eigene Gruppe (mehr) - zumindest den Prozess selbst beenden
+        if process.poll() is None:
+            process.kill() if force else process.terminate()
+
+
+class LibreOfficeInstance:
+    """Ein langlebiger headless LibreOffice-Prozess mit eigenem Benutzerprofil"""
+
+    def __init__(self, soffice_path: str, profile_dir: Path, startup_timeout: float = 30.0):
+        self.soffice_path = soffice_path
+        self.profile_dir = profile_dir
+        self.startup_timeout = startup_timeout
+        self.port = None
+        self.uno_port = None
+        self.process = None
+        self.jobs_done = 0
+
+    def start(self):
+        """Startet unoserver + soffice und wartet bis der XML-RPC-Port antwortet"""
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self.port = _free_port()
+        self.uno_port = _free_port()
+        self.jobs_done = 0
+
+        cmd = _unoserver_command() + [
+            '--interface', '127.0.0.1',
+            '--port', str(self.port),
+            '--uno-interface', '127.0.0.1',
+            '--uno-port', str(self.uno_port),
+            '--executable', self.soffice_path,
+            # Eigenes Profil pro Instanz - sonst blockieren sich die Prozesse gegenseitig
+            '--user-installation', self.profile_dir.as_uri(),
+        ]
+
+        try:
+            self.process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                **_process_group_options()
+            )
+        except OSError as e:
+            raise LibreOfficePoolError(f"unoserver konnte nicht gestartet werden: {e}")
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise LibreOfficePoolError(f"unoserver beendet (Exit-Code {self.process.returncode})")
+            if self._port_open():
+                return
+            time.sleep(0.2)
+
+        self.stop()
+        raise LibreOfficePoolError(f"unoserver nicht bereit nach {self.startup_timeout}s")
+
+    def stop(self):
+        """Beendet die Instanz samt Prozessgruppe (auch ein hängendes soffice)"""
+        process = self.process
+        if process is None:
+            return
+        if process.poll() is None:
+            _signal_group(process, force=False)
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                _signal_group(process, force=True)
+                process.wait()
+        if os.name != 'nt':
+            # Verwaiste Kinder (soffice, das SIGTERM nicht beantwortet) halten sonst das Profil
+            _signal_group(process, force=True)
+        self.process = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def _port_open(self) -> bool:
+        try:
+            with socket.create_connection(('127.0.0.1', self.port), timeout=0.5):
+                return True
+        except OSError:
+            return False
+
+    def is_healthy(self) -> bool:
+        """Health-Check: Prozess lebt und XML-RPC-Port nimmt Verbindungen an"""
+        return self.process is not None and self.process.poll() is None and self._port_open()
+
+    def _client(self):
+        try:
+            from unoserver.client import UnoClient
+        except ImportError:
+            raise LibreOfficePoolError("unoserver nicht installiert. Bitte 'pip install unoserver' ausführen.")
+        return UnoClient(server='127.0.0.1', port=str(self.port), host_location='local')
+
+    def convert(self, input_file: str, output_file: str, convert_to: str):
+        """Konvertiert Datei zu Datei (Pfade werden direkt vom Server gelesen/geschrieben)"""
+        self._client().convert(inpath=input_file, outpath=output_file, convert_to=convert_to)
+        self.jobs_done += 1
+
+    def convert_bytes(self, data: bytes, convert_to: str, infiltername: Optional[str] = None) -> bytes:
+        """Konvertiert im Speicher: Eingabe und Ergebnis gehen über XML-RPC, nicht über die Platte"""
+        result = self._client().convert(indata=data, convert_to=convert_to, infiltername=infiltername)
+        self.jobs_done += 1
+        return result
+
+
+class LibreOfficePool:
+    """
+    Pool aus langlebigen LibreOffice-Instanzen
+
+    PERFORMANCE: Der Kaltstart von soffice (mehrere Sekunden) fällt nur einmal pro
+    Instanz an. Instanzen werden nach max_jobs_per_instance Konvertierungen oder
+    nach einem Absturz automatisch neu gestartet. Mit job_timeout beendet ein Watchdog
+    eine hängende Instanz (unoserver selbst kennt kein Timeout); sie wird bei der
+    Rückgabe neu gestartet.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        soffice_path: str = 'soffice',
+        max_jobs_per_instance: int = 200,
+        startup_timeout: float = 30.0,
+        profile_root: Optional[str] = None
+    ):
+        if size < 1:
+            raise ValueError("Pool-Größe muss mindestens 1 sein")
+        self.size = size
+        self.soffice_path = soffice_path
+        self.max_jobs_per_instance = max_jobs_per_instance
+        self.startup_timeout = startup_timeout
+        self._profile_root = Path(profile_root) if profile_root else None
+        self._owns_profile_root = profile_root is None
+        self._instances = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        atexit.register(self.shutdown)
+
+    def start(self):
+        """Startet alle Instanzen (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            if self._profile_root is None:
+                self._profile_root = Path(tempfile.mkdtemp(prefix=f"lo_pool_{os.getpid()}_"))
+
+            for i in range(self.size):
+                instance = LibreOfficeInstance(
+                    self.soffice_path,
+                    self._profile_root / f"profile_{i}",
+                    self.startup_timeout
+                )
+                try:
+                    instance.start()
+                except LibreOfficePoolError:
+                    for started in self._instances:
+                        started.stop()
+                    self._instances = []
+                    raise
+                self._instances.append(instance)
+                self._idle.put(instance)
+
+            self._started = True
+
+    def shutdown(self):
+        """Beendet alle Instanzen und räumt Profile auf"""
+        with self._lock:
+            if not self._started:
+                return
+            for instance in self._instances:
+                instance.stop()
+            self._instances = []
+            self._idle = queue.Queue()
+            self._started = False
+            if self._owns_profile_root and self._profile_root is not None:
+                shutil.rmtree(self._profile_root, ignore_errors=True)
+                self._profile_root = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def health(self) -> List[dict]:
+        """Status aller Instanzen (für Monitoring)"""
+        return [
+            {
+                'port': instance.port,
+                'healthy': instance.is_healthy(),
+                'jobs_done': instance.jobs_done
+            }
+            for instance in self._instances
+        ]
+
+    def _acquire(self, timeout: Optional[float]) -> LibreOfficeInstance:
+        self.start()
+        try:
+            instance = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise LibreOfficePoolError("Keine freie LibreOffice-Instanz verfügbar")
+
+        # Health-Check vor jeder Vergabe, tote Instanzen werden ersetzt
+        if not instance.is_healthy():
+            try:
+                instance.restart()
+            except LibreOfficePoolError:
+                self._idle.put(instance)
+                raise
+        return instance
+
+    def _release(self, instance: LibreOfficeInstance, failed: bool = False):
+        try:
+            if failed and not instance.is_healthy():
+                instance.restart()
+            elif instance.jobs_done >= self.max_jobs_per_instance:
+                # Recycling gegen Speicherlecks in langlebigen soffice-Prozessen
+                instance.restart()
+        except LibreOfficePoolError:
+            pass  # Nächster _acquire versucht den Neustart erneut
+        finally:
+            self._idle.put(instance)
+
+    def _run(self, timeout: Optional[float], job_timeout: Optional[float], method: str, *args):
+        """
+        Führt eine Konvertierung auf einer freien Instanz aus (Fehler -> LibreOfficePoolError)
+
+        timeout begrenzt das Warten auf eine freie Instanz, job_timeout die Konvertierung.
+        """
+        instance = self._acquire(timeout)
+        failed = False
+        timed_out = threading.Event()
+        watchdog = None
+        if job_timeout:
+            # Beenden des Prozesses bricht den blockierenden XML-RPC-Aufruf ab
+            watchdog = threading.Timer(job_timeout, lambda: (timed_out.set(), instance.stop()))
+            watchdog.daemon = True
+            watchdog.start()
+        try:
+            return getattr(instance, method)(*args)
+        except Exception as e:
+            failed = True
+            if timed_out.is_set():
+                raise LibreOfficeTimeoutError(f"LibreOffice-Konvertierung dauerte zu lange (>{job_timeout}s)")
+            if isinstance(e, LibreOfficePoolError):
+                raise
+            raise LibreOfficePoolError(f"unoserver-Konvertierung fehlgeschlagen: {e}")
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+                watchdog.join()  # Ein laufendes stop() muss vor dem Neustart in _release fertig sein
+            self._release(instance, failed)
+
+    def convert(self, input_file: str, output_file: str, convert_to: str, timeout: Optional[float] = None,
+                job_timeout: Optional[float] = None) -> str:
+        """Konvertiert eine Datei über eine freie Instanz"""
+        self._run(timeout, job_timeout, 'convert', input_file, output_file, convert_to)
+        if not Path(output_file).exists():
+            raise LibreOfficePoolError("Ausgabedatei wurde nicht erstellt")
+        return output_file
+
+    def convert_bytes(self, data: bytes, convert_to: str, infiltername: Optional[str] = None,
+                      timeout: Optional[float] = None, job_timeout: Optional[float] = None) -> bytes:
+        """
+        Konvertiert Bytes zu Bytes über eine freie Instanz
+
+        infiltername erzwingt den Import-Filter (z.B. 'HTML (StarWriter)', damit HTML als
+        Writer-Dokument statt Writer/Web geöffnet und als normales PDF exportiert wird).
+        """
+        result = self._run(timeout, job_timeout, 'convert_bytes', data, convert_to, infiltername)
+        if not result:
+            raise LibreOfficePoolError("Leeres Ergebnis von unoserver")
+        return result
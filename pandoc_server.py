@@ -0,0 +1,184 @@
+"""Persistenter pandoc-Server (pandoc server / pandoc-server) statt einem pandoc-Prozess pro Dokument"""
+import atexit
+import base64
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from typing import List, Union
+
+
+class PandocServerError(Exception):
+    """Fehler im Server - Aufrufer kann auf die pandoc-CLI zurückfallen"""
+    pass
+
+
+def _free_port() -> int:
+    """Sucht einen freien lokalen TCP-Port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class PandocServer:
+    """
+    Überwachter lokaler pandoc-Server mit JSON-API über HTTP
+
+    PERFORMANCE: Der Prozessstart von pandoc fällt einmal an statt pro Dokument;
+    kleine Markdown-Dateien kosten dann nur noch einen HTTP-Roundtrip (Keep-Alive-
+    Verbindung pro Thread). /batch konvertiert viele Dokumente in einem Request.
+    Stirbt der Server, wird er beim nächsten Aufruf neu gestartet.
+    """
+
+    def __init__(self, pandoc_path: str = 'pandoc', request_timeout: int = 120, startup_timeout: float = 10.0):
+        self.pandoc_path = pandoc_path
+        self.request_timeout = request_timeout
+        self.startup_timeout = startup_timeout
+        self.port = None
+        self.process = None
+        self.requests_done = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        atexit.register(self.stop)
+
+    def _commands(self) -> List[List[str]]:
+        """'pandoc server' (pandoc 3) oder das separate pandoc-server-Binary"""
+        options = ['--port', str(self.port), '--timeout', str(self.request_timeout)]
+        commands = [[self.pandoc_path, 'server'] + options]
+        standalone = shutil.which('pandoc-server')
+        if standalone:
+            commands.append([standalone] + options)
+        return commands
+
+    def start(self):
+        """Startet den Server (idempotent) und wartet bis der Port antwortet"""
+        with self._lock:
+            if self.process is not None and self.process.poll() is None:
+                return
+            self.port = _free_port()
+            errors = []
+            for cmd in self._commands():
+                try:
+                    self.process = subprocess.Popen(
+                        cmd,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                    )
+                except OSError as e:
+                    errors.append(str(e))
+                    continue
+                if self._wait_ready():
+                    return
+                errors.append(f"{' '.join(cmd[:2])}: Exit-Code {self.process.poll()}")
+                self._kill()
+            raise PandocServerError(f"pandoc-Server konnte nicht gestartet werden ({'; '.join(errors)})")
+
+    def _wait_ready(self) -> bool:
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                return False  # z.B. pandoc ohne Server-Unterstützung
+            try:
+                with socket.create_connection(('127.0.0.1', self.port), timeout=0.5):
+                    return True
+            except OSError:
+                time.sleep(0.05)
+        return False
+
+    def _kill(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def stop(self):
+        """Beendet den Server"""
+        with self._lock:
+            self._kill()
+
+    def is_healthy(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def health(self) -> dict:
+        return {'port': self.port, 'healthy': self.is_healthy(), 'requests_done': self.requests_done}
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'port', None) != self.port:
+            connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=self.request_timeout + 5)
+            self._local.connection = connection
+            self._local.port = self.port
+        return connection
+
+    def _post(self, path: str, payload) -> Union[dict, list]:
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        # Ein Versuch mit bestehender Verbindung, einer nach (Neu-)Start des Servers
+        for attempt in range(2):
+            if not self.is_healthy():
+                self.start()
+            connection = self._connection()
+            try:
+                connection.request('POST', path, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise PandocServerError(f"pandoc-Server nicht erreichbar: {e}")
+                continue
+            if response.status != 200:
+                raise PandocServerError(f"pandoc-Server: HTTP {response.status}: {data[:300]!r}")
+            self.requests_done += 1
+            try:
+                return json.loads(data)
+            except ValueError:
+                raise PandocServerError("pandoc-Server: ungültige Antwort")
+
+    @staticmethod
+    def _output(result: dict) -> bytes:
+        if not isinstance(result, dict) or 'output' not in result:
+            message = result.get('error') if isinstance(result, dict) else result
+            raise PandocServerError(f"pandoc-Server: {message}")
+        if result.get('base64'):
+            return base64.b64decode(result['output'])
+        return result['output'].encode('utf-8')
+
+    def convert(self, request: dict) -> bytes:
+        """Ein Dokument: request = {'text', 'from', 'to', ...} (Felder wie pandoc-Optionen)"""
+        return self._output(self._post('/', request))
+
+    def convert_batch(self, requests: List[dict]) -> List[Union[bytes, PandocServerError]]:
+        """Viele Dokumente in einem Request; Fehler einzelner Dokumente kommen als Exception-Objekt zurück"""
+        results = self._post('/batch', requests)
+        if not isinstance(results, list) or len(results) != len(requests):
+            raise PandocServerError("pandoc-Server: unerwartete Batch-Antwort")
+        outputs = []
+        for result in results:
+            try:
+                outputs.append(self._output(result))
+            except PandocServerError as e:
+                outputs.append(e)
+        return outputs
+
+
+def pandoc_request(text: str, reader: str, writer: str, quality: int = 2, standalone: bool = False) -> dict:
+    """Request-Objekt für die Server-API mit denselben Qualitätsstufen wie die CLI"""
+    request = {'text': text, 'from': reader, 'to': writer, 'standalone': standalone}
+    if quality == 3:
+        request.update({'standalone': True, 'table-of-contents': True, 'number-sections': True})
+    elif quality == 1:
+        request['highlight-style'] = None  # wie --no-highlight
+    return request
@@ -0,0 +1,125 @@
+"""Streaming-PDF-Writer für Bildseiten: Seite für Seite, JPEG-Daten unverändert übernommen"""
+import glob
+import re
+from typing import List, Optional, Union
+
+# Blockgröße beim Kopieren von Bilddaten (z.B. JPEG-Datei) in den PDF-Stream
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def natural_sort_key(path: str) -> list:
+    """Sortierschlüssel mit Zahlen als Zahlen: scan_2 vor scan_10"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', str(path))]
+
+
+def expand_inputs(inputs: Union[str, List[str]]) -> List[str]:
+    """Glob-Muster oder Liste -> Dateiliste; Muster werden natürlich sortiert, Listen behalten ihre Reihenfolge"""
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    files = []
+    for pattern in inputs:
+        if glob.has_magic(pattern):
+            files.extend(sorted(glob.glob(pattern), key=natural_sort_key))
+        else:
+            files.append(pattern)
+    return files
+
+
+class ImagePdfWriter:
+    """
+    Schreibt ein PDF aus Bildseiten direkt in einen Binär-Stream
+
+    PERFORMANCE: Jede Seite (Bild-XObject, Content-Stream, Page) wird sofort
+    geschrieben; im Speicher bleiben nur die Objekt-Offsets. Der Stream muss nicht
+    seekbar sein. Bilddaten kommen als bytes oder als Datei, die blockweise kopiert
+    wird - JPEGs gehen so ohne Dekodieren als DCTDecode-Stream ins PDF.
+    """
+
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+        self.offsets = {}
+        self.page_ids = []
+        self._next_id = 3
+        # Binärkommentar: markiert die Datei für Transfer-Tools als binär
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _write(self, data: bytes):
+        self.stream.write(data)
+        self.position += len(data)
+
+    def _new_id(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _begin(self, obj_id: int):
+        self.offsets[obj_id] = self.position
+        self._write(f"{obj_id} 0 obj\n".encode('ascii'))
+
+    def _object(self, obj_id: int, body: str):
+        self._begin(obj_id)
+        self._write(body.encode('ascii') + b'\nendobj\n')
+
+    def _stream_data(self, data, length: int):
+        if isinstance(data, bytes):
+            self._write(data)
+            return
+        remaining = length
+        while remaining > 0:
+            chunk = data.read(min(COPY_CHUNK_BYTES, remaining))
+            if not chunk:
+                raise ValueError("Bilddaten kürzer als angegeben")
+            self._write(chunk)
+            remaining -= len(chunk)
+
+    def add_image_page(self, width: int, height: int, data, length: int, page_size: tuple,
+                       color_space: str = 'DeviceRGB', bits: int = 8, filter_name: str = 'DCTDecode',
+                       rotate: int = 0, decode: Optional[str] = None):
+        """
+        Hängt eine Seite an, die vollständig von einem Bild ausgefüllt wird
+
+        data: bytes oder Binärdatei (genau length Bytes werden gelesen). page_size in Punkt
+        (1/72 Zoll); rotate dreht die Anzeige im Uhrzeigersinn (0/90/180/270).
+        """
+        image_id, content_id, page_id = self._new_id(), self._new_id(), self._new_id()
+        page_width, page_height = page_size
+
+        self._begin(image_id)
+        extra = f" /Decode {decode}" if decode else ''
+        self._write(
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /{color_space} /BitsPerComponent {bits} /Filter /{filter_name}{extra} "
+            f"/Length {length} >>\nstream\n".encode('ascii')
+        )
+        self._stream_data(data, length)
+        self._write(b'\nendstream\nendobj\n')
+
+        content = f"q {page_width:.4f} 0 0 {page_height:.4f} 0 0 cm /Im0 Do Q".encode('ascii')
+        self._begin(content_id)
+        self._write(f"<< /Length {len(content)} >>\nstream\n".encode('ascii') + content + b'\nendstream\nendobj\n')
+
+        rotation = f" /Rotate {rotate}" if rotate else ''
+        self._object(
+            page_id,
+            f"<< /Type /Page /Parent {self.PAGES_ID} 0 R /MediaBox [0 0 {page_width:.4f} {page_height:.4f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R{rotation} >>"
+        )
+        self.page_ids.append(page_id)
+
+    def close(self):
+        """Schreibt Seitenbaum, Katalog, Querverweistabelle und Trailer"""
+        kids = ' '.join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._object(self.PAGES_ID, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        self._object(self.CATALOG_ID, f"<< /Type /Catalog /Pages {self.PAGES_ID} 0 R >>")
+
+        xref_position = self.position
+        lines = [f"xref\n0 {self._next_id}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, self._next_id)]
+        lines.append(
+            f"trailer\n<< /Size {self._next_id} /Root {self.CATALOG_ID} 0 R >>\nstartxref\n{xref_position}\n%%EOF\n"
+        )
+        self._write(''.join(lines).encode('ascii'))
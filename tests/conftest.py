@@ -0,0 +1,5 @@
+"""Gemeinsame Test-Konfiguration: Module liegen flach im Projektordner"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,27 @@
+"""Prozess-Limits pro Backend im Batch-Modus"""
+from batch_processor import BatchProcessor, cap_engine_limits, default_engine_limits
+
+
+def test_default_limits_never_exceed_workers():
+    for workers in (1, 2, 4):
+        assert max(default_engine_limits(workers).values()) <= workers
+
+
+def test_total_capped_at_workers():
+    limits = cap_engine_limits({'image': 16, 'pandoc': 4, 'libreoffice': 4, 'docling': 1}, 4)
+    assert sum(limits.values()) == 4
+    assert all(limit >= 1 for limit in limits.values())
+
+    assert cap_engine_limits({'image': 16}, 4) == {'image': 4}
+    assert cap_engine_limits({'image': 2, 'pandoc': 1}, 8) == {'image': 2, 'pandoc': 1}
+
+
+def test_each_active_backend_keeps_one_process():
+    limits = cap_engine_limits({'image': 4, 'pandoc': 4, 'libreoffice': 4}, 2)
+    assert limits == {'image': 1, 'pandoc': 1, 'libreoffice': 1}
+
+
+def test_libreoffice_pool_is_shared_out_per_worker():
+    processor = BatchProcessor(max_workers=4, engine_options={'libreoffice_pool_size': 2})
+    assert processor.engine_options['libreoffice_pool_size'] == 1
+    assert processor.engine_limits['libreoffice'] == 2
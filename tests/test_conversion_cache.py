@@ -0,0 +1,55 @@
+"""Content-adressierter Ergebnis-Cache: Größenbuchhaltung und LRU-Eviction"""
+import os
+import time
+
+from conversion_cache import ConversionCache
+
+
+def _fill(cache, key, size):
+    cache.put_bytes(key, b'x' * size, '.pdf')
+
+
+def test_repeated_put_does_not_inflate_total(tmp_path):
+    cache = ConversionCache(str(tmp_path / 'cache'), max_bytes=10_000)
+    _fill(cache, 'aa' + '0' * 62, 1000)
+    for _ in range(50):
+        _fill(cache, 'bb' + '0' * 62, 1000)
+    assert cache._total_bytes == 2000
+    assert cache.get_bytes('aa' + '0' * 62) is not None  # nichts vorzeitig verdrängt
+
+    _fill(cache, 'bb' + '0' * 62, 300)  # kleineres Ergebnis für denselben Key
+    assert cache._total_bytes == 1300
+    assert cache._total_bytes == cache._scan_size()
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = ConversionCache(str(tmp_path / 'cache'), max_bytes=3000)
+    keys = [f"{i:02d}" + '0' * 62 for i in range(3)]
+    for i, key in enumerate(keys):
+        _fill(cache, key, 1000)
+        entry = cache._entry(key)
+        os.utime(entry, (time.time() - 100 + i, time.time() - 100 + i))
+    cache.get_bytes(keys[0])  # Treffer macht den ältesten Eintrag wieder frisch
+
+    _fill(cache, '99' + '0' * 62, 1000)
+    assert cache.get_bytes(keys[1]) is None
+    assert cache.get_bytes(keys[0]) is not None
+    assert cache._total_bytes <= 3000 * 0.9
+
+
+def test_file_roundtrip(tmp_path):
+    cache = ConversionCache(str(tmp_path / 'cache'))
+    source = tmp_path / 'in.md'
+    source.write_text('# Titel', encoding='utf-8')
+    artifact = tmp_path / 'in.pdf'
+    artifact.write_bytes(b'%PDF-1.4 test')
+    key = cache.make_key(str(source), 'pdf', {'quality': 2}, '1.0')
+    assert key == cache.make_key(str(source), 'PDF', {'quality': 2}, '1.0')
+    assert key != cache.make_key(str(source), 'pdf', {'quality': 3}, '1.0')
+
+    cache.put(key, str(artifact))
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    hit = cache.get(key, str(out_dir), 'in')
+    assert hit == str(out_dir / 'in.pdf')
+    assert (out_dir / 'in.pdf').read_bytes() == b'%PDF-1.4 test'
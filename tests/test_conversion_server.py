@@ -0,0 +1,47 @@
+"""Job-Verwaltung des HTTP-Dienstes: Ergebnisse werden einmal ausgegeben und verfallen"""
+import io
+import time
+
+from PIL import Image
+
+from conversion_server import ConversionService
+
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 30), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _finished_job(service):
+    job = service.submit(_png(), 'png', 'jpg', {'quality': 2})
+    assert job.done.wait(10)
+    assert job.status == 'done'
+    return job
+
+
+def test_result_is_handed_out_once():
+    service = ConversionService(engine_options={'libreoffice_pool_size': 0})
+    job = _finished_job(service)
+    assert job.to_dict()['result_available']
+    assert service.take_result(job)[:3] == b'\xff\xd8\xff'
+    assert service.take_result(job) is None
+    assert service.get(job.id).status == 'done'  # Metadaten bleiben
+
+
+def test_expired_result_is_dropped_on_lookup():
+    service = ConversionService(engine_options={'libreoffice_pool_size': 0}, result_ttl=0.05)
+    job = _finished_job(service)
+    time.sleep(0.1)
+    assert service.get(job.id) is job
+    assert job.result is None
+    assert service.take_result(job) is None
+
+
+def test_idle_service_sweeps_expired_results():
+    service = ConversionService(engine_options={'libreoffice_pool_size': 0}, result_ttl=0.05)
+    job = _finished_job(service)
+    deadline = time.monotonic() + 5
+    while job.result is not None and time.monotonic() < deadline:
+        time.sleep(0.1)  # kein Request - nur der Hintergrund-Sweep gibt frei
+    assert job.result is None
@@ -0,0 +1,42 @@
+"""Zeit-/Größenschätzung aus der Telemetrie"""
+import pytest
+
+from conversion_telemetry import ConversionEstimator, _LinearFit
+
+MB = 1024 * 1024
+
+
+def _record(engine, seconds, input_bytes, pages=None, input_format='pdf', output_format='markdown'):
+    return {'engine': engine, 'input_format': input_format, 'output_format': output_format,
+            'quality': 2, 'seconds': seconds, 'input_bytes': input_bytes, 'pages': pages,
+            'output_bytes': input_bytes // 2, 'success': True}
+
+
+def test_linear_fit_per_page():
+    model = _LinearFit([_record('docling', 1 + 2 * pages, MB, pages) for pages in (1, 5, 10)], 'pages')
+    assert model.fixed == pytest.approx(1)
+    assert model.per_unit == pytest.approx(2)
+    assert model.predict(MB, 20) == pytest.approx(41)
+    assert model.predict(50 * MB, None) is None
+    assert model.size_ratio == pytest.approx(0.5)
+
+
+def test_estimate_without_pages_skips_page_models():
+    records = [_record('docling', 2 * pages, MB, pages) for pages in (1, 5, 10)]
+    records += [_record('image', 3 * size, size * MB, input_format='png', output_format='pdf') for size in (1, 2, 4)]
+    estimator = ConversionEstimator(min_samples=3)
+    estimator.fit(records)
+
+    with_pages = estimator.estimate('docling', 'pdf', 'markdown', 400 * MB, pages=10)
+    assert with_pages['seconds'] == pytest.approx(20)
+    assert with_pages['basis'] == 'docling/pdf/markdown/2'
+
+    # Ohne Seitenzahl: nicht 2 s/Seite x 400 MB, sondern die MB-basierte Gesamtgruppe
+    without_pages = estimator.estimate('docling', 'pdf', 'markdown', 400 * MB)
+    assert without_pages['basis'] == 'alle'
+
+
+def test_estimate_without_history_uses_defaults():
+    estimate = ConversionEstimator().estimate('libreoffice', 'docx', 'pdf', 3 * MB)
+    assert estimate['basis'] == 'standard'
+    assert estimate['seconds'] == pytest.approx(6)
@@ -0,0 +1,111 @@
+"""Format-Erkennung am Inhalt und Auflösung gegen die Dateiendung"""
+import io
+import zipfile
+
+import pytest
+from PIL import Image
+
+from format_sniffer import detect_format, detect_text_encoding, resolve_format, sniff_bytes
+from pdf_assembler import natural_sort_key
+
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+
+def _image(fmt) -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def _zip(entries, mimetype=None) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        if mimetype:
+            archive.writestr(zipfile.ZipInfo('mimetype'), mimetype)
+        for name in entries:
+            archive.writestr(name, b'<xml/>')
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('data, expected', [
+    (b'%PDF-1.7\n', 'pdf'),
+    (_image('PNG'), 'png'),
+    (_image('JPEG'), 'jpg'),
+    (_image('GIF'), 'gif'),
+    (_image('WEBP'), 'webp'),
+    (_image('TIFF'), 'tiff'),
+    (b'\x00\x00\x00\x1cftypavif\x00\x00\x00\x00avifmif1', 'avif'),
+    (b'\x00\x00\x00\x18ftypheic\x00\x00\x00\x00mif1heic', 'heic'),
+    (_zip(['word/document.xml']), 'docx'),
+    (_zip(['xl/workbook.xml']), 'xlsx'),
+    (_zip(['META-INF/container.xml'], b'application/epub+zip'), 'epub'),
+    (_zip(['content.xml'], b'application/vnd.oasis.opendocument.text'), 'odt'),
+    (_zip(['readme.txt']), 'zip'),
+    (OLE_MAGIC + bytes(200), 'ole'),
+    (OLE_MAGIC + bytes(200) + 'WordDocument'.encode('utf-16-le'), 'doc'),
+    (OLE_MAGIC + bytes(200) + 'Workbook'.encode('utf-16-le'), 'xls'),
+    (OLE_MAGIC + bytes(200) + 'PowerPoint Document'.encode('utf-16-le'), 'ppt'),
+    (b'{\\rtf1\\ansi', 'rtf'),
+    (b'\xef\xbb\xbf<!DOCTYPE html><html></html>', 'html'),
+    (b'<?xml version="1.0"?><svg xmlns="http://www.w3.org/2000/svg"/>', 'svg'),
+    (b'# Titel\n\nText', None),
+])
+def test_sniff_bytes(data, expected):
+    assert sniff_bytes(data[:8192], io.BytesIO(data)) == expected
+
+
+@pytest.mark.parametrize('sniffed, extension, expected', [
+    (None, 'md', 'md'),
+    ('zip', 'docx', 'docx'),
+    ('png', '.PDF', 'png'),          # Binärsignatur gewinnt
+    ('jpg', 'jpeg', 'jpeg'),         # Alias: Endung bleibt
+    ('html', 'md', 'md'),            # Textformat-Endung bleibt
+    ('html', '', 'html'),
+    ('webp', 'jpg', 'webp'),
+    ('avif', '', 'avif'),
+    ('ole', 'xls', 'xls'),
+    ('ole', 'xlt', 'xlt'),
+    ('ole', 'docx', 'doc'),          # z.B. verschlüsseltes OOXML
+    ('ole', 'pptm', 'ppt'),
+    ('ole', '', 'doc'),
+    ('xls', 'doc', 'xls'),           # Stream-Name entscheidet
+    ('docx', 'docm', 'docm'),        # gleiche Familie: genauere Endung bleibt
+    ('xlsx', 'xlsb', 'xlsb'),
+    ('odt', 'ott', 'ott'),
+    ('docx', 'xlsx', 'docx'),        # andere Familie: Inhalt gewinnt
+])
+def test_resolve_format(sniffed, extension, expected):
+    assert resolve_format(sniffed, extension) == expected
+
+
+def test_images_route_through_pillow():
+    from converter_engine import DocumentConverter
+    converter = DocumentConverter()
+    for fmt in ('webp', 'avif', 'tiff', 'heic'):
+        assert converter.get_engine(f"bild.{fmt}", 'pdf') == 'image'
+
+
+def test_detect_format_prefers_content(tmp_path):
+    mislabelled = tmp_path / 'photo.pdf'
+    mislabelled.write_bytes(_image('PNG'))
+    assert detect_format(str(mislabelled)) == 'png'
+    notes = tmp_path / 'notes.md'
+    notes.write_text('<html>kein echtes HTML</html>', encoding='utf-8')
+    assert detect_format(str(notes)) == 'md'
+
+
+@pytest.mark.parametrize('sample, expected', [
+    ('Grüße'.encode('utf-8'), 'utf-8'),
+    (b'\xef\xbb\xbf' + 'Grüße'.encode('utf-8'), 'utf-8-sig'),
+    ('Grüße'.encode('utf-16'), 'utf-16'),
+    ('Hallo Welt'.encode('utf-16-le'), 'utf-16-le'),
+    ('Grüße'.encode('cp1252'), 'latin-1'),
+    ('Grüße'.encode('utf-8')[:-2], 'utf-8'),  # abgeschnittenes Zeichen am Ende
+])
+def test_detect_text_encoding(sample, expected):
+    assert detect_text_encoding(sample) == expected
+
+
+def test_natural_sort_key():
+    names = ['scan_10.jpg', 'scan_2.jpg', 'Scan_1.jpg', 'scan_100.jpg']
+    assert sorted(names, key=natural_sort_key) == ['Scan_1.jpg', 'scan_2.jpg', 'scan_10.jpg', 'scan_100.jpg']
@@ -0,0 +1,99 @@
+"""LibreOffice-Pool ohne echtes LibreOffice: Prozessgruppe und Job-Timeout"""
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+import libreoffice_pool
+from libreoffice_pool import LibreOfficeInstance, LibreOfficePool, LibreOfficeTimeoutError
+
+# Ersatz für unoserver: lauscht auf --port und startet ein "soffice", das SIGTERM ignoriert
+FAKE_UNOSERVER = textwrap.dedent('''
+    import signal, socket, subprocess, sys
+    args = sys.argv[1:]
+    port = int(args[args.index('--port') + 1])
+    pid_file = args[args.index('--pid-file') + 1]
+    child = subprocess.Popen([sys.executable, '-c',
+        'import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(300)'])
+    with open(pid_file, 'w') as f:
+        f.write(str(child.pid))
+    server = socket.socket()
+    server.bind(('127.0.0.1', port))
+    server.listen()
+    while True:
+        server.accept()[0].close()
+''')
+
+
+def _alive(pid: int) -> bool:
+    try:
+        finished, _ = os.waitpid(pid, os.WNOHANG)
+    except ChildProcessError:
+        finished = 0  # nicht unser Kind - per Signal 0 prüfen
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    with open(f'/proc/{pid}/stat') as f:
+        return f.read().split()[2] != 'Z'
+
+
+@pytest.mark.skipif(os.name == 'nt' or not os.path.isdir('/proc'), reason='POSIX-Prozessgruppen')
+def test_stop_kills_orphaned_soffice(tmp_path, monkeypatch):
+    script = tmp_path / 'fake_unoserver.py'
+    script.write_text(FAKE_UNOSERVER)
+    pid_file = tmp_path / 'soffice.pid'
+    monkeypatch.setattr(libreoffice_pool, '_unoserver_command',
+                        lambda: [sys.executable, str(script), '--pid-file', str(pid_file)])
+
+    instance = LibreOfficeInstance('soffice', tmp_path / 'profile', startup_timeout=10)
+    instance.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not pid_file.exists() or not pid_file.read_text():
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        soffice_pid = int(pid_file.read_text())
+        assert _alive(soffice_pid)
+    finally:
+        instance.stop()
+
+    deadline = time.monotonic() + 5
+    while _alive(soffice_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _alive(soffice_pid)
+
+
+class _HangingInstance(LibreOfficeInstance):
+    """Konvertierung blockiert, bis der Watchdog den Prozess beendet"""
+
+    def start(self):
+        self.process = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+        self.jobs_done = 0
+
+    def _port_open(self):
+        return True
+
+    def convert_bytes(self, data, convert_to, infiltername=None):
+        if data == b'hang':
+            self.process.wait()
+            raise ConnectionResetError('Verbindung geschlossen')
+        self.jobs_done += 1
+        return b'%PDF-1.4'
+
+
+def test_job_timeout_restarts_instance(monkeypatch):
+    monkeypatch.setattr(libreoffice_pool, 'LibreOfficeInstance', _HangingInstance)
+    pool = LibreOfficePool(size=1)
+    try:
+        started = time.monotonic()
+        with pytest.raises(LibreOfficeTimeoutError):
+            pool.convert_bytes(b'hang', 'pdf', job_timeout=0.3)
+        assert time.monotonic() - started < 5
+        assert pool.convert_bytes(b'ok', 'pdf', job_timeout=5) == b'%PDF-1.4'
+        assert pool.health()[0]['healthy']
+    finally:
+        pool.shutdown()
@@ -0,0 +1,107 @@
+"""Mehrbild-Eingaben (GIF/TIFF): alle Frames bleiben erhalten, auch verkleinert und blockweise"""
+import io
+
+import pytest
+from PIL import Image, PdfParser
+
+from converter_engine import DocumentConverter
+
+
+def _frames(count, size=(1200, 900)):
+    return [Image.new('RGB', size, (i * 20 % 256, 100, 200)) for i in range(count)]
+
+
+def _multi_frame_bytes(fmt, count, size=(1200, 900)):
+    frames = _frames(count, size)
+    buffer = io.BytesIO()
+    frames[0].save(buffer, fmt, save_all=True, append_images=frames[1:])
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def converter():
+    return DocumentConverter()
+
+
+@pytest.mark.parametrize('count, block_mb', [
+    (3, 1),   # Blöcke [2] + [1]: letzter Block mit nur einem Frame
+    (10, 0),  # jeder Frame ein eigener Block
+    (4, 256),
+])
+def test_resized_tiff_keeps_every_frame(converter, tmp_path, count, block_mb):
+    source = tmp_path / 'scan.tif'
+    source.write_bytes(_multi_frame_bytes('TIFF', count))
+    options = {'max_dimension': 600, 'frame_block_mb': block_mb}
+
+    output = converter.convert(str(source), 'tiff', str(tmp_path / 'out'), options)
+    with Image.open(output) as result:
+        assert result.n_frames == count
+        assert result.size == (600, 450)
+
+    data = converter.convert_bytes(source.read_bytes(), 'tif', 'tiff', options)
+    with Image.open(io.BytesIO(data)) as result:
+        assert result.n_frames == count
+        result.seek(count - 1)
+        assert result.getpixel((0, 0)) == ((count - 1) * 20 % 256, 100, 200)
+
+
+@pytest.mark.parametrize('block_mb', [0, 1, 256])
+def test_multi_frame_pdf_has_one_page_per_frame(converter, block_mb):
+    data = converter.convert_bytes(_multi_frame_bytes('TIFF', 5), 'tif', 'pdf',
+                                   {'max_dimension': 600, 'frame_block_mb': block_mb})
+    assert len(PdfParser.PdfParser(buf=data).pages) == 5
+
+
+@pytest.mark.parametrize('output_format', ['gif', 'png', 'webp'])
+def test_resized_animation_keeps_every_frame(converter, output_format):
+    data = converter.convert_bytes(_multi_frame_bytes('GIF', 6, (800, 600)), 'gif', output_format,
+                                   {'max_dimension': 200})
+    with Image.open(io.BytesIO(data)) as result:
+        assert result.n_frames == 6
+        assert result.size == (200, 150)
+
+
+def test_page_range_selects_frames(converter):
+    data = converter.convert_bytes(_multi_frame_bytes('TIFF', 6, (200, 100)), 'tif', 'pdf', {'pages': '2-4'})
+    assert len(PdfParser.PdfParser(buf=data).pages) == 3
+
+
+def test_map_frames_keeps_order_with_small_buffer(converter):
+    frames = ((number, number) for number in range(1, 51))
+    results = list(converter._map_frames(lambda number, value: number * 10, frames,
+                                         {'image_threads': 4, 'frame_buffer': 2}))
+    assert results == [number * 10 for number in range(1, 51)]
+
+
+def test_unresized_frames_keep_their_pixels(converter):
+    data = converter.convert_bytes(_multi_frame_bytes('TIFF', 4, (64, 48)), 'tif', 'tiff', {})
+    with Image.open(io.BytesIO(data)) as result:
+        assert result.n_frames == 4
+        for index in range(4):
+            result.seek(index)
+            assert result.size == (64, 48)
+            assert result.getpixel((0, 0)) == (index * 20, 100, 200)
+
+
+def test_single_frame_target_writes_numbered_files(converter, tmp_path):
+    source = tmp_path / 'anim.gif'
+    source.write_bytes(_multi_frame_bytes('GIF', 3, (80, 60)))
+    converter.convert(str(source), 'jpg', str(tmp_path / 'out'), {'max_dimension': 40, 'pages': 'all'})
+    written = sorted(path.name for path in (tmp_path / 'out').iterdir())
+    assert written == ['anim_001.jpg', 'anim_002.jpg', 'anim_003.jpg']
+    with Image.open(tmp_path / 'out' / 'anim_003.jpg') as frame:
+        assert frame.size == (40, 30)
+
+
+def test_images_to_pdf_passes_jpeg_through(converter, tmp_path):
+    for index, name in enumerate(['scan_10.jpg', 'scan_2.jpg', 'scan_1.png']):
+        Image.new('RGB', (120 + index, 80), 'white').save(tmp_path / name, dpi=(100, 100))
+    output = converter.images_to_pdf(str(tmp_path / 'scan_*'), str(tmp_path / 'merged.pdf'))
+    data = (tmp_path / 'merged.pdf').read_bytes()
+    assert output == str(tmp_path / 'merged.pdf')
+    assert data.count(b'/DCTDecode') == 3
+    # JPEGs unverändert übernommen, Reihenfolge natürlich sortiert (scan_2 vor scan_10)
+    assert 0 < data.find((tmp_path / 'scan_2.jpg').read_bytes()) < data.find((tmp_path / 'scan_10.jpg').read_bytes())
+    pages = PdfParser.PdfParser(buf=data).pages
+    assert len(pages) == 3
+    assert not (tmp_path / 'merged.pdf.part').exists()
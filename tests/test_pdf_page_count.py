@@ -0,0 +1,139 @@
+"""Seitenzahl aus Trailer/xref (klassische Tabelle und xref-Stream) ohne PDF-Bibliothek"""
+import io
+import zlib
+
+import pytest
+from PIL import Image
+
+from file_analyzer import FileAnalyzer, pdf_page_count
+from pdf_assembler import ImagePdfWriter
+
+
+def build_pdf(pages=3, xref_stream=False, indirect_count=False, indirect_length=False,
+              predictor=True, object_stream=False):
+    """Minimales PDF: Katalog 1, Seitenbaum 2, Seiten ab 3, optional /Count als eigenes Objekt"""
+    out = bytearray(b'%PDF-1.5\n')
+    offsets = {}
+
+    def obj(number, body: bytes):
+        offsets[number] = len(out)
+        out.extend(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    page_ids = list(range(3, 3 + pages))
+    next_id = 3 + pages
+    count_id = None
+    if indirect_count:
+        count_id, next_id = next_id, next_id + 1
+    kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids)
+    count = f"{count_id} 0 R" if count_id else str(pages)
+    catalog = b"<< /Type /Catalog /Pages 2 0 R >>"
+    tree = f"<< /Type /Pages /Kids [{kids}] /Count {count} >>".encode()
+
+    compressed = {}
+    if object_stream:
+        stream_id, next_id = next_id, next_id + 1
+        header = f"1 0 2 {len(catalog) + 1} ".encode()
+        packed = zlib.compress(header + catalog + b' ' + tree)
+        compressed = {1: stream_id, 2: stream_id}
+    else:
+        obj(1, catalog)
+        obj(2, tree)
+    for page_id in page_ids:
+        obj(page_id, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 10 10] >>")
+    if count_id:
+        obj(count_id, str(pages).encode())
+    if object_stream:
+        obj(stream_id, f"<< /Type /ObjStm /N 2 /First {len(header)} /Filter /FlateDecode "
+                       f"/Length {len(packed)} >>\nstream\n".encode() + packed + b"\nendstream")
+
+    if not xref_stream:
+        position = len(out)
+        lines = [f"xref\n0 {next_id}\n", "0000000000 65535 f \n"]
+        lines += [f"{offsets[number]:010d} 00000 n \n" for number in range(1, next_id)]
+        lines.append(f"trailer\n<< /Size {next_id} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n")
+        out.extend(''.join(lines).encode())
+        return bytes(out)
+
+    xref_id = next_id
+    length_id = xref_id + 1 if indirect_length else None
+    size = xref_id + (2 if indirect_length else 1)
+    offsets[xref_id] = len(out)
+    rows = []
+    for number in range(size):
+        if number in compressed:
+            rows.append(bytes([2]) + compressed[number].to_bytes(4, 'big') + bytes([number - 1]))
+        elif number in offsets:
+            rows.append(bytes([1]) + offsets[number].to_bytes(4, 'big') + b'\0')
+        elif number == length_id:
+            rows.append(bytes([1]) + b'\0\0\0\0\0')  # Offset wird nicht gebraucht
+        else:
+            rows.append(bytes([0, 0, 0, 0, 0, 255]))
+    if predictor:
+        previous = bytes(6)
+        raw = b''
+        for row in rows:
+            raw += bytes([2]) + bytes((a - b) & 0xFF for a, b in zip(row, previous))
+            previous = row
+        parms = " /DecodeParms << /Predictor 12 /Columns 6 >>"
+    else:
+        raw = b''.join(rows)
+        parms = ''
+    packed = zlib.compress(raw)
+    length = f"{length_id} 0 R" if length_id else str(len(packed))
+    out.extend(f"{xref_id} 0 obj\n<< /Type /XRef /Size {size} /W [1 4 1] /Root 1 0 R "
+               f"/Filter /FlateDecode{parms} /Length {length} >>\nstream\n".encode()
+               + packed + b"\nendstream\nendobj\n")
+    if length_id:
+        out.extend(f"{length_id} 0 obj\n{len(packed)}\nendobj\n".encode())
+    out.extend(f"startxref\n{offsets[xref_id]}\n%%EOF\n".encode())
+    return bytes(out)
+
+
+def _count(tmp_path, data):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(data)
+    return FileAnalyzer._read_pdf_page_count(path), pdf_page_count(str(path))
+
+
+@pytest.mark.parametrize('pages', [1, 12, 345])
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'indirect_count': True},
+    {'xref_stream': True},
+    {'xref_stream': True, 'predictor': False},
+    {'xref_stream': True, 'indirect_length': True},
+    {'xref_stream': True, 'indirect_length': True, 'indirect_count': True},
+])
+def test_page_count_without_pdf_library(tmp_path, pages, kwargs):
+    fast, public = _count(tmp_path, build_pdf(pages, **kwargs))
+    assert fast == {'pages': pages, 'encrypted': False}
+    assert public == pages
+
+
+def test_objects_in_object_stream_use_fallback(tmp_path):
+    fast, public = _count(tmp_path, build_pdf(12, xref_stream=True, object_stream=True))
+    assert fast is None  # keine Suche über die ganze Datei, kein falscher Wert
+    pytest.importorskip('PyPDF2')
+    assert public == 12
+
+
+def test_xref_stream_offsets():
+    data = build_pdf(2, xref_stream=True, indirect_length=True)
+    offsets, classic = FileAnalyzer._pdf_xref_offsets(data, data)
+    assert not classic
+    for number in (1, 2, 3, 4):
+        assert data[offsets[number]:].startswith(f"{number} 0 obj".encode())
+
+
+def test_pillow_and_assembler_pdfs(tmp_path):
+    pillow_pdf = io.BytesIO()
+    Image.new('RGB', (20, 20)).save(pillow_pdf, 'PDF', save_all=True,
+                                    append_images=[Image.new('RGB', (20, 20))] * 3)
+    assert _count(tmp_path, pillow_pdf.getvalue())[1] == 4
+
+    stream = io.BytesIO()
+    writer = ImagePdfWriter(stream)
+    for _ in range(7):
+        writer.add_image_page(1, 1, b'\0\0\0', 3, (72, 72), filter_name='FlateDecode')
+    writer.close()
+    assert _count(tmp_path, stream.getvalue())[1] == 7
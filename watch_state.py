@@ -0,0 +1,100 @@
+"""Persistenter Zustand der Watch-Folder (welche Datei wurde wie konvertiert)"""
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 einer Datei (blockweise gelesen)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class WatchStateIndex:
+    """
+    SQLite-Index: pro Quelldatei und Regel Größe, mtime, Hash und Zielformat der
+    letzten erfolgreichen Konvertierung
+
+    PERFORMANCE: Der Abgleich beim Start vergleicht nur (size, mtime_ns) aus os.scandir
+    mit dem vorab geladenen Index - gehasht wird nur, wenn sich die Stat-Daten geändert
+    haben (z.B. nur "touch" oder Kopie mit neuem Zeitstempel).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            '''CREATE TABLE IF NOT EXISTS files (
+                path TEXT NOT NULL,
+                rule TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                target_format TEXT NOT NULL,
+                output TEXT,
+                converted_at REAL NOT NULL DEFAULT (julianday('now')),
+                PRIMARY KEY (path, rule)
+            )'''
+        )
+        self._conn.commit()
+
+    def load(self, rule: str) -> Dict[str, Tuple[int, int, str]]:
+        """Alle Einträge einer Regel: Pfad -> (size, mtime_ns, hash)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT path, size, mtime_ns, hash FROM files WHERE rule = ?', (rule,)
+            ).fetchall()
+        return {path: (size, mtime_ns, file_hash) for path, size, mtime_ns, file_hash in rows}
+
+    def lookup(self, path: str, rule: str) -> Optional[Tuple[int, int, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, hash FROM files WHERE path = ? AND rule = ?', (path, rule)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def is_current(self, path: str, rule: str, signature: Tuple[int, int]) -> bool:
+        """True wenn die Datei mit dieser (size, mtime_ns) schon für die Regel konvertiert wurde"""
+        entry = self.lookup(path, rule)
+        return entry is not None and entry[:2] == tuple(signature)
+
+    def record(self, path: str, rule: str, target_format: str, signature: Tuple[int, int],
+               file_hash: str, output: str = None):
+        """Speichert eine erfolgreiche Konvertierung"""
+        size, mtime_ns = signature
+        with self._lock:
+            self._conn.execute(
+                '''INSERT OR REPLACE INTO files (path, rule, size, mtime_ns, hash, target_format, output)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                (path, rule, size, mtime_ns, file_hash, target_format, output)
+            )
+            self._conn.commit()
+
+    def touch_many(self, rule: str, entries: Iterable[Tuple[str, int, int]]):
+        """Aktualisiert nur die Stat-Daten (Inhalt unverändert)"""
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE files SET size = ?, mtime_ns = ? WHERE path = ? AND rule = ?',
+                [(size, mtime_ns, path, rule) for path, size, mtime_ns in entries]
+            )
+            self._conn.commit()
+
+    def forget_many(self, rule: str, paths: Iterable[str]):
+        """Entfernt Einträge für gelöschte Quelldateien"""
+        with self._lock:
+            self._conn.executemany(
+                'DELETE FROM files WHERE path = ? AND rule = ?',
+                [(path, rule) for path in paths]
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()